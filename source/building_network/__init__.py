@@ -12,6 +12,14 @@ from .heat_pump import HeatPump
 from .ev_charger import EVCharger
 from .network import Network
 from .load import Load
+from .component_registry import ComponentRegistry
+from .power_flow import PowerFlowSolver
+from .hybrid_power_flow import HybridPowerFlowSolver
+from .three_phase_power_flow import ThreePhasePowerFlowSolver
+from .network_builder import NetworkBuilder, NetworkSpecError
+from .fleet import FleetRunner, FleetResult
+from .ev_sessions import EVSession, EVSessionManager
+from .event_kernel import EventKernel
 from .print_theme import *
 
-__all__ = ["ElectricalComponent", "Inverter", "Bus", "EnergyStorage", "Line", "Grid", "PV", "HeatPump", "EVCharger", "Network", "Load"]
+__all__ = ["ElectricalComponent", "Inverter", "Bus", "EnergyStorage", "Line", "Grid", "PV", "HeatPump", "EVCharger", "Network", "Load", "ComponentRegistry", "PowerFlowSolver", "HybridPowerFlowSolver", "ThreePhasePowerFlowSolver", "NetworkBuilder", "NetworkSpecError", "FleetRunner", "FleetResult", "EVSession", "EVSessionManager", "EventKernel"]
@@ -19,6 +19,8 @@ class Bus:
         self.nominal_voltage = nominal_voltage  # Float for DC/single-phase, tuple for 3-phase
         self.components = []  # List of connected ElectricalComponents or Inverters
         self.voltage = self.nominal_voltage  # Current voltage (updated during simulation)
+        self.index = -1  # position in the network's bus arrays, set by Network.add_bus
+        self.registry = None  # the network's ComponentRegistry, set by Network.add_bus
         self._validate_inputs()
 
     def _validate_inputs(self):
@@ -32,10 +34,18 @@ class Bus:
             raise ValueError(f"phase_type must be one of {valid_phase_types}, got {self.phase_type}")
         if self.technology == "dc" and self.phase_type == "three":
             raise ValueError("DC buses cannot be three-phase")
-        if isinstance(self.nominal_voltage, tuple) and self.technology == "dc":
-            raise ValueError("DC buses must have a single nominal voltage, not a tuple")
-        if isinstance(self.nominal_voltage, tuple) and self.phase_type != "three":
-            raise ValueError("Tuple voltage is only valid for three-phase buses")
+        error = self._voltage_error(self.nominal_voltage, self.technology, self.phase_type)
+        if error:
+            raise ValueError(error)
+
+    @staticmethod
+    def _voltage_error(nominal_voltage, technology, phase_type):
+        """Problem with the shape of a nominal voltage, or None; shared with NetworkBuilder.validate."""
+        if isinstance(nominal_voltage, (tuple, list)) and technology == "dc":
+            return "DC buses must have a single nominal voltage, not a tuple"
+        if isinstance(nominal_voltage, (tuple, list)) and phase_type != "three":
+            return "Tuple voltage is only valid for three-phase buses"
+        return None
 
     def connect_component(self, component, side=None):
         
@@ -67,25 +77,26 @@ class Bus:
         Calculate the net power balance at this bus.
         - Positive power: Into the bus (e.g., from generators).
         - Negative power: Out of the bus (e.g., to loads).
+        Components report power in their own convention (loads as consumption, generators as
+        supply); the sign per type is applied by the registry (see INJECTION_SIGN).
+        Inverters draw their input power from the input bus and inject their output power
+        into the output bus; lines carry no injection.
         Returns float for DC, complex for AC single-phase, or tuple for 3-phase (future).
         """
-        if not self.components:
-            return 0.0 if self.technology == "dc" else complex(0, 0)
-        
-        total_power = 0.0 if self.technology == "dc" else complex(0, 0)
-        from .inverter import Inverter
-        
-        for component, side in self.components:
-            if isinstance(component, Inverter):
-                power = component.get_power(side="input" if side == "input" else "output")
-                # Input side: power into bus; Output side: power out of bus
-                total_power += power if side == "input" else -power
-            else:
-                # Single-bus components: positive for generation, negative for consumption
-                power = component.get_power()
-                total_power += power
-        
-        return total_power
+        if self.registry is not None:
+            # cached aggregate of the network registry, updated only for changed components
+            active, reactive = self.registry.bus_balance(self.index)
+        else:
+            active = reactive = 0.0
+            for component, side in self.components:
+                if hasattr(component, "bus_injection"):
+                    component_active, component_reactive = component.bus_injection(side)
+                    active += component_active
+                    reactive += component_reactive
+
+        if self.technology == "dc":
+            return active
+        return complex(active, reactive)
 
     def set_voltage(self, voltage):
         """Update the bus voltage (for simulation purposes)."""
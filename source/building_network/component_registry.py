@@ -0,0 +1,319 @@
+# source/building_network/component_registry.py
+from contextlib import contextmanager
+
+import numpy as np
+
+TYPE_CODES = {"load": 0, "generator": 1, "storage": 2, "grid": 3, "inverter": 4, "ev_charger": 5, "heat_pump": 6}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+STATUS_CODES = {"off": 0, "on": 1}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+PHASE_CODES = {"a": 0, "b": 1, "c": 2}
+PHASE_NAMES = {code: name for name, code in PHASE_CODES.items()}
+ALL_PHASES = -1  # phase code of a component spread evenly over the phases of its bus
+FREE_SLOT = -1  # type code of an unused slot
+
+# Bus injection convention: power into the bus is positive. Generators, grids and storage
+# report power they supply (storage is negative while charging); loads, heat pumps and EV
+# chargers report power they consume. An inverter draws its input power from the input bus
+# and injects its output power into the output bus (see Inverter).
+INJECTION_SIGN = {"load": -1, "generator": 1, "storage": 1, "grid": 1, "inverter": -1, "ev_charger": -1, "heat_pump": -1}
+
+# per-slot arrays and the value of an unused slot
+_SLOT_ARRAYS = {
+    "active_power": (np.float64, 0.0),
+    "reactive_power": (np.float64, 0.0),
+    "status": (np.int8, STATUS_CODES["on"]),
+    "type_code": (np.int8, FREE_SLOT),
+    "bus_index": (np.int32, -1),
+    "phase": (np.int8, ALL_PHASES),
+    "sign": (np.int8, 0),
+    "dirty": (np.bool_, False),
+    "applied_active": (np.float64, 0.0),  # contribution last added to the bus aggregate
+    "applied_reactive": (np.float64, 0.0),
+    "applied_bus": (np.int32, -1),
+}
+
+
+class ComponentRegistry:
+    """
+    Struct-of-arrays store for the per-component state of a network.
+
+    Active and reactive power, status, type code and bus index of every component live in
+    contiguous NumPy arrays indexed by slot; components are thin views onto one slot. Freed
+    slots are reused, and the arrays grow geometrically when full. Slots beyond `size` and
+    freed slots have type code FREE_SLOT.
+
+    The registry also keeps a running power balance per bus. Writes through a view mark the
+    slot dirty; a balance query folds only the dirty slots into the bus aggregates. Code that
+    writes the arrays directly must call mark_dirty (or mark_all_dirty).
+    """
+
+    def __init__(self, capacity=64, bus_capacity=16):
+        capacity = max(int(capacity), 1)
+        for name, (dtype, fill) in _SLOT_ARRAYS.items():
+            setattr(self, name, np.full(capacity, fill, dtype=dtype))
+        self.bus_active = np.zeros(max(int(bus_capacity), 1))
+        self.bus_reactive = np.zeros(max(int(bus_capacity), 1))
+        self.size = 0  # high-water mark of used slots
+        self._free = []
+        self._dirty = []
+        self._rebuild = False
+
+    @property
+    def capacity(self):
+        return len(self.active_power)
+
+    def __len__(self):
+        return self.size - len(self._free)
+
+    def _grow(self, capacity):
+        for name, (dtype, fill) in _SLOT_ARRAYS.items():
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def ensure_buses(self, count):
+        """Make room for bus indices below count."""
+        if count > len(self.bus_active):
+            capacity = max(count, 2 * len(self.bus_active))
+            self.bus_active = np.concatenate((self.bus_active, np.zeros(capacity - len(self.bus_active))))
+            self.bus_reactive = np.concatenate((self.bus_reactive, np.zeros(capacity - len(self.bus_reactive))))
+
+    def allocate(self, type_code=FREE_SLOT, sign=0):
+        """Reserve a slot with zero power, status on and no bus. Returns the slot index."""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(2 * self.capacity)
+            slot = self.size
+            self.size += 1
+        self.active_power[slot] = 0.0
+        self.reactive_power[slot] = 0.0
+        self.status[slot] = STATUS_CODES["on"]
+        self.type_code[slot] = type_code
+        self.sign[slot] = sign
+        self.bus_index[slot] = -1
+        self.phase[slot] = ALL_PHASES
+        self.touch(slot)
+        return slot
+
+    def release(self, slot):
+        self.type_code[slot] = FREE_SLOT
+        self.bus_index[slot] = -1
+        self.touch(slot)
+        self._free.append(slot)
+
+    def _move_slot(self, old_registry, old_slot):
+        slot = self.allocate(old_registry.type_code[old_slot], old_registry.sign[old_slot])
+        self.active_power[slot] = old_registry.active_power[old_slot]
+        self.reactive_power[slot] = old_registry.reactive_power[old_slot]
+        self.status[slot] = old_registry.status[old_slot]
+        self.phase[slot] = old_registry.phase[old_slot]
+        old_registry.release(old_slot)
+        return slot
+
+    def adopt(self, component):
+        """
+        Move a component's state into this registry, point the component at its new slots and
+        attach each slot to the index of its bus.
+        """
+        old_registry = component._registry
+        for attribute, bus in component._registry_slots():
+            slot = getattr(component, attribute)
+            if old_registry is not self:
+                slot = self._move_slot(old_registry, slot)
+                setattr(component, attribute, slot)
+            self.bus_index[slot] = bus.index
+            self.touch(slot)
+        component._registry = self
+
+    def touch(self, slot):
+        """Mark one slot as changed since the last balance query."""
+        if not self.dirty[slot]:
+            self.dirty[slot] = True
+            self._dirty.append(slot)
+
+    def mark_dirty(self, slots):
+        """Mark many slots as changed, e.g. after writing the power arrays directly."""
+        slots = np.asarray(slots, dtype=np.intp)
+        new = slots[~self.dirty[slots]]
+        self.dirty[new] = True
+        self._dirty.extend(np.unique(new).tolist())
+
+    def mark_all_dirty(self):
+        """Invalidate every bus aggregate; the next query rebuilds them in one pass."""
+        self._rebuild = True
+
+    def _contributions(self, slots):
+        on = (self.status[slots] == STATUS_CODES["on"]) & (self.type_code[slots] != FREE_SLOT)
+        scale = self.sign[slots] * on
+        return self.active_power[slots] * scale, self.reactive_power[slots] * scale, np.where(on, self.bus_index[slots], -1)
+
+    def _rebuild_balances(self):
+        slots = np.arange(self.size)
+        active, reactive, bus = self._contributions(slots)
+        connected = bus >= 0
+        self.bus_active[:] = np.bincount(bus[connected], weights=active[connected], minlength=len(self.bus_active))
+        self.bus_reactive[:] = np.bincount(bus[connected], weights=reactive[connected], minlength=len(self.bus_reactive))
+        self.applied_active[:self.size], self.applied_reactive[:self.size], self.applied_bus[:self.size] = active, reactive, bus
+        self.dirty[:self.size] = False
+        self._dirty.clear()
+        self._rebuild = False
+
+    def _flush(self):
+        """Fold the dirty slots into the bus aggregates: O(number of changed slots)."""
+        if self._rebuild or len(self._dirty) > self.size // 2:
+            self._rebuild_balances()
+            return
+        if not self._dirty:
+            return
+        slots = np.fromiter(self._dirty, dtype=np.intp, count=len(self._dirty))
+        self._dirty.clear()
+        self.dirty[slots] = False
+
+        old_bus = self.applied_bus[slots]
+        was_connected = old_bus >= 0
+        np.subtract.at(self.bus_active, old_bus[was_connected], self.applied_active[slots][was_connected])
+        np.subtract.at(self.bus_reactive, old_bus[was_connected], self.applied_reactive[slots][was_connected])
+
+        active, reactive, bus = self._contributions(slots)
+        connected = bus >= 0
+        np.add.at(self.bus_active, bus[connected], active[connected])
+        np.add.at(self.bus_reactive, bus[connected], reactive[connected])
+        self.applied_active[slots], self.applied_reactive[slots], self.applied_bus[slots] = active, reactive, bus
+
+    def pending_buses(self):
+        """
+        Indices of the buses whose balance the next query changes (where the dirty slots were
+        and are connected), or None when every aggregate will be rebuilt.
+        """
+        if self._rebuild:
+            return None
+        if not self._dirty:
+            return np.zeros(0, dtype=np.intp)
+        slots = np.fromiter(self._dirty, dtype=np.intp, count=len(self._dirty))
+        buses = np.concatenate((self.applied_bus[slots], self.bus_index[slots]))
+        return np.unique(buses[buses >= 0])
+
+    def bus_balance(self, bus_index):
+        """(active, reactive) power injected into one bus."""
+        self._flush()
+        return float(self.bus_active[bus_index]), float(self.bus_reactive[bus_index])
+
+    def bus_balances(self, bus_count):
+        """Complex power injected into buses 0 .. bus_count-1."""
+        self._flush()
+        return self.bus_active[:bus_count] + 1j * self.bus_reactive[:bus_count]
+
+    def in_use(self):
+        """Boolean mask over slots [0, size) of the slots holding a component."""
+        return self.type_code[:self.size] != FREE_SLOT
+
+    def slots_of_type(self, type_name):
+        return np.flatnonzero(self.type_code[:self.size] == TYPE_CODES[type_name])
+
+    @contextmanager
+    def activate(self):
+        """Allocate components created inside the block directly in this registry."""
+        global _active_registry
+        previous, _active_registry = _active_registry, self
+        try:
+            yield self
+        finally:
+            _active_registry = previous
+
+
+# components created outside a network live here until Network.add_component adopts them
+default_registry = ComponentRegistry()
+_active_registry = default_registry
+
+
+def active_registry():
+    return _active_registry
+
+
+class RegistryView:
+    """Base of components whose power, status and type are stored in a ComponentRegistry slot."""
+
+    __slots__ = ("_registry", "_slot", "__weakref__")
+
+    def _attach(self, type_name):
+        self._registry = _active_registry
+        self._slot = self._registry.allocate()
+        self.type = type_name
+
+    def _registry_slots(self):
+        """(slot attribute, bus) pairs this component occupies in the registry."""
+        return [("_slot", self.bus)]
+
+    @property
+    def active_power(self):
+        return float(self._registry.active_power[self._slot])
+
+    @active_power.setter
+    def active_power(self, value):
+        self._registry.active_power[self._slot] = value
+        self._registry.touch(self._slot)
+
+    @property
+    def reactive_power(self):
+        return float(self._registry.reactive_power[self._slot])
+
+    @reactive_power.setter
+    def reactive_power(self, value):
+        self._registry.reactive_power[self._slot] = value
+        self._registry.touch(self._slot)
+
+    @property
+    def status(self):
+        return STATUS_NAMES[int(self._registry.status[self._slot])]
+
+    @status.setter
+    def status(self, value):
+        if value not in STATUS_CODES:
+            raise ValueError(f"status must be one of {set(STATUS_CODES)}, got {value}")
+        self._registry.status[self._slot] = STATUS_CODES[value]
+        self._registry.touch(self._slot)
+
+    @property
+    def type(self):
+        return TYPE_NAMES[int(self._registry.type_code[self._slot])]
+
+    @type.setter
+    def type(self, value):
+        if value not in TYPE_CODES:
+            raise ValueError(f"type must be one of {set(TYPE_CODES)}, got {value}")
+        self._registry.type_code[self._slot] = TYPE_CODES[value]
+        self._registry.sign[self._slot] = INJECTION_SIGN[value]
+        self._registry.touch(self._slot)
+
+    @property
+    def phase(self):
+        """Phase ("a", "b" or "c") of a single-phase component on a three-phase bus, else None."""
+        code = int(self._registry.phase[self._slot])
+        return None if code == ALL_PHASES else PHASE_NAMES[code]
+
+    @phase.setter
+    def phase(self, value):
+        value = value.lower() if isinstance(value, str) else value
+        if value is not None and value not in PHASE_CODES:
+            raise ValueError(f"phase must be one of {set(PHASE_CODES)} or None, got {value}")
+        self._registry.phase[self._slot] = ALL_PHASES if value is None else PHASE_CODES[value]
+
+    def bus_injection(self, side=None):
+        """Power this component injects into its bus (side is used by two-bus components)."""
+        registry, slot = self._registry, self._slot
+        if registry.status[slot] != STATUS_CODES["on"]:
+            return 0.0, 0.0
+        sign = registry.sign[slot]
+        return sign * float(registry.active_power[slot]), sign * float(registry.reactive_power[slot])
+
+    @property
+    def slot(self):
+        return self._slot
+
+    @property
+    def registry(self):
+        return self._registry
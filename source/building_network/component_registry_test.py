@@ -0,0 +1,146 @@
+import numpy as np
+
+from .bus import Bus
+from .component_registry import FREE_SLOT, ComponentRegistry
+from .energy_storage import EnergyStorage
+from .ev_charger import EVCharger
+from .grid import Grid
+from .heat_pump import HeatPump
+from .inverter import Inverter
+from .line import Line
+from .load import Load
+from .network import Network
+from .print_theme import quiet
+from .pv import PV
+
+CONSUMERS = {"load", "ev_charger", "heat_pump"}
+
+
+def _reference_balances(network):
+    """Power into every bus summed from scratch over the components, in the documented convention."""
+    balances = np.zeros(len(network.buses), dtype=complex)
+    for bus in network.buses.values():
+        for component, side in bus.components:
+            if isinstance(component, Line) or component.status != "on":
+                continue
+            if isinstance(component, Inverter):
+                if side == "input":
+                    power = -complex(component.input_active_power, component.input_reactive_power)
+                else:
+                    power = complex(component.output_active_power, component.output_reactive_power)
+            else:
+                power = complex(component.active_power, component.reactive_power)
+                if component.type in CONSUMERS:
+                    power = -power
+            balances[bus.index] += power
+    return balances
+
+
+def _network():
+    with quiet():
+        network = Network()
+        ac = [Bus(id=f"AC{k}", technology="ac") for k in range(3)]
+        dc = Bus(id="DC", technology="dc", nominal_voltage=48.0)
+        for bus in ac + [dc]:
+            network.add_bus(bus)
+        network.add_components([
+            Line(id="L01", bus_from=ac[0], bus_to=ac[1]),
+            Line(id="L12", bus_from=ac[1], bus_to=ac[2]),
+            Grid(id="Grid", bus=ac[0], max_power=None),
+            Load(id="Load1", bus=ac[1], active_power=1500.0, reactive_power=200.0),
+            Load(id="Load2", bus=ac[2], active_power=800.0),
+            HeatPump(id="HP", bus=ac[2]),
+            EVCharger(id="EV", bus=ac[1]),
+            PV(id="PV", bus=dc),
+            EnergyStorage(id="ESS", bus=dc, capacity=10000.0),
+            Inverter(id="Inv", bus_input=dc, bus_output=ac[2], max_power=1e6),
+        ])
+    return network
+
+
+def test_incremental_balances_match_a_from_scratch_sum():
+    rng = np.random.default_rng(5)
+    network = _network()
+    components = [component for component in network.components if not isinstance(component, Inverter)]
+    components += network.grids
+    inverter = network.inverters[0]
+    registry = network.registry
+    buses = list(network.buses.values())
+
+    for step in range(400):
+        operation = rng.integers(6)
+        if operation == 0:
+            component = components[rng.integers(len(components))]
+            component.active_power = float(rng.uniform(-2000, 2000))
+            component.reactive_power = float(rng.uniform(-300, 300))
+        elif operation == 1:
+            component = [inverter, *components][rng.integers(len(components) + 1)]
+            component.status = "off" if component.status == "on" else "on"
+        elif operation == 2:
+            inverter.set_input_power(float(rng.uniform(-3000, 3000)))
+        elif operation == 3:
+            # direct array writes, as the vectorised time-series runs do
+            slots = rng.choice(registry.size, size=3, replace=False)
+            registry.active_power[slots] = rng.uniform(-1000, 1000, size=3)
+            registry.mark_dirty(slots)
+        elif operation == 4:
+            with quiet():
+                load = Load(id=f"New{step}", bus=buses[rng.integers(3)], active_power=float(rng.uniform(0, 500)))
+                network.add_component(load)  # adopted from the default registry
+            components.append(load)
+        else:
+            registry.active_power[:registry.size] *= 0.5
+            registry.mark_all_dirty()
+
+        if rng.random() < 0.3:
+            expected = _reference_balances(network)
+            assert np.allclose(network.get_bus_balances(), expected, atol=1e-6)
+            bus = buses[rng.integers(len(buses))]
+            balance = bus.get_power_balance()
+            assert np.isclose(balance, expected[bus.index].real if bus.technology == "dc" else expected[bus.index])
+    assert np.allclose(network.get_bus_balances(), _reference_balances(network), atol=1e-6)
+
+
+def test_slots_grow_and_are_reused():
+    registry = ComponentRegistry(capacity=2)
+    slots = [registry.allocate(type_code=0, sign=-1) for _ in range(5)]
+    assert slots == [0, 1, 2, 3, 4] and registry.capacity == 8 and len(registry) == 5
+    registry.active_power[slots] = np.arange(5.0)
+    registry.release(1)
+    registry.release(3)
+    assert len(registry) == 3 and not registry.in_use()[[1, 3]].any()
+    assert registry.type_code[5:].tolist() == [FREE_SLOT] * 3
+    assert registry.allocate(type_code=1, sign=1) in (1, 3)
+    assert registry.size == 5 and len(registry) == 4
+    assert registry.active_power[[0, 2, 4]].tolist() == [0.0, 2.0, 4.0]
+
+
+def test_adopt_moves_the_state_into_the_network():
+    staging = ComponentRegistry()
+    with quiet():
+        network = Network()
+        bus = Bus(id="AC", technology="ac")
+        network.add_bus(bus)
+        with staging.activate():
+            load = Load(id="Load", bus=bus, active_power=1200.0, reactive_power=100.0)
+            other = Load(id="Other", bus=bus, active_power=50.0)
+        load.status = "off"
+        old_slot = load.slot
+        network.add_component(load)
+
+    assert load.registry is network.registry and other.registry is staging
+    assert (load.active_power, load.reactive_power, load.status) == (1200.0, 100.0, "off")
+    assert staging.type_code[old_slot] == FREE_SLOT and len(staging) == 1
+    assert network.registry.bus_index[load.slot] == bus.index
+    assert network.get_bus_balances()[bus.index] == 0
+    load.status = "on"
+    assert network.get_bus_balances()[bus.index] == complex(-1200.0, -100.0)
+    with staging.activate():
+        assert staging.allocate() == old_slot  # freed by the move
+
+
+if __name__ == "__main__":
+    test_incremental_balances_match_a_from_scratch_sum()
+    test_slots_grow_and_are_reused()
+    test_adopt_moves_the_state_into_the_network()
+    print("component_registry: all tests passed")
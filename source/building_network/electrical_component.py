@@ -1,24 +1,56 @@
 # source/building_network/electrical_component.py
+from contextlib import contextmanager
+
 from .print_theme import *
+from .component_registry import RegistryView
+
+_validation_deferred = False
+
+
+@contextmanager
+def deferred_validation():
+    """
+    Skip the per-component _validate_inputs of components created inside the block; for
+    bulk construction where the parameters were already checked together (see NetworkBuilder).
+    """
+    global _validation_deferred
+    previous, _validation_deferred = _validation_deferred, True
+    try:
+        yield
+    finally:
+        _validation_deferred = previous
+
+
+def validation_deferred():
+    return _validation_deferred
+
+
+class ElectricalComponent(RegistryView):
+    # active_power, reactive_power, status and type live in the network's ComponentRegistry
+    __slots__ = ("id", "bus", "phase_type", "technology", "voltage_rating")
 
-class ElectricalComponent:
     def __init__(self, id, bus, phase_type="single", type="load", technology="ac", 
-                 voltage_rating=None, active_power=0.0, reactive_power=0.0, status="on"):
+                 voltage_rating=None, active_power=0.0, reactive_power=0.0, status="on", phase=None):
+        self._attach(type.lower())
         self.id = id
         self.bus = bus
         self.phase_type = phase_type.lower()
-        self.type = type.lower()
         self.technology = technology.lower()
         self.voltage_rating = voltage_rating
         self.active_power = float(active_power)
         self.reactive_power = float(reactive_power)
         self.status = status
-        self._validate_inputs()
+        self.phase = phase  # phase of a single-phase component on a three-phase bus (None: spread over all three)
+        if phase is not None and self.phase_type == "three":
+            raise ValueError("Three-phase components cannot be assigned to a single phase")
+        # subclasses set their own attributes before calling this, so one call validates everything
+        if not _validation_deferred:
+            self._validate_inputs()
 
     def _validate_inputs(self):
         valid_phase_types = {"single", "three"}
         valid_technologies = {"ac", "dc"}
-        valid_types = {"load", "generator", "storage", "grid", "inverter"} 
+        valid_types = {"load", "generator", "storage", "grid", "inverter", "ev_charger", "heat_pump"}
         status_types = {"on", "off"}
         if self.phase_type not in valid_phase_types:
             raise ValueError(f"phase_type must be one of {valid_phase_types}, got {self.phase_type}")
@@ -70,7 +102,8 @@ class ElectricalComponent:
             "technology": self.technology,
             "active_power": self.active_power,
             "reactive_power": self.reactive_power if self.technology == "ac" else None,
-            "voltage_rating": self.voltage_rating
+            "voltage_rating": self.voltage_rating,
+            "phase": self.phase
         }
 
     def connect_to_bus(self, bus):
@@ -1,10 +1,13 @@
 # source/building_network/energy_storage.py
 from .electrical_component import ElectricalComponent
+from .kernels import run_devices
 
 class EnergyStorage(ElectricalComponent):
+    __slots__ = ("capacity", "soc", "max_charge_power", "max_discharge_power", "efficiency")
+
     def __init__(self, id, bus, capacity, initial_soc=0.5, max_charge_power=1000.0, 
                  max_discharge_power=1000.0, efficiency=0.95, phase_type="single", 
-                 technology="dc", voltage_rating=None, status="on"):
+                 technology="dc", voltage_rating=None, status="on", phase=None):
         """
         Initialize an energy storage component (e.g., battery).
         
@@ -20,6 +23,7 @@ class EnergyStorage(ElectricalComponent):
         - technology (str): "ac" or "dc".
         - voltage_rating (float or tuple): Rated voltage (e.g., 48V for DC, 230V for AC).
         - active (bool): Whether the storage is operational.
+        - phase (str): "a", "b" or "c" for a single-phase device on a three-phase bus.
         """
         self.capacity = float(capacity)
         self.soc = float(initial_soc)  # State of Charge (0 to 1)
@@ -27,9 +31,7 @@ class EnergyStorage(ElectricalComponent):
         self.max_discharge_power = float(max_discharge_power)
         self.efficiency = float(efficiency)
         super().__init__(id, bus, phase_type=phase_type, type="storage", technology=technology, 
-                         voltage_rating=voltage_rating, status=status)
-
-        self._validate_inputs()
+                         voltage_rating=voltage_rating, status=status, phase=phase)
 
     def _validate_inputs(self):
         """Validate energy storage parameters."""
@@ -98,6 +100,27 @@ class EnergyStorage(ElectricalComponent):
         self.reactive_power = 0.0 if self.technology == "dc" else self.reactive_power
         return effective_power
 
+    def run_setpoints(self, setpoints, time_step=1.0):
+        """
+        Apply a sequence of power setpoints (W; positive charges, negative discharges), each for
+        time_step hours, with the same limits as charge/discharge.
+        Returns (power, soc) arrays: realised power in the setpoint convention and SOC after each step.
+        """
+        power, soc = EnergyStorage.run_batch([self], setpoints, time_step)
+        return power[0], soc[0]
+
+    @staticmethod
+    def run_batch(storages, setpoints, time_step=1.0):
+        """
+        run_setpoints for many storages at once; setpoints has one row per storage.
+        Each storage is left with the SOC and power of the last step.
+        """
+        power, soc = run_devices(storages, setpoints, "capacity", time_step)
+        for storage, realised in zip(storages, power):
+            if realised.size and storage.status == "on":
+                storage.active_power = -realised[-1]  # storage reports power supplied
+        return power, soc
+
     def get_power(self):
         """Return current power (negative for charging, positive for discharging)."""
         if self.status =="off":
@@ -1,10 +1,13 @@
 # source/building_network/ev_charger.py
 from .electrical_component import ElectricalComponent
+from .kernels import run_devices
 
 class EVCharger(ElectricalComponent):
+    __slots__ = ("max_charge_power", "max_discharge_power", "efficiency", "ev_capacity", "soc", "state", "plugged_in", "session")
+
     def __init__(self, id, bus, max_charge_power=7000.0, max_discharge_power=7000.0, 
                  efficiency=0.95, ev_capacity=40000.0, initial_soc=0.5, 
-                 phase_type="single", technology="ac", voltage_rating=None, status="on"):
+                 phase_type="single", technology="ac", voltage_rating=None, status="on", phase=None):
         """
         Initialize an EV charger with bidirectional (V2B/V2G) capability.
         
@@ -20,6 +23,7 @@ class EVCharger(ElectricalComponent):
         - technology (str): "ac" (common) or "dc" (direct to EV battery).
         - voltage_rating (float or tuple): Rated voltage (e.g., 230V for AC).
         - active (bool): Whether the charger is operational.
+        - phase (str): "a", "b" or "c" for a single-phase device on a three-phase bus.
         """
         self.max_charge_power = float(max_charge_power)
         self.max_discharge_power = float(max_discharge_power)
@@ -27,10 +31,10 @@ class EVCharger(ElectricalComponent):
         self.ev_capacity = float(ev_capacity)
         self.soc = float(initial_soc)
         self.state = "idle"  # "idle", "charging", "discharging"
+        self.plugged_in = False  # set by plug_in/unplug; charge and discharge do not require it
+        self.session = None  # session of the plugged-in vehicle, see EVSessionManager
         super().__init__(id, bus, phase_type=phase_type, type="ev_charger", technology=technology, 
-                         voltage_rating=voltage_rating, status=status)
-
-        self._validate_inputs()
+                         voltage_rating=voltage_rating, status=status, phase=phase)
 
     def _validate_inputs(self):
         """Validate EV charger parameters."""
@@ -99,6 +103,55 @@ class EVCharger(ElectricalComponent):
         self.reactive_power = 0.0  # Assume no reactive power in discharge (adjustable)
         return effective_power
 
+    def run_setpoints(self, setpoints, time_step=1.0):
+        """
+        Apply a sequence of power setpoints (W; positive charges the EV, negative discharges it),
+        each for time_step hours, with the same limits as charge/discharge.
+        Returns (power, soc) arrays: realised power in the setpoint convention and SOC after each step.
+        """
+        power, soc = EVCharger.run_batch([self], setpoints, time_step)
+        return power[0], soc[0]
+
+    @staticmethod
+    def run_batch(chargers, setpoints, time_step=1.0):
+        """
+        run_setpoints for many chargers at once; setpoints has one row per charger.
+        Each charger is left with the SOC, power and state of the last step.
+        """
+        power, soc = run_devices(chargers, setpoints, "ev_capacity", time_step)
+        for charger, realised in zip(chargers, power):
+            if not realised.size or charger.status == "off":
+                continue
+            last = float(realised[-1])
+            charger.active_power = last  # charger reports power consumed
+            charger.reactive_power = last * 0.2 if last > 0 and charger.technology == "ac" else 0.0
+            charger.state = "charging" if last > 0 else "discharging" if last < 0 else "idle"
+        return power, soc
+
+    def plug_in(self, ev_capacity, soc, session=None):
+        """
+        Attach a vehicle: the charger takes over its battery capacity (Wh) and SOC (0 to 1).
+        session is kept on the charger until unplug; raises if another vehicle is plugged in.
+        """
+        if self.plugged_in:
+            raise ValueError(f"EV charger {self.id} already has a vehicle plugged in")
+        if ev_capacity <= 0:
+            raise ValueError(f"ev_capacity must be positive, got {ev_capacity}")
+        if not 0 <= soc <= 1:
+            raise ValueError(f"soc must be between 0 and 1, got {soc}")
+        self.ev_capacity = float(ev_capacity)
+        self.soc = float(soc)
+        self.plugged_in = True
+        self.session = session
+        self.set_idle()
+
+    def unplug(self):
+        """Detach the vehicle; returns its SOC."""
+        self.plugged_in = False
+        self.session = None
+        self.set_idle()
+        return self.soc
+
     def set_idle(self):
         """Set charger to idle state."""
         self.state = "idle"
@@ -122,6 +175,7 @@ class EVCharger(ElectricalComponent):
             "efficiency": self.efficiency,
             "ev_capacity": self.ev_capacity,
             "soc": self.soc,
-            "state": self.state
+            "state": self.state,
+            "plugged_in": self.plugged_in
         })
         return base_status
\ No newline at end of file
@@ -0,0 +1,263 @@
+# source/building_network/ev_sessions.py
+import heapq
+from collections import deque
+
+import numpy as np
+
+# event kinds in the order they are handled at equal times: a finished battery stops charging
+# before its vehicle leaves, and a charger freed by a departure can be reused by an arrival
+FULL, DEPARTURE, ARRIVAL = 0, 1, 2
+
+
+class EVSession:
+    """
+    One vehicle visit: it arrives and departs at the given times (hours), wants
+    energy_requested Wh delivered to its battery, and brings a battery of ev_capacity Wh
+    at initial_soc. charger_id pins the session to one charger; otherwise any free charger
+    of the site is used.
+    """
+    __slots__ = ("id", "arrival", "departure", "energy_requested", "initial_soc", "ev_capacity", "charger_id",
+                 "charger", "plug_in_time", "energy_delivered", "soc", "status")
+
+    def __init__(self, id, arrival, departure, energy_requested, initial_soc=0.2, ev_capacity=40000.0, charger_id=None):
+        if departure < arrival:
+            raise ValueError(f"Session {id} departs ({departure}) before it arrives ({arrival})")
+        if energy_requested < 0:
+            raise ValueError(f"energy_requested must be non-negative, got {energy_requested}")
+        if not 0 <= initial_soc <= 1:
+            raise ValueError(f"initial_soc must be between 0 and 1, got {initial_soc}")
+        if ev_capacity <= 0:
+            raise ValueError(f"ev_capacity must be positive, got {ev_capacity}")
+        self.id = id
+        self.arrival = float(arrival)
+        self.departure = float(departure)
+        self.energy_requested = float(energy_requested)
+        self.initial_soc = float(initial_soc)
+        self.ev_capacity = float(ev_capacity)
+        self.charger_id = charger_id
+        self.charger = None
+        self.plug_in_time = None
+        self.energy_delivered = 0.0  # Wh into the battery
+        self.soc = self.initial_soc
+        self.status = "scheduled"  # "scheduled", "waiting", "charging", "plugged", "completed", "unserved"
+
+    @property
+    def remaining_energy(self):
+        """Energy still to deliver, limited by the room left in the battery (Wh)."""
+        room = self.ev_capacity * (1 - self.soc)
+        return max(min(self.energy_requested - self.energy_delivered, room), 0.0)
+
+    def get_status(self):
+        return {
+            "id": self.id,
+            "arrival": self.arrival,
+            "departure": self.departure,
+            "charger": self.charger.id if self.charger is not None else None,
+            "plug_in_time": self.plug_in_time,
+            "energy_requested": self.energy_requested,
+            "energy_delivered": self.energy_delivered,
+            "soc": self.soc,
+            "status": self.status,
+        }
+
+
+class EVSessionManager:
+    """
+    Attaches vehicle sessions to the EVChargers of a site and charges them over time.
+
+    Arrivals, departures and "battery done" times are kept in one heap and handled in time
+    order. A vehicle that finds no free charger waits in a FIFO queue (per charger for pinned
+    sessions) until one is freed, and is counted unserved if it departs first. A plugged-in
+    vehicle charges at the charger's max_charge_power until its request is met or its battery
+    is full, then stays plugged in (idle) until departure.
+
+    Since a session's power is constant between its own events, its end of charging is
+    scheduled when it plugs in and its SOC is only brought up to date (through
+    EVCharger.charge) at its own events, at sync() and at the end of run(). The site power is
+    kept as a running sum, so an event costs O(log n) and idle or empty chargers are never
+    visited, however many sessions and chargers there are.
+
+    The chargers' active and reactive power (and with them the registry and bus balances of
+    their Network) always reflect the current time. Status changes of a charger during a
+    session are not picked up; a charger that is off at plug-in does not charge.
+    """
+
+    def __init__(self, chargers, start_time=0.0):
+        self.chargers = {charger.id: charger for charger in chargers}
+        self.time = float(start_time)
+        self.sessions = {}
+        self._events = []
+        self._sequence = 0
+        self._free = dict.fromkeys(charger.id for charger in chargers if not charger.plugged_in)  # ordered set
+        self._waiting = deque()  # sessions for any charger
+        self._waiting_for = {}  # charger id -> sessions pinned to it
+        self._charging = {}  # charger id -> [session, power, time charged up to]
+        self._power = 0.0  # total power drawn by the charging sessions (W)
+
+    def add_session(self, session):
+        """Schedule an EVSession (or the keyword arguments of one); returns the session."""
+        if not isinstance(session, EVSession):
+            session = EVSession(**session)
+        if session.id in self.sessions:
+            raise ValueError(f"Session {session.id} already added")
+        if session.charger_id is not None and session.charger_id not in self.chargers:
+            raise KeyError(f"Session {session.id} references unknown charger {session.charger_id}")
+        if session.arrival < self.time:
+            raise ValueError(f"Session {session.id} arrives at {session.arrival}, before the current time {self.time}")
+        self.sessions[session.id] = session
+        self._push(session.arrival, ARRIVAL, session)
+        return session
+
+    def add_sessions(self, sessions):
+        for session in sessions:
+            self.add_session(session)
+
+    def _push(self, time, kind, session):
+        heapq.heappush(self._events, (time, kind, self._sequence, session))
+        self._sequence += 1
+
+    @property
+    def next_event_time(self):
+        return self._events[0][0] if self._events else None
+
+    @property
+    def power(self):
+        """Power currently drawn by the chargers (W)."""
+        return self._power
+
+    @property
+    def charging_sessions(self):
+        return [entry[0] for entry in self._charging.values()]
+
+    def _plug(self, session, charger):
+        charger.plug_in(session.ev_capacity, session.soc, session)
+        session.charger = charger
+        session.plug_in_time = self.time
+        session.status = "plugged"
+        remaining = session.remaining_energy
+        if remaining <= 0 or charger.status == "off" or charger.max_charge_power <= 0:
+            return
+        power = charger.max_charge_power
+        charger.charge(power, 0.0)  # zero-length step: sets the charger's power and state
+        session.status = "charging"
+        self._charging[charger.id] = [session, power, self.time]
+        self._power += power
+        self._push(self.time + remaining / (power * charger.efficiency), FULL, session)
+
+    def _settle(self, charger_id):
+        """Charge a session up to the current time."""
+        entry = self._charging[charger_id]
+        session, power, since = entry
+        if self.time > since:
+            charger = self.chargers[charger_id]
+            before = charger.soc
+            charger.charge(power, self.time - since)
+            session.soc = charger.soc
+            session.energy_delivered += (charger.soc - before) * charger.ev_capacity
+            entry[2] = self.time
+
+    def _stop_charging(self, charger_id):
+        self._settle(charger_id)
+        session, power, _ = self._charging.pop(charger_id)
+        self._power = self._power - power if self._charging else 0.0  # no drift once all are done
+        self.chargers[charger_id].set_idle()
+        session.status = "plugged"
+
+    def _arrive(self, session):
+        self._push(session.departure, DEPARTURE, session)
+        if session.charger_id is None:
+            charger_id = next(iter(self._free), None)
+        else:
+            charger_id = session.charger_id if session.charger_id in self._free else None
+        if charger_id is None:
+            session.status = "waiting"
+            queue = self._waiting if session.charger_id is None else self._waiting_for.setdefault(session.charger_id, deque())
+            queue.append(session)
+            return
+        del self._free[charger_id]
+        self._plug(session, self.chargers[charger_id])
+
+    def _next_waiting(self, charger_id):
+        """Earliest waiting session that may use a charger; departed ones are dropped on the way."""
+        candidates = []
+        for queue in (self._waiting, self._waiting_for.get(charger_id)):
+            while queue and queue[0].status != "waiting":
+                queue.popleft()
+            if queue:
+                candidates.append(queue)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda queue: (queue[0].arrival, queue is not self._waiting_for.get(charger_id))).popleft()
+
+    def _depart(self, session):
+        if session.status == "waiting":
+            session.status = "unserved"  # removed from its queue lazily
+            return
+        charger = session.charger
+        if charger.id in self._charging:
+            self._stop_charging(charger.id)
+        session.soc = charger.unplug()
+        session.status = "completed"
+        waiting = self._next_waiting(charger.id)
+        if waiting is None:
+            self._free[charger.id] = None
+        else:
+            self._plug(waiting, charger)
+
+    def advance(self, until):
+        """
+        Handle every event up to and including time until; returns the energy drawn by the
+        chargers over the interval (Wh).
+        """
+        if until < self.time:
+            raise ValueError(f"Cannot advance to {until}, the current time is {self.time}")
+        drawn = 0.0
+        while self._events and self._events[0][0] <= until:
+            time, kind, _, session = heapq.heappop(self._events)
+            drawn += self._power * (time - self.time)
+            self.time = time
+            if kind == ARRIVAL:
+                self._arrive(session)
+            elif kind == DEPARTURE:
+                self._depart(session)
+            elif session.status == "charging" and session.charger.session is session:
+                self._stop_charging(session.charger.id)
+        drawn += self._power * (until - self.time)
+        self.time = float(until)
+        return drawn
+
+    def sync(self):
+        """Bring the SOC of every charging session and its charger up to the current time."""
+        for charger_id in self._charging:
+            self._settle(charger_id)
+
+    def run(self, end, resolution):
+        """
+        Advance to time end, sampling every resolution hours.
+
+        Returns a dict of arrays over the samples: "time" (end of each interval), "power"
+        (mean power drawn by the chargers, W), "charging" and "plugged_in" (session counts).
+        """
+        times = np.arange(self.time + resolution, end + resolution / 2, resolution)
+        power = np.zeros(len(times))
+        charging = np.zeros(len(times), dtype=np.int64)
+        plugged = np.zeros(len(times), dtype=np.int64)
+        for k, time in enumerate(times):
+            start = self.time
+            power[k] = self.advance(time) / (time - start)
+            charging[k] = len(self._charging)
+            plugged[k] = len(self.chargers) - len(self._free)
+        self.sync()
+        return {"time": times, "power": power, "charging": charging, "plugged_in": plugged}
+
+    def summary(self):
+        """Session counts by status and the total energy requested and delivered (Wh)."""
+        self.sync()
+        counts = {}
+        for session in self.sessions.values():
+            counts[session.status] = counts.get(session.status, 0) + 1
+        return {
+            "sessions": counts,
+            "energy_requested": sum(session.energy_requested for session in self.sessions.values()),
+            "energy_delivered": sum(session.energy_delivered for session in self.sessions.values()),
+        }
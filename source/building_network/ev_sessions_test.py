@@ -0,0 +1,141 @@
+import time
+
+import numpy as np
+
+from .bus import Bus
+from .ev_charger import EVCharger
+from .ev_sessions import EVSession, EVSessionManager
+from .print_theme import quiet
+
+TICK = 1 / 60  # h
+
+
+def _chargers(count, max_charge_power=7000.0, efficiency=0.9):
+    with quiet():
+        bus = Bus(id="Site", technology="ac")
+        return [EVCharger(id=f"C{k}", bus=bus, max_charge_power=max_charge_power, efficiency=efficiency)
+                for k in range(count)]
+
+
+def _random_sessions(rng, count, hours=24):
+    """Sessions at whole minutes; departures are all distinct so their order is unambiguous."""
+    minutes = hours * 60
+    arrivals = np.sort(rng.integers(0, minutes - 120, count))
+    departures = []
+    for arrival in arrivals:
+        departure = int(arrival + 30 + rng.integers(0, 360))
+        while departure in departures:
+            departure += 1
+        departures.append(departure)
+    return [EVSession(id=f"S{k}", arrival=arrivals[k] / 60, departure=departures[k] / 60,
+                      energy_requested=rng.uniform(1000.0, 40000.0), initial_soc=rng.uniform(0.0, 0.8),
+                      ev_capacity=rng.choice([30000.0, 60000.0]))
+            for k in range(count)]
+
+
+def _tick_simulation(sessions, chargers, max_charge_power, efficiency, end):
+    """
+    Reference: step every minute; departures, then arrivals, in session order. Identical
+    chargers, so only how many are free matters. Returns session id -> (delivered Wh, status).
+    """
+    delivered = {session.id: 0.0 for session in sessions}
+    soc = {session.id: session.initial_soc for session in sessions}
+    status = {session.id: "scheduled" for session in sessions}
+    plugged, waiting, free = [], [], chargers
+    for tick in range(int(round(end / TICK)) + 1):
+        for session in plugged:
+            room = session.ev_capacity * (1 - soc[session.id])
+            remaining = max(min(session.energy_requested - delivered[session.id], room), 0.0)
+            energy = min(max_charge_power * efficiency * TICK, remaining)
+            delivered[session.id] += energy
+            soc[session.id] += energy / session.ev_capacity
+        for session in sessions:
+            if round(session.departure * 60) != tick:
+                continue
+            if session in plugged:
+                plugged.remove(session)
+                status[session.id] = "completed"
+                if waiting:
+                    plugged.append(waiting.pop(0))
+                else:
+                    free += 1
+            elif session in waiting:
+                waiting.remove(session)
+                status[session.id] = "unserved"
+        for session in sessions:
+            if round(session.arrival * 60) == tick:
+                if free:
+                    free -= 1
+                    plugged.append(session)
+                else:
+                    waiting.append(session)
+    return {session_id: (delivered[session_id], status[session_id]) for session_id in delivered}
+
+
+def test_drawn_energy_matches_delivered_energy():
+    chargers = _chargers(3)
+    manager = EVSessionManager(chargers)
+    manager.add_sessions(_random_sessions(np.random.default_rng(1), 40))
+    results = manager.run(end=30.0, resolution=0.25)
+    summary = manager.summary()
+    drawn = results["power"].sum() * 0.25
+    assert np.isclose(drawn * 0.9, summary["energy_delivered"])
+    assert summary["sessions"].get("unserved", 0) > 0  # the site is congested
+    assert all(session.energy_delivered <= session.energy_requested + 1e-6 for session in manager.sessions.values())
+    assert all(session.soc <= 1 + 1e-12 for session in manager.sessions.values())
+    assert results["plugged_in"].max() <= 3 and results["power"].max() <= 3 * 7000.0 + 1e-6
+    assert manager.power == 0.0 and all(charger.active_power == 0.0 for charger in chargers)
+
+
+def test_waiting_vehicle_is_unserved_if_it_leaves_first():
+    manager = EVSessionManager(_chargers(1))
+    first = manager.add_session({"id": "first", "arrival": 0.0, "departure": 5.0, "energy_requested": 3000.0})
+    second = manager.add_session({"id": "second", "arrival": 1.0, "departure": 4.0, "energy_requested": 3000.0})
+    third = manager.add_session({"id": "third", "arrival": 2.0, "departure": 8.0, "energy_requested": 3000.0})
+    manager.advance(10.0)
+    # the first vehicle finishes within the hour but keeps the charger until it departs
+    assert first.status == "completed" and np.isclose(first.energy_delivered, 3000.0)
+    assert second.status == "unserved" and second.energy_delivered == 0.0 and second.plug_in_time is None
+    assert third.status == "completed" and third.plug_in_time == 5.0 and np.isclose(third.energy_delivered, 3000.0)
+
+
+def test_pinned_sessions_wait_for_their_charger():
+    chargers = _chargers(2)
+    manager = EVSessionManager(chargers)
+    manager.add_session({"id": "a", "arrival": 0.0, "departure": 3.0, "energy_requested": 1000.0, "charger_id": "C0"})
+    pinned = manager.add_session({"id": "b", "arrival": 1.0, "departure": 6.0, "energy_requested": 1000.0,
+                                  "charger_id": "C0"})
+    anywhere = manager.add_session({"id": "c", "arrival": 1.5, "departure": 6.0, "energy_requested": 1000.0})
+    manager.advance(2.0)
+    assert pinned.status == "waiting"  # C1 is free, but b is pinned to C0
+    assert anywhere.charger is chargers[1]
+    manager.advance(6.0)
+    assert pinned.plug_in_time == 3.0 and pinned.charger is chargers[0] and pinned.status == "completed"
+
+
+def test_events_match_a_minute_by_minute_simulation():
+    rng = np.random.default_rng(4)
+    sessions = _random_sessions(rng, 60)
+    manager = EVSessionManager(_chargers(4, max_charge_power=11000.0, efficiency=0.92))
+    manager.add_sessions(sessions)
+    manager.advance(32.0)
+    manager.sync()
+    reference = _tick_simulation(sessions, 4, 11000.0, 0.92, 32.0)
+    for session in sessions:
+        energy, status = reference[session.id]
+        assert status == session.status, session.id
+        assert np.isclose(session.energy_delivered, energy, rtol=1e-9, atol=1e-6), session.id
+    assert {"completed", "unserved"} == {session.status for session in sessions}
+
+
+if __name__ == "__main__":
+    test_drawn_energy_matches_delivered_energy()
+    test_waiting_vehicle_is_unserved_if_it_leaves_first()
+    test_pinned_sessions_wait_for_their_charger()
+    test_events_match_a_minute_by_minute_simulation()
+    manager = EVSessionManager(_chargers(200))
+    manager.add_sessions(_random_sessions(np.random.default_rng(0), 3000, hours=24 * 7))
+    start = time.perf_counter()
+    manager.run(end=24 * 7, resolution=0.25)
+    print(f"3000 sessions on 200 chargers over a week: {time.perf_counter() - start:.3f} s")
+    print("ev_sessions: all tests passed")
@@ -0,0 +1,198 @@
+# source/building_network/event_kernel.py
+import heapq
+
+import numpy as np
+
+
+class EventKernel:
+    """
+    Discrete-event simulation of a Network: time jumps from one state change to the next
+    instead of stepping through every tick.
+
+    Changes are posted to a priority queue with post(time, target, ...): either attribute
+    values for a component (post(2.5, load, active_power=1500.0), post(6, pump, status="off"))
+    or a callable with its arguments (post(1, pump.set_operating_condition, 0.5)). A callable
+    may post further events, e.g. the next switching of a cycling heat pump. Objects with a
+    next_event_time property and an advance(time) method, such as EVSessionManager, run
+    alongside the queue through add_process.
+
+    After the events of a time are applied, only the buses of components that changed are
+    rebalanced: the registry folds the dirty slots into the bus aggregates, and the grids on
+    those buses cover the new deficit (within max_power, as in Network.run_timeseries). Grid
+    energy is integrated exactly between events. run() samples the state at a fixed
+    resolution; nothing is computed at sample times beyond copying the outputs.
+    """
+
+    def __init__(self, network, start_time=0.0):
+        self.network = network
+        self.time = float(start_time)
+        self.processes = []
+        self.events_handled = 0
+        self._events = []
+        self._sequence = 0
+        self._cancelled = set()
+        self._grid_layout = None  # (topology version, grid list, bus index -> grids)
+        self.grid_energy = {grid.id: 0.0 for grid in network.grids}  # Wh supplied since start_time
+        self._rebalance(None)
+
+    def post(self, time, target, *args, **changes):
+        """
+        Queue a change at a time (hours): attribute values for a component, or a callable
+        called with args and changes. Events at equal times are applied in posting order.
+        Returns a handle for cancel().
+        """
+        if time < self.time:
+            raise ValueError(f"Cannot post an event at {time}, the current time is {self.time}")
+        if not callable(target) and args:
+            raise TypeError("Positional arguments are only accepted with a callable target")
+        handle = self._sequence
+        heapq.heappush(self._events, (float(time), handle, target, args, changes))
+        self._sequence += 1
+        return handle
+
+    def post_series(self, component, times, values, attribute="active_power"):
+        """
+        Queue the changes of a sampled profile: one event per time at which the value differs
+        from the previous one, so long constant stretches cost nothing.
+        """
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if times.shape != values.shape:
+            raise ValueError(f"times and values must have the same shape, got {times.shape} and {values.shape}")
+        changed = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+        return [self.post(times[k], component, **{attribute: float(values[k])}) for k in changed]
+
+    def cancel(self, handle):
+        """Drop a posted event that has not been applied yet."""
+        self._cancelled.add(handle)
+
+    def add_process(self, process):
+        """Run an object with next_event_time and advance(time) (e.g. EVSessionManager) in step with the kernel."""
+        self.processes.append(process)
+        return process
+
+    @property
+    def next_event_time(self):
+        while self._events and self._events[0][1] in self._cancelled:
+            self._cancelled.discard(heapq.heappop(self._events)[1])
+        times = [self._events[0][0]] if self._events else []
+        times += [process.next_event_time for process in self.processes if process.next_event_time is not None]
+        return min(times) if times else None
+
+    def _grids_by_bus(self):
+        network = self.network
+        if self._grid_layout is None or self._grid_layout[0] != network.topology_version \
+                or self._grid_layout[1] != network.grids:
+            by_bus = {}
+            for grid in network.grids:
+                by_bus.setdefault(grid.bus.index, []).append(grid)
+                self.grid_energy.setdefault(grid.id, 0.0)
+            self._grid_layout = (network.topology_version, list(network.grids), by_bus)
+        return self._grid_layout[2]
+
+    def _rebalance(self, buses):
+        """Let the grids cover the balance of the given bus indices (None: all buses)."""
+        registry = self.network.registry
+        by_bus = self._grids_by_bus()
+        affected = list(by_bus) if buses is None else [bus for bus in buses.tolist() if bus in by_bus]
+        for bus in affected:
+            grids = by_bus[bus]
+            # balance of the bus without its grids, then each grid covers what is left
+            residual = complex(*registry.bus_balance(bus))
+            residual -= sum(complex(registry.applied_active[grid.slot], registry.applied_reactive[grid.slot])
+                            for grid in grids)
+            for grid in grids:
+                if grid.status == "off":
+                    continue
+                supplied = grid.supply_power(-residual if grid.technology == "ac" else -residual.real)
+                residual += supplied
+
+    def _integrate(self, until):
+        grids = self._grid_layout[1]
+        duration = until - self.time
+        if duration > 0:
+            for grid in grids:
+                if grid.status == "on":
+                    self.grid_energy[grid.id] += grid.active_power * duration
+        self.time = until
+
+    def step(self):
+        """Jump to the next event time and apply everything due then; returns that time, or None."""
+        time = self.next_event_time
+        if time is None:
+            return None
+        self._integrate(time)
+        for process in self.processes:
+            if process.next_event_time is not None and process.next_event_time <= time:
+                process.advance(time)
+        while self._events and self._events[0][0] <= time:
+            _, handle, target, args, changes = heapq.heappop(self._events)
+            if handle in self._cancelled:
+                self._cancelled.discard(handle)
+                continue
+            if callable(target):
+                target(*args, **changes)
+            else:
+                for attribute, value in changes.items():
+                    setattr(target, attribute, value)
+            self.events_handled += 1
+        self._rebalance(self.network.registry.pending_buses())
+        return time
+
+    def advance(self, until):
+        """Apply every event up to and including time until."""
+        if until < self.time:
+            raise ValueError(f"Cannot advance to {until}, the current time is {self.time}")
+        while True:
+            time = self.next_event_time
+            if time is None or time > until:
+                break
+            self.step()
+        # processes only change state at their events, so they just move their clocks
+        for process in self.processes:
+            process.advance(until)
+        self._rebalance(self.network.registry.pending_buses())
+        self._integrate(until)
+
+    def run(self, until, resolution, record=()):
+        """
+        Advance to time until and sample the state every resolution hours.
+
+        Returns a columnar dict like Network.run_timeseries: "time", "<bus>.active_balance",
+        "<bus>.reactive_balance", "<grid>.active_power", "<grid>.reactive_power",
+        "<grid>.energy" (Wh supplied since the kernel started) and the active and reactive
+        power of the components in record, each as the state at the sample time.
+        """
+        times = np.arange(self.time + resolution, until + resolution / 2, resolution)
+        buses = list(self.network.buses.values())
+        grids = list(self.network.grids)
+        components = list(record)
+        balances = np.zeros((len(times), len(buses)), dtype=complex)
+        grid_power = np.zeros((len(times), len(grids)), dtype=complex)
+        grid_energy = np.zeros((len(times), len(grids)))
+        component_power = np.zeros((len(times), len(components)), dtype=complex)
+
+        registry = self.network.registry
+        bus_indices = np.array([bus.index for bus in buses], dtype=np.intp)
+        grid_slots = np.array([grid.slot for grid in grids], dtype=np.intp)
+        slots = np.array([component.slot for component in components], dtype=np.intp)
+        for k, time in enumerate(times):
+            self.advance(time)
+            balances[k] = registry.bus_balances(len(self.network.buses))[bus_indices]
+            grid_power[k] = registry.active_power[grid_slots] + 1j * registry.reactive_power[grid_slots]
+            grid_energy[k] = [self.grid_energy[grid.id] for grid in grids]
+            component_power[k] = registry.active_power[slots] + 1j * registry.reactive_power[slots]
+        self.advance(until)
+
+        results = {"time": times}
+        for k, bus in enumerate(buses):
+            results[f"{bus.id}.active_balance"] = balances[:, k].real
+            results[f"{bus.id}.reactive_balance"] = balances[:, k].imag
+        for k, grid in enumerate(grids):
+            results[f"{grid.id}.active_power"] = grid_power[:, k].real
+            results[f"{grid.id}.reactive_power"] = grid_power[:, k].imag
+            results[f"{grid.id}.energy"] = grid_energy[:, k]
+        for k, component in enumerate(components):
+            results[f"{component.id}.active_power"] = component_power[:, k].real
+            results[f"{component.id}.reactive_power"] = component_power[:, k].imag
+        return results
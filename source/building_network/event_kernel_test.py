@@ -0,0 +1,108 @@
+import numpy as np
+
+from .bus import Bus
+from .event_kernel import EventKernel
+from .ev_charger import EVCharger
+from .ev_sessions import EVSessionManager
+from .grid import Grid
+from .load import Load
+from .network import Network
+from .print_theme import quiet
+
+STEPS = 96
+TIME_STEP = 0.25  # h
+
+
+def _network(chargers=0, ac_limit=5000.0):
+    """An AC and a DC bus with a grid and idle loads on each, plus optional EV chargers on the AC bus."""
+    with quiet():
+        network = Network()
+        ac_bus = Bus(id="AC", technology="ac")
+        dc_bus = Bus(id="DC", technology="dc", nominal_voltage=48.0)
+        network.add_bus(ac_bus)
+        network.add_bus(dc_bus)
+        network.add_components([
+            Grid(id="Grid_AC", bus=ac_bus, max_power=ac_limit),
+            Grid(id="Grid_DC", bus=dc_bus, max_power=None, technology="dc"),
+            Load(id="Kitchen", bus=ac_bus),
+            Load(id="Workshop", bus=ac_bus),
+            Load(id="Lights", bus=dc_bus, technology="dc"),
+        ])
+        network.add_components([EVCharger(id=f"EV{k}", bus=ac_bus, max_charge_power=7000.0) for k in range(chargers)])
+    return network
+
+
+def _piecewise(rng, low, high, blocks=12):
+    """A profile that holds each value for STEPS / blocks steps."""
+    return np.repeat(rng.uniform(low, high, blocks), STEPS // blocks)
+
+
+def test_kernel_matches_run_timeseries_on_piecewise_constant_profiles():
+    rng = np.random.default_rng(2)
+    profiles = {"Kitchen": _piecewise(rng, 0.0, 4000.0), "Workshop": _piecewise(rng, 0.0, 3000.0, blocks=6),
+                "Lights": _piecewise(rng, 50.0, 400.0, blocks=4)}
+    expected = _network().run_timeseries(profiles, time_step=TIME_STEP)
+
+    network = _network()
+    components = {component.id: component for component in network.components}
+    kernel = EventKernel(network)
+    # run_timeseries step k is the state after applying value k, i.e. from time (k + 1) x TIME_STEP on
+    times = np.arange(1, STEPS + 1) * TIME_STEP
+    for component_id, profile in profiles.items():
+        kernel.post_series(components[component_id], times, profile)
+    results = kernel.run(until=STEPS * TIME_STEP, resolution=TIME_STEP)
+
+    assert kernel.events_handled == 12 + 6 + 4  # one per change, not one per step
+    assert np.allclose(results["time"], times)
+    for column in ("AC.active_balance", "AC.reactive_balance", "DC.active_balance", "Grid_AC.active_power",
+                   "Grid_DC.active_power"):
+        assert np.allclose(results[column], expected[column], atol=1e-9), column
+    # the AC grid hits its limit, so the AC bus is not always balanced
+    assert np.abs(results["AC.active_balance"]).max() > 1.0
+
+    # grid power is constant between events, so the energy is a plain sum over the steps
+    power = np.concatenate(([0.0], expected["Grid_AC.active_power"][:-1]))
+    assert np.allclose(results["Grid_AC.energy"], np.cumsum(power) * TIME_STEP)
+
+
+def test_cancelled_events_are_not_applied():
+    network = _network()
+    kitchen = next(component for component in network.components if component.id == "Kitchen")
+    kernel = EventKernel(network)
+    kernel.post(1.0, kitchen, active_power=1000.0)
+    dropped = kernel.post(0.5, kitchen, active_power=9999.0)
+    kernel.cancel(dropped)
+    assert kernel.next_event_time == 1.0
+    kernel.advance(2.0)
+    assert kitchen.active_power == 1000.0 and kernel.events_handled == 1
+    assert np.isclose(kernel.grid_energy["Grid_AC"], 1000.0)
+    assert np.isclose(network.grids[0].active_power, 1000.0)
+
+
+def test_ev_sessions_run_as_a_kernel_process():
+    sessions = [{"id": f"S{k}", "arrival": 0.3 * k, "departure": 0.3 * k + 4.0, "energy_requested": 6000.0 + 500 * k}
+                for k in range(8)]
+    network = _network(chargers=3, ac_limit=None)
+    chargers = [component for component in network.components if isinstance(component, EVCharger)]
+    kernel = EventKernel(network)
+    manager = kernel.add_process(EVSessionManager(chargers))
+    manager.add_sessions(sessions)
+    results = kernel.run(until=12.0, resolution=0.5)
+
+    # an identical site on its own gives the energy the grid must have supplied
+    twin = EVSessionManager(_network(chargers=3, ac_limit=None).components[-3:])
+    twin.add_sessions(sessions)
+    drawn = twin.run(end=12.0, resolution=0.5)
+    assert np.isclose(kernel.grid_energy["Grid_AC"], drawn["power"].sum() * 0.5)
+    assert manager.summary() == twin.summary()
+    # at every sample the grid covers what the chargers draw at that moment
+    assert results["Grid_AC.active_power"].max() == 3 * 7000.0
+    assert np.allclose(results["AC.active_balance"], 0.0)
+    assert np.allclose(results["Grid_AC.reactive_power"], 0.2 * results["Grid_AC.active_power"])
+
+
+if __name__ == "__main__":
+    test_kernel_matches_run_timeseries_on_piecewise_constant_profiles()
+    test_cancelled_events_are_not_applied()
+    test_ev_sessions_run_as_a_kernel_process()
+    print("event_kernel: all tests passed")
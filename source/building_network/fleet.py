@@ -0,0 +1,183 @@
+# source/building_network/fleet.py
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from .print_theme import console
+
+
+def _open_network(source):
+    """Network from a saved directory (Network.save), a spec file or a spec dict (NetworkBuilder)."""
+    from .network import Network
+    from .network_builder import NetworkBuilder
+
+    if isinstance(source, dict):
+        return NetworkBuilder(source).build()
+    if os.path.isdir(source):
+        return Network.load(source)
+    return NetworkBuilder.from_file(source).build()
+
+
+def _resolve_profiles(mapping, shared):
+    """Per-component profiles from references to the shared profiles (see FleetRunner)."""
+    profiles = {}
+    for component_id, reference in mapping.items():
+        if isinstance(reference, str):
+            profiles[component_id] = shared[reference]
+        elif isinstance(reference, dict) and "profile" in reference:
+            profiles[component_id] = shared[reference["profile"]] * reference.get("scale", 1.0)
+        else:
+            profiles[component_id] = reference
+    return profiles
+
+
+def _simulate_building(building_id, source, mapping, memory_name, names, steps, time_step, tariff, record_components):
+    """Worker: attach the shared profiles, simulate one building and return its columns or the error."""
+    start = time.perf_counter()
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        block = np.ndarray((len(names), steps), dtype=np.float64, buffer=memory.buf)
+        shared = {name: block[row] for row, name in enumerate(names)}
+        network = _open_network(source)
+        results = network.run_timeseries(_resolve_profiles(mapping, shared), time_step=time_step,
+                                         record_components=record_components)
+        results = {column: np.array(values) for column, values in results.items()}  # no views into the block
+        grid_power = sum((results[f"{grid.id}.active_power"] for grid in network.grids), np.zeros(steps))
+        results["grid_active_power"] = grid_power
+        if tariff is not None:
+            results["grid_cost"] = grid_power * shared[tariff] * time_step
+        del block, shared
+        return building_id, results, None, time.perf_counter() - start
+    except Exception:
+        return building_id, None, traceback.format_exc(), time.perf_counter() - start
+    finally:
+        memory.close()
+
+
+class FleetResult:
+    """
+    Columns of all buildings of a fleet run in one flat store, keyed "<building>/<column>",
+    with the shared "time" axis and the outcome of every building in status.
+    """
+
+    def __init__(self, time_axis, columns, status):
+        self.time = time_axis
+        self.columns = columns
+        self.status = status  # building -> {"ok": bool, "seconds": float, "error": traceback or None}
+
+    @property
+    def failed(self):
+        return [building for building, outcome in self.status.items() if not outcome["ok"]]
+
+    def building(self, building_id):
+        """Columns of one building, without the building prefix."""
+        prefix = f"{building_id}/"
+        return {key[len(prefix):]: value for key, value in self.columns.items() if key.startswith(prefix)}
+
+    def stack(self, column):
+        """One column across the successful buildings as a (buildings, steps) array, and the building order."""
+        buildings = [building for building, outcome in self.status.items()
+                     if outcome["ok"] and f"{building}/{column}" in self.columns]
+        return np.stack([self.columns[f"{building}/{column}"] for building in buildings]), buildings
+
+    def save(self, path):
+        """Write the store as one .npy file per column plus manifest.json (loadable with np.load(mmap_mode="r"))."""
+        os.makedirs(path, exist_ok=True)
+        files = {}
+        np.save(os.path.join(path, "time.npy"), self.time)
+        for k, (key, values) in enumerate(self.columns.items()):
+            files[key] = f"column_{k}.npy"
+            np.save(os.path.join(path, files[key]), values)
+        with open(os.path.join(path, "manifest.json"), "w") as file:
+            json.dump({"columns": files, "status": self.status}, file, indent=1)
+
+
+class FleetRunner:
+    """
+    Simulates many building networks with a common time axis in a pool of processes.
+
+    Shared profiles (irradiance, temperature-driven heat pump demand, tariff, ...) are copied
+    once into a block of shared memory; workers map it instead of receiving pickled copies.
+    Each building is given as a saved network directory (Network.save), a NetworkBuilder spec
+    file or a spec dict, together with a profile mapping for Network.run_timeseries whose
+    values reference the shared profiles: a name, {"profile": name, "scale": factor}, or a
+    building-specific array.
+
+    Buildings are handed to workers one at a time, so fast and slow buildings balance across
+    the pool. A failing building is recorded with its traceback and does not stop the others.
+
+    Args:
+        shared_profiles (dict): name -> 1-D array, all of the same length.
+        time_step (float): step length in hours.
+        processes (int): worker processes, os.cpu_count() if not given.
+        tariff (str): name of a shared price profile; adds a "grid_cost" column per building.
+        record_components (bool): keep per-component columns (bus and grid columns are always kept).
+    """
+
+    def __init__(self, shared_profiles, time_step=1.0, processes=None, tariff=None, record_components=False):
+        lengths = {len(np.atleast_1d(profile)) for profile in shared_profiles.values()}
+        if len(lengths) != 1:
+            raise ValueError(f"Shared profiles must all have the same length, got lengths {sorted(lengths)}")
+        if tariff is not None and tariff not in shared_profiles:
+            raise KeyError(f"Tariff profile {tariff!r} is not a shared profile")
+        self.names = list(shared_profiles)
+        self.steps = lengths.pop()
+        self.shared_profiles = shared_profiles
+        self.time_step = time_step
+        self.processes = processes or os.cpu_count()
+        self.tariff = tariff
+        self.record_components = record_components
+        self.buildings = {}
+
+    def add_building(self, building_id, source, profiles=None):
+        if building_id in self.buildings:
+            raise ValueError(f"Building {building_id} already added")
+        self.buildings[building_id] = (source, dict(profiles or {}))
+
+    def run(self, progress=None, verbose=True):
+        """
+        Simulate every building and gather the results into a FleetResult.
+
+        progress(building_id, ok, done, total) is called as each building finishes; with
+        verbose, one console line per building is printed as well.
+        """
+        memory = shared_memory.SharedMemory(create=True, size=max(len(self.names) * self.steps * 8, 1))
+        gathered, status = {}, {}
+        try:
+            block = np.ndarray((len(self.names), self.steps), dtype=np.float64, buffer=memory.buf)
+            for row, name in enumerate(self.names):
+                block[row] = self.shared_profiles[name]
+            del block
+
+            total = len(self.buildings)
+            with ProcessPoolExecutor(max_workers=self.processes, mp_context=get_context("spawn")) as pool:
+                futures = {pool.submit(_simulate_building, building_id, source, mapping, memory.name, self.names,
+                                       self.steps, self.time_step, self.tariff, self.record_components): building_id
+                           for building_id, (source, mapping) in self.buildings.items()}
+                for future in as_completed(futures):
+                    try:
+                        building_id, results, error, seconds = future.result()
+                    except BrokenProcessPool:
+                        building_id, results, error, seconds = futures[future], None, traceback.format_exc(), 0.0
+                    status[building_id] = {"ok": error is None, "seconds": seconds, "error": error}
+                    if results is not None:
+                        gathered[building_id] = results
+                    if verbose:
+                        outcome = "[success]done[/]" if error is None else f"[error]failed: {error.strip().splitlines()[-1]}[/]"
+                        console.print(f"[{len(status)}/{total}] {building_id}: {outcome} ({seconds:.2f} s)")
+                    if progress is not None:
+                        progress(building_id, error is None, len(status), total)
+        finally:
+            memory.close()
+            memory.unlink()
+
+        columns = {f"{building_id}/{column}": values for building_id in self.buildings
+                   for column, values in gathered.get(building_id, {}).items() if column != "time"}
+        ordered = {building_id: status[building_id] for building_id in self.buildings}
+        return FleetResult(np.arange(1, self.steps + 1) * self.time_step, columns, ordered)
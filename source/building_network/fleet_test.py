@@ -0,0 +1,76 @@
+import tempfile
+
+import numpy as np
+
+from .fleet import FleetRunner, _resolve_profiles
+from .network import Network
+from .network_builder import NetworkBuilder
+
+STEPS = 48
+TIME_STEP = 0.5  # h
+
+
+def _spec(load=400.0):
+    return {
+        "buses": [{"id": "AC", "technology": "ac"}, {"id": "DC", "technology": "dc", "nominal_voltage": 48.0}],
+        "grids": [{"id": "Grid", "bus": "AC", "max_power": 8000.0}],
+        "inverters": [{"id": "Inv", "bus_input": "DC", "bus_output": "AC", "max_power": 4000.0}],
+        "components": [
+            {"type": "pv", "id": "PV", "bus": "DC", "max_power": 3000.0, "area": 18.0},
+            {"type": "load", "id": "Load", "bus": "AC", "active_power": load, "reactive_power": 40.0},
+            {"type": "storage", "id": "Battery", "bus": "DC", "capacity": 6000.0, "initial_soc": 0.5,
+             "max_charge_power": 1500.0, "max_discharge_power": 1500.0},
+        ],
+    }
+
+
+def _shared():
+    hours = np.arange(STEPS) * TIME_STEP
+    return {
+        "irradiance": np.clip(900.0 * np.sin((hours % 24 - 6) / 12 * np.pi), 0.0, None),
+        "demand": 300.0 + 150.0 * np.sin(hours / 24 * 2 * np.pi),
+        "price": 0.2 + 0.1 * (hours % 24 > 17),
+        "battery": 1200.0 * np.cos(hours / 24 * 2 * np.pi),
+    }
+
+
+def _mapping(scale):
+    return {"PV": "irradiance", "Load": {"profile": "demand", "scale": scale}, "Battery": "battery"}
+
+
+def test_fleet_matches_direct_runs_and_keeps_failures():
+    shared = _shared()
+    runner = FleetRunner(shared, time_step=TIME_STEP, processes=2, tariff="price")
+    with tempfile.TemporaryDirectory() as path:
+        NetworkBuilder(_spec(load=250.0)).build().save(path)
+        runner.add_building("saved", path, _mapping(1.0))
+        runner.add_building("spec", _spec(), _mapping(1.5))
+        broken = _spec()
+        broken["components"][0]["bus"] = "Nowhere"
+        runner.add_building("broken", broken, _mapping(1.0))
+        result = runner.run(verbose=False)
+
+        assert result.failed == ["broken"]
+        assert "NetworkSpecError" in result.status["broken"]["error"]
+        assert "Traceback" in result.status["broken"]["error"]
+        assert np.allclose(result.time, np.arange(1, STEPS + 1) * TIME_STEP)
+
+        # the same buildings run directly, in this process
+        direct = {"saved": (Network.load(path), 1.0), "spec": (NetworkBuilder(_spec()).build(), 1.5)}
+        for building, (network, scale) in direct.items():
+            profiles = _resolve_profiles(_mapping(scale), shared)
+            expected = network.run_timeseries(profiles, time_step=TIME_STEP, record_components=False)
+            columns = result.building(building)
+            for column, values in expected.items():
+                if column != "time":
+                    assert np.array_equal(columns[column], values), (building, column)
+            assert np.array_equal(columns["grid_active_power"], expected["Grid.active_power"])
+            assert np.allclose(columns["grid_cost"], expected["Grid.active_power"] * shared["price"] * TIME_STEP)
+
+    stacked, order = result.stack("grid_active_power")
+    assert order == ["saved", "spec"] and stacked.shape == (2, STEPS)
+
+
+if __name__ == "__main__":
+    test_fleet_matches_direct_runs_and_keeps_failures()
+    print("fleet: all tests passed")
@@ -1,9 +1,11 @@
 # source/building_network/grid.py
 # from .electrical_component import ElectricalComponent
 from .print_theme import *
+from .component_registry import RegistryView
+
+class Grid(RegistryView):
+    __slots__ = ("id", "bus", "max_power", "voltage", "phase_type", "technology")
 
-class Grid:
-    
     def __init__(self, id, bus, max_power=10000.0, voltage=230.0, phase_type="single", 
                  technology="ac", status="on", active_power=0.0, reactive_power=0.0):
         """
@@ -19,10 +21,10 @@ class Grid:
         - technology (str): "ac" or "dc".
         - active (bool): Whether the grid is operational.
         """
+        self._attach("grid")
         # Set Grid-specific attributes before parent init
-        self.max_power = float(max_power)
+        self.max_power = float(max_power) if max_power is not None else None  # max power supplied (W), None for unlimited
         self.voltage = voltage  # Grid enforces this voltage at the bus
-        self.max_power = 0.0  # max power supplied (W)
         self.active_power = active_power  # active power supplied (W)
         self.reactive_power = reactive_power  # reactive power supplied (VAR)
         self.status = status
@@ -39,12 +41,20 @@ class Grid:
 
     def _validate_inputs(self):
         """Validate grid parameters."""
-        if self.max_power < 0:
+        if self.max_power is not None and self.max_power < 0:
             raise ValueError(f"max_power must be non-negative, got {self.max_power}")
-        if isinstance(self.voltage, tuple) and self.technology == "dc":
-            raise ValueError("DC grid must have a single voltage, not a tuple")
-        if isinstance(self.voltage, tuple) and self.phase_type != "three":
-            raise ValueError("Tuple voltage is only valid for three-phase grids")
+        error = self._voltage_error(self.voltage, self.technology, self.phase_type)
+        if error:
+            raise ValueError(error)
+
+    @staticmethod
+    def _voltage_error(voltage, technology, phase_type):
+        """Problem with the shape of a grid voltage, or None; shared with NetworkBuilder.validate."""
+        if isinstance(voltage, (tuple, list)) and technology == "dc":
+            return "DC grid must have a single voltage, not a tuple"
+        if isinstance(voltage, (tuple, list)) and phase_type != "three":
+            return "Tuple voltage is only valid for three-phase grids"
+        return None
 
     def supply_power(self, required_power):
         if self.status == "off":
@@ -97,12 +107,18 @@ class Grid:
 
     def get_status(self):
         """Return grid status."""
-        base_status = super().get_status()
-        base_status.update({
+        return {
+            "id": self.id,
+            "bus": self.bus.id,
+            "active": self.status,
+            "phase_type": self.phase_type,
+            "type": self.type,
+            "technology": self.technology,
+            "active_power": self.active_power,
+            "reactive_power": self.reactive_power if self.technology == "ac" else None,
             "max_power": self.max_power,
             "voltage": self.voltage
-        })
-        return base_status
+        }
 
         
     
\ No newline at end of file
@@ -2,8 +2,10 @@
 from .electrical_component import ElectricalComponent
 
 class HeatPump(ElectricalComponent):
+    __slots__ = ("rated_power", "cop", "mode")
+
     def __init__(self, id, bus, rated_power=2000.0, cop=3.0, mode="heating", 
-                 phase_type="single", technology="ac", voltage_rating=None, status="on"):
+                 phase_type="single", technology="ac", voltage_rating=None, status="on", phase=None):
         """
         Initialize a heat pump for heating or cooling.
         
@@ -17,14 +19,13 @@ class HeatPump(ElectricalComponent):
         - technology (str): "ac" (typical) or "dc".
         - voltage_rating (float or tuple): Rated voltage (e.g., 230V for AC).
         - active (bool): Whether the heat pump is operational.
+        - phase (str): "a", "b" or "c" for a single-phase device on a three-phase bus.
         """
         self.rated_power = float(rated_power)
         self.cop = float(cop)
         self.mode = mode.lower()
         super().__init__(id, bus, phase_type=phase_type, type="heat_pump", technology=technology, 
-                         voltage_rating=voltage_rating, status=status)
-
-        self._validate_inputs()
+                         voltage_rating=voltage_rating, status=status, phase=phase)
 
     def _validate_inputs(self):
         """Validate heat pump parameters."""
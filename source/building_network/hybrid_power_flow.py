@@ -0,0 +1,182 @@
+# source/building_network/hybrid_power_flow.py
+import numpy as np
+
+from .power_flow import PowerFlowSolver, _nominal
+
+
+class HybridPowerFlowSolver:
+    """
+    Sequential AC/DC load flow across Inverter links.
+
+    DC bus subnetworks are solved with a DC nodal (resistive) load flow and AC subnetworks with
+    the AC load flow; inverters couple them with their efficiency and max_power. Inverters
+    with control="power" keep the input power set with set_input_power. Inverters with
+    control="balance" carry whatever their DC island needs when it has no DC grid (holding the
+    DC voltage of their DC bus), or feed an AC island that has no grid (holding its AC
+    voltage). Several balancing inverters of one island share its power in proportion to
+    max_power. The DC and AC solves alternate until the converter powers change by less than
+    the tolerance. Converter updates are vectorised over all converters.
+    """
+
+    def __init__(self, network, tolerance=1e-3, max_iterations=20):
+        self.network = network
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.ac_solver = PowerFlowSolver(network, tolerance=tolerance, max_iterations=max_iterations, technology="ac")
+        self.dc_solver = PowerFlowSolver(network, tolerance=tolerance, max_iterations=max_iterations, technology="dc")
+
+    def _converters(self):
+        """Active AC/DC inverters, with arrays of their parameters."""
+        converters = [inverter for inverter in self.network.inverters
+                      if inverter.status == "on" and inverter.input_technology != inverter.output_technology]
+        dc_is_input = np.array([inverter.input_technology == "dc" for inverter in converters], dtype=bool)
+        efficiency = np.array([inverter.efficiency for inverter in converters], dtype=float)
+        max_power = np.array([inverter.max_power for inverter in converters], dtype=float)
+        return converters, dc_is_input, efficiency, max_power
+
+    @staticmethod
+    def _dc_bus(converter, dc_is_input):
+        return converter.bus_input if dc_is_input else converter.bus_output
+
+    @staticmethod
+    def _ac_bus(converter, dc_is_input):
+        return converter.bus_output if dc_is_input else converter.bus_input
+
+    def _set_converter_power(self, converters, dc_is_input, efficiency, max_power, dc_power):
+        """
+        Set converter powers from the power each injects into its DC bus (> 0: AC to DC).
+        Returns the (clipped) DC powers and a mask of converters at their limit.
+        """
+        registry = self.network.registry
+        limited = np.abs(dc_power) > max_power
+        dc_power = np.clip(dc_power, -max_power, max_power)
+        # AC side draws more than it delivers to DC, and receives less than DC gives up
+        ac_power = np.where(dc_power >= 0, -dc_power / efficiency, -dc_power * efficiency)
+        # input power is drawn from the input bus, output power injected into the output bus
+        input_power = np.where(dc_is_input, -dc_power, -ac_power)
+        output_power = np.where(dc_is_input, ac_power, dc_power)
+        input_slots = np.array([converter._slot for converter in converters], dtype=np.intp)
+        output_slots = np.array([converter._output_slot for converter in converters], dtype=np.intp)
+        registry.active_power[input_slots] = input_power
+        registry.active_power[output_slots] = output_power
+        registry.reactive_power[input_slots[dc_is_input]] = 0.0
+        registry.reactive_power[output_slots[~dc_is_input]] = 0.0
+        registry.mark_dirty(np.concatenate((input_slots, output_slots)))
+        return dc_power, limited
+
+    def _dc_power(self, converters, dc_is_input):
+        """Power each converter currently injects into its DC bus."""
+        return np.array([converter.bus_injection("input" if is_input else "output")[0]
+                         for converter, is_input in zip(converters, dc_is_input)], dtype=float)
+
+    def _ac_power(self, converters, dc_is_input):
+        return np.array([complex(*converter.bus_injection("output" if is_input else "input"))
+                         for converter, is_input in zip(converters, dc_is_input)], dtype=complex)
+
+    def _roles(self, converters, dc_is_input):
+        """
+        Which balancing converters hold the DC side and which the AC side of their islands.
+        Returns (dc_slack mask, ac_slack mask, dc island label, ac island label).
+        """
+        network = self.network
+        # lines only join buses of one technology, so line islands are AC or DC islands
+        island = network.line_topology.labels()
+        grid_islands = {island[grid.bus.index] for grid in network.grids if grid.status == "on"}
+
+        balancing = np.array([converter.control == "balance" for converter in converters], dtype=bool)
+        dc_island = np.array([island[self._dc_bus(c, i).index] for c, i in zip(converters, dc_is_input)], dtype=int)
+        ac_island = np.array([island[self._ac_bus(c, i).index] for c, i in zip(converters, dc_is_input)], dtype=int)
+        dc_slack = balancing & ~np.isin(dc_island, list(grid_islands))
+        ac_slack = balancing & ~dc_slack & ~np.isin(ac_island, list(grid_islands))
+        return dc_slack, ac_slack, dc_island, ac_island
+
+    @staticmethod
+    def _references(mask, island, max_power):
+        """First converter of each island holds the voltage; share of each converter in its island."""
+        reference = np.zeros(len(mask), dtype=bool)
+        share = np.zeros(len(mask))
+        for label in np.unique(island[mask]):
+            members = np.flatnonzero(mask & (island == label))
+            reference[members[0]] = True
+            share[members] = max_power[members] / max_power[members].sum()
+        return reference, share
+
+    @staticmethod
+    def _shared(total_by_island, island, share, mask):
+        power = np.zeros(len(mask), dtype=total_by_island.dtype)
+        for k in np.flatnonzero(mask):
+            power[k] = total_by_island[island[k]] * share[k]
+        return power
+
+    def solve(self):
+        """Alternate DC and AC load flows to a consistent converter operating point."""
+        for solver in (self.ac_solver, self.dc_solver):
+            solver.tolerance, solver.max_iterations = self.tolerance, self.max_iterations
+        converters, dc_is_input, efficiency, max_power = self._converters()
+        dc_slack, ac_slack, dc_island, ac_island = self._roles(converters, dc_is_input)
+        dc_reference, dc_share = self._references(dc_slack, dc_island, max_power)
+        ac_reference, ac_share = self._references(ac_slack, ac_island, max_power)
+        sides = ["input" if is_input else "output" for is_input in dc_is_input]
+        ac_sides = ["output" if is_input else "input" for is_input in dc_is_input]
+
+        dc_power = self._dc_power(converters, dc_is_input)
+        limited = np.zeros(len(converters), dtype=bool)
+        converged, iterations = False, 0
+        while not converged and iterations < self.max_iterations:
+            previous = dc_power.copy()
+
+            # DC side: reference converters hold their DC bus voltage; the island's need is shared
+            dc_result = self.dc_solver.solve(
+                slack_voltages={self._dc_bus(c, i).id: _nominal(self._dc_bus(c, i).nominal_voltage)
+                                for c, i, ref in zip(converters, dc_is_input, dc_reference) if ref},
+                exclude=[(c, side) for c, side, ref in zip(converters, sides, dc_reference) if ref])
+            if dc_slack.any():
+                total = np.zeros(dc_island.max() + 1)
+                for k in np.flatnonzero(dc_slack):
+                    if dc_reference[k]:
+                        total[dc_island[k]] += dc_result["slack_power"][self._dc_bus(converters[k], dc_is_input[k]).id]
+                    else:
+                        total[dc_island[k]] += dc_power[k]
+                dc_power = np.where(dc_slack, self._shared(total, dc_island, dc_share, dc_slack), dc_power)
+                dc_power, limited_dc = self._set_converter_power(converters, dc_is_input, efficiency, max_power, dc_power)
+                limited |= limited_dc & dc_slack
+
+            # AC side: converters feeding grid-less AC islands hold their AC bus voltage
+            ac_result = self.ac_solver.solve(
+                slack_voltages={self._ac_bus(c, i).id: _nominal(self._ac_bus(c, i).nominal_voltage)
+                                for c, i, ref in zip(converters, dc_is_input, ac_reference) if ref},
+                exclude=[(c, side) for c, side, ref in zip(converters, ac_sides, ac_reference) if ref])
+            if ac_slack.any():
+                ac_power = self._ac_power(converters, dc_is_input)
+                total = np.zeros(ac_island.max() + 1, dtype=complex)
+                for k in np.flatnonzero(ac_slack):
+                    if ac_reference[k]:
+                        total[ac_island[k]] += ac_result["slack_power"][self._ac_bus(converters[k], dc_is_input[k]).id]
+                    else:
+                        total[ac_island[k]] += ac_power[k]
+                ac_power = self._shared(total, ac_island, ac_share, ac_slack)
+                # AC injection back to the DC power that produces it
+                ac_dc_power = np.where(ac_power.real >= 0, -ac_power.real / efficiency, -ac_power.real * efficiency)
+                dc_power = np.where(ac_slack, ac_dc_power, dc_power)
+                dc_power, limited_ac = self._set_converter_power(converters, dc_is_input, efficiency, max_power, dc_power)
+                limited |= limited_ac & ac_slack
+                # the grid-forming converters also supply the island's reactive power
+                registry = self.network.registry
+                for k in np.flatnonzero(ac_slack):
+                    slot = converters[k]._output_slot if dc_is_input[k] else converters[k]._slot
+                    # output slots inject, input slots draw
+                    registry.reactive_power[slot] = ac_power[k].imag if dc_is_input[k] else -ac_power[k].imag
+                    registry.touch(slot)
+
+            iterations += 1
+            converged = (not len(converters) or np.max(np.abs(dc_power - previous)) < self.tolerance) \
+                and dc_result["converged"] and ac_result["converged"]
+
+        return {
+            "converged": converged,
+            "iterations": iterations,
+            "dc": dc_result,
+            "ac": ac_result,
+            "converter_dc_power": {c.id: float(p) for c, p in zip(converters, dc_power)},
+            "limited_converters": [c.id for c, hit in zip(converters, limited) if hit],
+        }
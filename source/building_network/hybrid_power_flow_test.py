@@ -0,0 +1,98 @@
+import numpy as np
+
+from .bus import Bus
+from .grid import Grid
+from .inverter import Inverter
+from .line import Line
+from .load import Load
+from .network import Network
+from .print_theme import quiet
+from .pv import PV
+
+
+def _dc_surplus_network():
+    """PV on a grid-less DC island exporting through two balancing inverters to an AC grid bus."""
+    with quiet():
+        network = Network()
+        dc_pv = Bus(id="DC_PV", technology="dc", nominal_voltage=48.0)
+        dc_link = Bus(id="DC_Link", technology="dc", nominal_voltage=48.0)
+        ac_bus = Bus(id="AC", technology="ac", nominal_voltage=230.0)
+        for bus in (dc_pv, dc_link, ac_bus):
+            network.add_bus(bus)
+        network.add_components([
+            Grid(id="Grid", bus=ac_bus, max_power=None),
+            Line(id="DC_Line", bus_from=dc_pv, bus_to=dc_link, resistance=0.01, technology="dc"),
+            PV(id="PV", bus=dc_pv, max_power=5000.0, area=20.0),
+            Load(id="DC_Load", bus=dc_link, active_power=300.0, technology="dc"),
+            Load(id="AC_Load", bus=ac_bus, active_power=1000.0, reactive_power=100.0),
+            Inverter(id="Inv_Big", bus_input=dc_link, bus_output=ac_bus, efficiency=0.95, max_power=4000.0),
+            Inverter(id="Inv_Small", bus_input=dc_link, bus_output=ac_bus, efficiency=0.95, max_power=2000.0),
+        ])
+    network.components[0].generate_power(800.0)  # 2880 W
+    return network
+
+
+def _ac_island_network(load=1500.0):
+    """A grid-less AC island behind one balancing inverter fed from a DC grid."""
+    with quiet():
+        network = Network()
+        dc_bus = Bus(id="DC", technology="dc", nominal_voltage=400.0)
+        ac_head = Bus(id="AC_Head", technology="ac", nominal_voltage=230.0)
+        ac_end = Bus(id="AC_End", technology="ac", nominal_voltage=230.0)
+        for bus in (dc_bus, ac_head, ac_end):
+            network.add_bus(bus)
+        network.add_components([
+            Grid(id="DC_Grid", bus=dc_bus, max_power=None, voltage=400.0, technology="dc"),
+            Line(id="AC_Line", bus_from=ac_head, bus_to=ac_end, resistance=0.1, reactance=0.05),
+            Load(id="AC_Load", bus=ac_end, active_power=load, reactive_power=0.2 * load),
+            Inverter(id="Inv", bus_input=dc_bus, bus_output=ac_head, efficiency=0.9, max_power=3000.0),
+        ])
+    return network
+
+
+def test_dc_surplus_reaches_the_ac_bus_through_both_inverters():
+    network = _dc_surplus_network()
+    result = network.solve_hybrid_power_flow(tolerance=1e-6)
+    assert result["converged"]
+
+    dc_power = result["converter_dc_power"]
+    dc_losses = result["dc"]["losses"]
+    # the DC island balances: PV - DC load - line losses leaves through the converters
+    assert np.isclose(-(dc_power["Inv_Big"] + dc_power["Inv_Small"]), 2880.0 - 300.0 - dc_losses, atol=1e-4)
+    # shared in proportion to max_power
+    assert np.isclose(dc_power["Inv_Big"], 2 * dc_power["Inv_Small"])
+    # the AC side receives it after the conversion losses, and the grid covers the rest
+    inverters = {inverter.id: inverter for inverter in network.inverters}
+    delivered = sum(inverter.output_active_power for inverter in inverters.values())
+    assert np.isclose(delivered, 0.95 * (2880.0 - 300.0 - dc_losses), atol=1e-4)
+    assert np.isclose(network.grids[0].active_power, 1000.0 - delivered, atol=1e-4)
+    assert not result["limited_converters"]
+
+
+def test_grid_less_ac_island_is_fed_from_the_dc_grid():
+    network = _ac_island_network()
+    result = network.solve_hybrid_power_flow(tolerance=1e-6)
+    assert result["converged"]
+    assert result["iterations"] <= 3
+
+    inverter = network.inverters[0]
+    line = network.lines[0]
+    # the converter supplies the load and the AC line losses; the DC grid supplies it plus conversion losses
+    assert np.isclose(inverter.output_active_power, 1500.0 + line.power_loss.real, atol=1e-4)
+    assert np.isclose(inverter.output_reactive_power, 300.0 + line.power_loss.imag, atol=1e-4)
+    assert np.isclose(network.grids[0].active_power, inverter.output_active_power / 0.9, atol=1e-4)
+    assert np.isclose(abs(network.buses["AC_Head"].voltage), 230.0)
+
+
+def test_converters_are_clipped_at_max_power():
+    network = _ac_island_network(load=5000.0)
+    result = network.solve_hybrid_power_flow(tolerance=1e-6)
+    assert result["limited_converters"] == ["Inv"]
+    assert np.isclose(abs(result["converter_dc_power"]["Inv"]), 3000.0)
+
+
+if __name__ == "__main__":
+    test_dc_surplus_reaches_the_ac_bus_through_both_inverters()
+    test_grid_less_ac_island_is_fed_from_the_dc_grid()
+    test_converters_are_clipped_at_max_power()
+    print("hybrid_power_flow: all tests passed")
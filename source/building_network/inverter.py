@@ -1,10 +1,16 @@
 # source/building_network/inverter.py
-from .electrical_component import ElectricalComponent
+from .electrical_component import ElectricalComponent, validation_deferred
+from .component_registry import STATUS_CODES, STATUS_NAMES, TYPE_CODES
 # from .print_theme import *
 
 class Inverter(ElectricalComponent):
+    # input power lives in the inverter's registry slot (drawn from bus_input), output power in a
+    # second slot injecting into bus_output
+    __slots__ = ("bus_input", "bus_output", "input_technology", "output_technology", "efficiency",
+                 "max_power", "control", "_output_slot")
+
     def __init__(self, id, bus_input, bus_output, input_technology="dc", output_technology="ac", 
-                 efficiency=0.95, max_power=10000.0, status="on"):
+                 efficiency=0.95, max_power=10000.0, status="on", control="balance"):
         """
         Initialize a generic inverter connecting two buses with configurable technologies.
         
@@ -17,6 +23,8 @@ class Inverter(ElectricalComponent):
         - efficiency (float): Power conversion efficiency (0 to 1).
         - max_power (float): Maximum power throughput in watts.
         - active (bool): Whether the inverter is operational.
+        - control (str): "power" keeps the input power set with set_input_power in load flows;
+          "balance" lets the hybrid load flow set it to balance a DC island or a grid-less AC island.
         """
         # Initialize base class with input bus as the primary bus
         super().__init__(id, bus_input, phase_type="single", type="inverter",  status=status)
@@ -26,6 +34,7 @@ class Inverter(ElectricalComponent):
         self.output_technology = output_technology.lower()
         self.efficiency = efficiency
         self.max_power = max_power
+        self.control = control.lower()
         
         # if self.phase_type =="three":
         #     self.bus_input.nodes=['A', 'B', 'C']
@@ -34,7 +43,69 @@ class Inverter(ElectricalComponent):
         self.input_reactive_power = 0.0  # Reactive power on input side (VAR)
         self.output_active_power = 0.0  # Active power on output side (W)
         self.output_reactive_power = 0.0  # Reactive power on output side (VAR)
-        self._validate_technologies()
+        if not validation_deferred():
+            self._validate_technologies()
+
+    def _attach(self, type_name):
+        super()._attach(type_name)
+        self._output_slot = self._registry.allocate(TYPE_CODES["inverter"], sign=1)
+
+    def _registry_slots(self):
+        return [("_slot", self.bus_input), ("_output_slot", self.bus_output)]
+
+    @property
+    def status(self):
+        return STATUS_NAMES[int(self._registry.status[self._slot])]
+
+    @status.setter
+    def status(self, value):
+        ElectricalComponent.status.fset(self, value)
+        self._registry.status[self._output_slot] = STATUS_CODES[value]
+        self._registry.touch(self._output_slot)
+
+    @property
+    def input_active_power(self):
+        return float(self._registry.active_power[self._slot])
+
+    @input_active_power.setter
+    def input_active_power(self, value):
+        self._registry.active_power[self._slot] = value
+        self._registry.touch(self._slot)
+
+    @property
+    def input_reactive_power(self):
+        return float(self._registry.reactive_power[self._slot])
+
+    @input_reactive_power.setter
+    def input_reactive_power(self, value):
+        self._registry.reactive_power[self._slot] = value
+        self._registry.touch(self._slot)
+
+    @property
+    def output_active_power(self):
+        return float(self._registry.active_power[self._output_slot])
+
+    @output_active_power.setter
+    def output_active_power(self, value):
+        self._registry.active_power[self._output_slot] = value
+        self._registry.touch(self._output_slot)
+
+    @property
+    def output_reactive_power(self):
+        return float(self._registry.reactive_power[self._output_slot])
+
+    @output_reactive_power.setter
+    def output_reactive_power(self, value):
+        self._registry.reactive_power[self._output_slot] = value
+        self._registry.touch(self._output_slot)
+
+    def bus_injection(self, side="input"):
+        """Power into the given bus side: the input power is drawn, the output power injected."""
+        if self.status == "off":
+            return 0.0, 0.0
+        if side == "input":
+            return -self.input_active_power, -self.input_reactive_power
+        return self.output_active_power, self.output_reactive_power
 
     def _validate_technologies(self):
         """Validate input and output technologies."""
@@ -43,6 +114,8 @@ class Inverter(ElectricalComponent):
             raise ValueError(f"input_technology must be one of {valid_technologies}, got {self.input_technology}")
         if self.output_technology not in valid_technologies:
             raise ValueError(f"output_technology must be one of {valid_technologies}, got {self.output_technology}")
+        if self.control not in {"power", "balance"}:
+            raise ValueError(f"control must be 'power' or 'balance', got {self.control}")
         # Phase type validation for AC sides
         if (self.input_technology == "ac" or self.output_technology == "ac") and self.phase_type not in {"single", "three"}:
             raise ValueError("AC sides require phase_type 'single' or 'three'")
@@ -58,9 +131,12 @@ class Inverter(ElectricalComponent):
         elif reactive_power != 0:
             raise ValueError("DC input cannot have reactive power")
         
-        # Calculate output active power with efficiency
-        direction = 1 if active_power >= 0 else -1  # Preserve power flow direction
-        self.output_active_power = self.input_active_power * self.efficiency * direction
+        # Calculate output active power with efficiency; negative input power is reverse flow,
+        # where the output side supplies the input side and the losses
+        if active_power >= 0:
+            self.output_active_power = self.input_active_power * self.efficiency
+        else:
+            self.output_active_power = self.input_active_power / self.efficiency
         
         # Reactive power on output depends on technology and control
         if self.output_technology == "ac":
@@ -113,7 +189,8 @@ class Inverter(ElectricalComponent):
             "output_active_power": self.output_active_power,
             "output_reactive_power": self.output_reactive_power if self.output_technology == "ac" else None,
             "efficiency": self.efficiency,
-            "max_power": self.max_power
+            "max_power": self.max_power,
+            "control": self.control
         })
         return base_status
 
@@ -0,0 +1,88 @@
+import time
+
+import numpy as np
+
+from .bus import Bus
+from .energy_storage import EnergyStorage
+from .ev_charger import EVCharger
+from .kernels import HAVE_NUMBA, soc_trajectories
+from .print_theme import quiet
+
+
+def _batch(rng, devices=40, steps=200):
+    """Random setpoints well beyond the limits, so both power and capacity clipping occur."""
+    return {
+        "setpoint": rng.uniform(-6000.0, 6000.0, (devices, steps)) * (rng.random((devices, steps)) > 0.1),
+        "soc": rng.uniform(0.0, 1.0, devices),
+        "capacity": rng.uniform(2000.0, 20000.0, devices),
+        "max_charge_power": rng.uniform(1000.0, 5000.0, devices),
+        "max_discharge_power": rng.uniform(1000.0, 5000.0, devices),
+        "efficiency": rng.uniform(0.8, 1.0, devices),
+    }
+
+
+def test_numpy_kernel_matches_the_loop_bit_for_bit():
+    batch = _batch(np.random.default_rng(7))
+    power, soc = soc_trajectories(**batch, time_step=0.25, method="python")
+    methods = ["numpy", "compiled"] if HAVE_NUMBA else ["numpy"]
+    for method in methods:
+        other_power, other_soc = soc_trajectories(**batch, time_step=0.25, method=method)
+        assert np.array_equal(power, other_power), method
+        assert np.array_equal(soc, other_soc), method
+    # the limits are reached
+    assert (soc == 0).any() and (soc == 1).any()
+    assert np.isclose(np.abs(power).max(), max(batch["max_charge_power"].max(), batch["max_discharge_power"].max()))
+    # and the input SOC is not modified
+    assert np.array_equal(batch["soc"], _batch(np.random.default_rng(7))["soc"])
+
+
+def _step_by_step(device, setpoints, time_step):
+    power, soc = [], []
+    for setpoint in setpoints:
+        if setpoint >= 0:
+            realised = device.charge(setpoint, time_step)
+        else:
+            realised = -device.discharge(-setpoint, time_step)
+        power.append(realised)
+        soc.append(device.soc)
+    return np.array(power), np.array(soc)
+
+
+def test_run_batch_matches_repeated_charge_and_discharge():
+    rng = np.random.default_rng(3)
+    setpoints = rng.uniform(-4000.0, 4000.0, (3, 120))
+    with quiet():
+        bus = Bus(id="AC", technology="ac")
+
+        def storages():
+            return [EnergyStorage(id=f"S{k}", bus=bus, capacity=5000.0 * (k + 1), initial_soc=0.3 * k,
+                                  max_charge_power=2500.0, max_discharge_power=2000.0, efficiency=0.9) for k in range(3)]
+
+        def chargers():
+            return [EVCharger(id=f"EV{k}", bus=bus, max_charge_power=3000.0, max_discharge_power=2500.0,
+                              ev_capacity=8000.0 * (k + 1), initial_soc=0.2 + 0.3 * k) for k in range(3)]
+
+        for make, sign in ((storages, -1.0), (chargers, 1.0)):
+            batch, reference = make(), make()
+            power, soc = type(batch[0]).run_batch(batch, setpoints, time_step=0.5)
+            for k, device in enumerate(reference):
+                expected_power, expected_soc = _step_by_step(device, setpoints[k], 0.5)
+                assert np.array_equal(power[k], expected_power)
+                assert np.array_equal(soc[k], expected_soc)
+                assert batch[k].soc == device.soc
+                assert batch[k].active_power == sign * expected_power[-1]
+
+            single = make()[1]
+            single_power, single_soc = single.run_setpoints(setpoints[1], time_step=0.5)
+            assert np.array_equal(single_power, power[1]) and np.array_equal(single_soc, soc[1])
+
+
+if __name__ == "__main__":
+    test_numpy_kernel_matches_the_loop_bit_for_bit()
+    test_run_batch_matches_repeated_charge_and_discharge()
+    large = _batch(np.random.default_rng(0), devices=1000, steps=8760)
+    for method in ["numpy", "compiled"] if HAVE_NUMBA else ["numpy"]:
+        start = time.perf_counter()
+        soc_trajectories(**large, method=method)
+        print(f"1,000 devices x 8760 steps ({method}): {time.perf_counter() - start:.2f} s")
+    print("kernels: all tests passed")
@@ -1,10 +1,11 @@
 # source/building_network/line.py
+import numpy as np
 from .bus import Bus
 from .electrical_component import ElectricalComponent
 
 class Line:
     def __init__(self, id, bus_from, bus_to, length=1.0, resistance=0.01, reactance=0.0, 
-                 phase_type="single", technology="ac"):
+                 phase_type="single", technology="ac", status="on", impedance_matrix=None):
         """
         Initialize an electrical line connecting two buses.
         
@@ -17,6 +18,9 @@ class Line:
         - reactance (float): Reactance in ohms per phase (AC only, default 0Ω).
         - phase_type (str): "single" or "three" for AC; "single" for DC.
         - technology (str): "ac" or "dc".
+        - status (str): "on" or "off"; an open line is left out of the load flow.
+        - impedance_matrix (3x3 array): Phase impedance matrix in ohms of a three-phase line,
+          including mutual coupling; defaults to resistance + j reactance on each phase.
         """
         self.id = id
         self.bus_from = bus_from
@@ -26,12 +30,21 @@ class Line:
         self.reactance = float(reactance) if technology == "ac" else 0.0
         self.phase_type = phase_type.lower()
         self.technology = technology.lower()
+        self.impedance_matrix = None if impedance_matrix is None else np.asarray(impedance_matrix, dtype=complex)
+        self._network = None  # set by Network.add_component
+        self._status = status
+        # load-flow results, set by PowerFlowSolver.solve
+        self.current = None  # current from bus_from to bus_to (A)
+        self.power_from = None  # power entering at bus_from (VA)
+        self.power_to = None  # power entering at bus_to (VA)
+        self.power_loss = None  # power_from + power_to (VA)
         self._validate_inputs()
 
     def _validate_inputs(self):
         """Validate line parameters."""
         valid_technologies = {"ac", "dc"}
         valid_phase_types = {"single", "three"}
+        valid_statuses = {"on", "off"}
         
         if not isinstance(self.bus_from, Bus) or not isinstance(self.bus_to, Bus):
             raise ValueError("bus_from and bus_to must be Bus instances")
@@ -39,6 +52,8 @@ class Line:
             raise ValueError(f"technology must be one of {valid_technologies}, got {self.technology}")
         if self.phase_type not in valid_phase_types:
             raise ValueError(f"phase_type must be one of {valid_phase_types}, got {self.phase_type}")
+        if self.status not in valid_statuses:
+            raise ValueError(f"status must be one of {valid_statuses}, got {self.status}")
         if self.technology == "dc" and self.phase_type == "three":
             raise ValueError("DC lines cannot be three-phase")
         if self.technology == "dc" and self.reactance != 0:
@@ -49,17 +64,54 @@ class Line:
             raise ValueError(f"Resistance must be non-negative, got {self.resistance}")
         if self.reactance < 0:
             raise ValueError(f"Reactance must be non-negative, got {self.reactance}")
+        error = self._impedance_matrix_error(self.impedance_matrix, self.phase_type)
+        if error:
+            raise ValueError(error)
         if self.bus_from.technology != self.technology or self.bus_to.technology != self.technology:
             raise ValueError("Line technology must match both buses")
         if self.bus_from.phase_type != self.phase_type or self.bus_to.phase_type != self.phase_type:
             raise ValueError("Line phase_type must match both buses")
 
+    @staticmethod
+    def _impedance_matrix_error(impedance_matrix, phase_type):
+        """Problem with an impedance matrix, or None; shared with NetworkBuilder.validate."""
+        if impedance_matrix is None:
+            return None
+        if phase_type != "three":
+            return "impedance_matrix is only valid for three-phase lines"
+        try:
+            shape = np.asarray(impedance_matrix, dtype=complex).shape
+        except (TypeError, ValueError):
+            return "impedance_matrix must be a 3x3 array of numbers"
+        if shape != (3, 3):
+            return f"impedance_matrix must be 3x3, got shape {shape}"
+        return None
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        if value not in {"on", "off"}:
+            raise ValueError(f"status must be one of {{'on', 'off'}}, got {value}")
+        changed = value != self._status
+        self._status = value
+        if changed and self._network is not None:
+            self._network.topology_changed(self)
+
     def get_impedance(self):
         """Return the line impedance (R + jX for AC, R for DC)."""
         if self.technology == "dc":
             return self.resistance
         return complex(self.resistance, self.reactance)
     
+    def get_impedance_matrix(self):
+        """Return the 3x3 phase impedance matrix of a three-phase line."""
+        if self.impedance_matrix is not None:
+            return self.impedance_matrix
+        return np.eye(3) * self.get_impedance()
+
     def connect_to_bus(self,bus, side=None):
         """Connect the line to the two buses."""
         self.bus = bus
@@ -95,5 +147,7 @@ class Line:
             "reactance": self.reactance if self.technology == "ac" else None,
             "phase_type": self.phase_type,
             "technology": self.technology,
+            "status": self.status,
+            "impedance_matrix": self.impedance_matrix,
             "impedance": self.get_impedance()
         }
\ No newline at end of file
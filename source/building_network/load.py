@@ -1,21 +1,23 @@
 from .electrical_component import ElectricalComponent
 
 class Load (ElectricalComponent):
+    __slots__ = ("flexibility_type", "max_shiftable_time")
+
     def __init__(self, id, bus, active_power=0.0, reactive_power=0.0, status="on", flexibility_type= "nonshiftable", max_shiftable_time=0.0,technology="ac", phase_type="single",
-                 voltage_rating=None):
+                 voltage_rating=None, phase=None):
         """
         Initialize a generic load connected to a bus.
         
         Parameters:
         - flexibility_type (str): Type of load flexibility (e.g., "shiftable", "nonshiftable").
         - max_shiftable_time (float): Maximum flexibility in minutes for shiftabel loads.
+        - phase (str): "a", "b" or "c" for a single-phase load on a three-phase bus.
         """
         self.flexibility_type = flexibility_type.lower()
         self.max_shiftable_time = max_shiftable_time
         
         super().__init__(id, bus, type="load", active_power=active_power, reactive_power=reactive_power, status=status.lower(), technology=technology.lower(), 
-                         voltage_rating=voltage_rating, phase_type=phase_type.lower())
-        self._validate_inputs()
+                         voltage_rating=voltage_rating, phase_type=phase_type.lower(), phase=phase)
         
     def _validate_inputs(self):
         if self.active_power < 0:
@@ -1,11 +1,24 @@
 # source/building_network/network.py
 import networkx as nx
 import matplotlib.pyplot as plt
+import numpy as np
+import scipy.sparse as sp
 from .bus import Bus
 from .electrical_component import ElectricalComponent
 from .inverter import Inverter
 from .line import Line
 from .grid import Grid
+from .pv import PV
+from .load import Load
+from .heat_pump import HeatPump
+from .energy_storage import EnergyStorage
+from .ev_charger import EVCharger
+from .component_registry import ComponentRegistry, STATUS_CODES, FREE_SLOT
+from .kernels import soc_trajectories
+from .power_flow import PowerFlowSolver
+from .hybrid_power_flow import HybridPowerFlowSolver
+from .three_phase_power_flow import ThreePhasePowerFlowSolver
+from .topology_index import TopologyIndex
 from .print_theme import *
 
 class Network:
@@ -15,14 +28,26 @@ class Network:
         self.components = []
         self.inverters = []
         self.lines = []  # New list for lines
+        self.grids = []
+        self.registry = ComponentRegistry()  # power, status, type and bus index of all components and grids
+        self.topology_version = 0  # bumped on every change of buses, lines or inverters
+        self._power_flow_solvers = {}  # kept so their factorisations are reused between calls
+        self.topology = TopologyIndex(self)  # islands through lines and inverters
+        self.line_topology = TopologyIndex(self, through_inverters=False)  # load-flow islands
         print_message_network("Initialized an empty network")
-        print("+------------------------------------+")
+        print_message_network("+------------------------------------+")
 
     def add_bus(self, bus):
         """Add a bus to the network."""
         if not isinstance(bus, Bus):
             raise ValueError("Must be an instance of Bus")
+        bus.index = self.buses[bus.id].index if bus.id in self.buses else len(self.buses)
+        bus.registry = self.registry
+        self.registry.ensure_buses(bus.index + 1)
         self.buses[bus.id] = bus
+        self.topology.add_bus(bus)
+        self.line_topology.add_bus(bus)
+        self.topology_version += 1
         # print(f"Added bus {bus.id} to network")
         print_message_network(f"Added bus {bus.id} to network")
 
@@ -34,19 +59,29 @@ class Network:
             self.inverters.append(component)
             self.buses[component.bus_input.id].connect_component(component, side="input")
             self.buses[component.bus_output.id].connect_component(component, side="output")
+            self.registry.adopt(component)
+            self.topology.add_connection(component)
+            self.topology_version += 1
         elif isinstance(component, Line):
             if component.bus_from.id not in self.buses or component.bus_to.id not in self.buses:
                 raise ValueError("Both line buses must be added to the network first")
             self.lines.append(component)
             self.buses[component.bus_from.id].connect_component(component, side="from")
             self.buses[component.bus_to.id].connect_component(component, side="to")
+            component._network = self
+            self.topology.add_connection(component)
+            self.line_topology.add_connection(component)
+            self.topology_version += 1
         elif isinstance(component, (ElectricalComponent,Grid)):
             if component.bus.id not in self.buses:
                 raise ValueError("Component bus must be added to the network first")
             if isinstance(component, ElectricalComponent):
                 self.components.append(component)
-            
+            else:
+                self.grids.append(component)
+
             self.buses[component.bus.id].connect_component(component)
+            self.registry.adopt(component)
             # self.buses[component.bus.id].components_append(component)
         # elif isinstance(component, Grid):
         #     self.buses[component.bus.id].connect_component(component)
@@ -55,6 +90,25 @@ class Network:
         # print(f"Added {component.id} to network")
         print_message_network(f"Added {component.id} to network")
 
+    def add_components(self, components):
+        """Add many components (in dependency order: lines and inverters after their buses)."""
+        for component in components:
+            self.add_component(component)
+
+    def topology_changed(self, switched=None):
+        """
+        Invalidate cached load-flow factorisations and update the topology indices. Called
+        with the line as switched when a line changes status; call it without arguments after
+        editing lines or inverters in place.
+        """
+        self.topology_version += 1
+        if switched is not None:
+            self.topology.connection_switched(switched)
+            self.line_topology.connection_switched(switched)
+        else:
+            self.topology.invalidate()
+            self.line_topology.invalidate()
+
     def print_summary(self):
         from rich.console import Console
         from rich.theme import Theme
@@ -194,6 +248,212 @@ class Network:
         else:
             plt.show()
 
+    def run_timeseries(self, profiles, time_step=1.0, record_components=True):
+        """
+        Simulate aligned profiles for all time steps at once with array operations.
+
+        Parameters:
+        - profiles (dict): component id -> array with one value per step:
+          PV: irradiance (W/m²); Load: active power (W), or a dict with "active_power" and
+          optionally "reactive_power"; HeatPump: power fraction (0 to 1); EnergyStorage and
+          EVCharger: power setpoint (W), positive to charge and negative to discharge;
+          Inverter: input active power (W).
+          Components without a profile keep their present power.
+        - time_step (float): step length in hours, as for charge/discharge.
+        - record_components (bool): include per-component columns in the result.
+        Each grid balances its own bus within max_power; other buses report their imbalance.
+        Storage SOC follows the clipped charge/discharge recurrence (compiled when numba is
+        installed). Components are left in the state of the last step.
+        The results equal calling the component methods step by step (run_timeseries_test.py),
+        with one difference: an AC heat pump whose reactive power is 0 draws 0.2 x its active
+        power as reactive power at every step, whereas repeated set_operating_condition calls
+        keep the reactive power set by the first call.
+        Returns: columnar dict of 1-D arrays ("time", "<bus>.active_balance", "<id>.active_power", ...).
+        """
+        devices = {component.id: component for component in self.components + self.inverters + self.grids}
+        unknown = set(profiles) - set(devices)
+        if unknown:
+            raise KeyError(f"Profiles given for unknown components: {sorted(unknown)}")
+        lengths = {len(np.atleast_1d(value["active_power"] if isinstance(value, dict) else value))
+                   for value in profiles.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"All profiles must have the same length, got lengths {sorted(lengths)}")
+        steps = lengths.pop() if lengths else 1
+
+        registry = self.registry
+        size = registry.size
+        active = np.repeat(registry.active_power[:size, np.newaxis], steps, axis=1)
+        reactive = np.repeat(registry.reactive_power[:size, np.newaxis], steps, axis=1)
+        soc = {}
+        batteries = {EnergyStorage: [], EVCharger: []}
+
+        for component_id, profile in profiles.items():
+            component = devices[component_id]
+            slot = component.slot
+            if isinstance(component, PV):
+                irradiance = np.asarray(profile, dtype=float)
+                if (irradiance < 0).any():
+                    raise ValueError(f"irradiance of {component_id} must be non-negative")
+                active[slot] = np.minimum(component.area * irradiance * component.efficiency, component.max_power)
+                reactive[slot] = 0.0
+            elif isinstance(component, Load):
+                if isinstance(profile, dict):
+                    active[slot] = profile["active_power"]
+                    if "reactive_power" in profile:
+                        reactive[slot] = profile["reactive_power"]
+                else:
+                    active[slot] = profile
+            elif isinstance(component, HeatPump):
+                fraction = np.asarray(profile, dtype=float)
+                if ((fraction < 0) | (fraction > 1)).any():
+                    raise ValueError(f"power fraction of {component_id} must be between 0 and 1")
+                active[slot] = component.rated_power * fraction
+                if component.technology == "ac" and component.reactive_power == 0.0:
+                    reactive[slot] = active[slot] * 0.2  # as set_operating_condition
+            elif isinstance(component, (EnergyStorage, EVCharger)):
+                batteries[type(component)].append((component, np.asarray(profile, dtype=float)))
+            elif isinstance(component, Inverter):
+                input_power = np.asarray(profile, dtype=float)
+                if (np.abs(input_power) > component.max_power).any():
+                    raise ValueError(f"Input active power of {component_id} exceeds max_power {component.max_power}")
+                active[slot] = input_power
+                active[component._output_slot] = np.where(input_power >= 0, input_power * component.efficiency,
+                                                          input_power / component.efficiency)
+                if component.input_technology == "dc":
+                    reactive[slot] = 0.0
+            else:
+                raise ValueError(f"Profiles are not supported for {component.__class__.__name__} {component_id}")
+
+        for battery_class, entries in batteries.items():
+            if not entries:
+                continue
+            components = [component for component, _ in entries]
+            capacity_attribute = "capacity" if battery_class is EnergyStorage else "ev_capacity"
+            setpoint = np.stack([profile if component.status == "on" else np.zeros(steps) for component, profile in entries])
+            power, trajectories = soc_trajectories(
+                setpoint,
+                [component.soc for component in components],
+                [getattr(component, capacity_attribute) for component in components],
+                [component.max_charge_power for component in components],
+                [component.max_discharge_power for component in components],
+                [component.efficiency for component in components],
+                time_step,
+            )
+            for component, realised, trajectory in zip(components, power, trajectories):
+                soc[component.id] = trajectory
+                if battery_class is EnergyStorage:
+                    active[component.slot] = -realised  # storage reports power supplied
+                else:
+                    active[component.slot] = realised  # EV charger reports power consumed
+                    reactive[component.slot] = np.where(realised > 0, realised * 0.2, 0.0) if component.technology == "ac" else 0.0
+
+        # bus balances without the grids, then each grid covers the deficit on its bus
+        on = (registry.status[:size] == STATUS_CODES["on"]) & (registry.type_code[:size] != FREE_SLOT)
+        on &= registry.bus_index[:size] >= 0
+        grid_slots = [grid.slot for grid in self.grids]
+        on[grid_slots] = False
+        scale = registry.sign[:size] * on
+        slots = np.flatnonzero(on)
+        incidence = sp.csr_matrix((scale[slots].astype(float), (registry.bus_index[slots], slots)), shape=(len(self.buses), size))
+        bus_active = incidence @ active
+        bus_reactive = incidence @ reactive
+
+        for grid in self.grids:
+            bus = grid.bus.index
+            if grid.status == "off":
+                active[grid.slot] = reactive[grid.slot] = 0.0
+                continue
+            required_active, required_reactive = -bus_active[bus], -bus_reactive[bus]
+            if grid.technology == "dc":
+                required_reactive = np.zeros(steps)
+            if grid.max_power is not None:
+                if grid.technology == "dc":
+                    required_active = np.clip(required_active, -grid.max_power, grid.max_power)
+                else:
+                    apparent = np.hypot(required_active, required_reactive)
+                    limit = np.where(apparent > grid.max_power, grid.max_power / np.maximum(apparent, 1e-12), 1.0)
+                    required_active, required_reactive = required_active * limit, required_reactive * limit
+            active[grid.slot], reactive[grid.slot] = required_active, required_reactive
+            bus_active[bus] += required_active
+            bus_reactive[bus] += required_reactive
+
+        # leave every component in the state of the last step
+        registry.active_power[:size] = active[:, -1]
+        registry.reactive_power[:size] = reactive[:, -1]
+        registry.mark_all_dirty()
+        for entries in batteries.values():
+            for component, _ in entries:
+                component.soc = float(soc[component.id][-1])
+                if isinstance(component, EVCharger):
+                    last = active[component.slot, -1]
+                    component.state = "charging" if last > 0 else "discharging" if last < 0 else "idle"
+        for component_id, profile in profiles.items():
+            if isinstance(devices[component_id], PV):
+                devices[component_id].current_irradiance = float(np.asarray(profile)[-1])
+
+        results = {"time": np.arange(1, steps + 1) * time_step}
+        for bus_id, bus in self.buses.items():
+            results[f"{bus_id}.active_balance"] = bus_active[bus.index]
+            results[f"{bus_id}.reactive_balance"] = bus_reactive[bus.index]
+        recorded = self.grids + (self.components + self.inverters if record_components else [])
+        for component in recorded:
+            results[f"{component.id}.active_power"] = active[component.slot]
+            results[f"{component.id}.reactive_power"] = reactive[component.slot]
+            if isinstance(component, Inverter):
+                results[f"{component.id}.output_active_power"] = active[component._output_slot]
+                results[f"{component.id}.output_reactive_power"] = reactive[component._output_slot]
+            if component.id in soc:
+                results[f"{component.id}.soc"] = soc[component.id]
+        return results
+
+    def _solver(self, kind, solver_class, tolerance, max_iterations):
+        """Solver reused across calls so its cached factorisation survives between time steps."""
+        solver = self._power_flow_solvers.get(kind)
+        if solver is None:
+            solver = self._power_flow_solvers[kind] = solver_class(self, tolerance=tolerance, max_iterations=max_iterations)
+        solver.tolerance, solver.max_iterations = tolerance, max_iterations
+        return solver
+
+    def solve_power_flow(self, tolerance=1e-3, max_iterations=20):
+        """Run an AC load flow (see PowerFlowSolver) and return its summary."""
+        return self._solver("ac", PowerFlowSolver, tolerance, max_iterations).solve()
+
+    def solve_hybrid_power_flow(self, tolerance=1e-3, max_iterations=20):
+        """Run the sequential AC/DC load flow (see HybridPowerFlowSolver) and return its summary."""
+        return self._solver("hybrid", HybridPowerFlowSolver, tolerance, max_iterations).solve()
+
+    def solve_unbalanced_power_flow(self, tolerance=1e-3, max_iterations=20):
+        """Run a per-phase AC load flow (see ThreePhasePowerFlowSolver) and return its summary."""
+        return self._solver("three_phase", ThreePhasePowerFlowSolver, tolerance, max_iterations).solve()
+
+    def save(self, path):
+        """Write topology and state to a directory of .npy columns (see network_io.save_network)."""
+        from .network_io import save_network
+        save_network(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=True, verbose=False):
+        """Rebuild a network written by Network.save."""
+        from .network_io import load_network
+        return load_network(path, mmap=mmap, verbose=verbose)
+
+    def save_state(self, path):
+        """Snapshot only the dynamic state (powers, status, SOC); cheap enough to call during runs."""
+        from .network_io import save_state
+        save_state(self, path)
+
+    def load_state(self, path):
+        """Restore a snapshot written by save_state onto this network."""
+        from .network_io import load_state
+        load_state(self, path)
+
+    def get_bus_balances(self):
+        """
+        Power injected into every bus as one complex vector, in the order of self.buses.
+        Only components changed since the last query are re-aggregated.
+        """
+        return self.registry.bus_balances(len(self.buses))
+
     def get_status(self):
         """Return the status of all buses in the network."""
         # return {bus_id: bus.get_status() for bus_id, bus in self.buses.items()}
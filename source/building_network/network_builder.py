@@ -0,0 +1,282 @@
+# source/building_network/network_builder.py
+import inspect
+import json
+import os
+from contextlib import nullcontext
+from functools import lru_cache
+
+import numpy as np
+
+from .bus import Bus
+from .line import Line
+from .grid import Grid
+from .inverter import Inverter
+from .pv import PV
+from .load import Load
+from .energy_storage import EnergyStorage
+from .ev_charger import EVCharger
+from .heat_pump import HeatPump
+from .network import Network
+from .electrical_component import deferred_validation
+from .print_theme import quiet
+
+# value of "type" in the components section -> class
+COMPONENT_TYPES = {"pv": PV, "load": Load, "storage": EnergyStorage, "ev_charger": EVCharger, "heat_pump": HeatPump}
+
+# spec section -> class, in build order
+SECTIONS = {"buses": Bus, "lines": Line, "grids": Grid, "inverters": Inverter, "components": None}
+
+# vectorised counterparts of the _validate_inputs checks: (parameter, test on a float array, message)
+_NON_NEGATIVE = (lambda value: value >= 0, "must be non-negative")
+_POSITIVE = (lambda value: value > 0, "must be positive")
+_FRACTION = (lambda value: (value > 0) & (value <= 1), "must be between 0 and 1")
+_UNIT = (lambda value: (value >= 0) & (value <= 1), "must be between 0 and 1")
+_RANGE_RULES = {
+    Line: [("length", *_POSITIVE), ("resistance", *_NON_NEGATIVE), ("reactance", *_NON_NEGATIVE)],
+    Grid: [("max_power", lambda value: np.isnan(value) | (value >= 0), "must be non-negative")],
+    Inverter: [("efficiency", *_FRACTION), ("max_power", *_NON_NEGATIVE)],
+    PV: [("max_power", *_NON_NEGATIVE), ("efficiency", *_FRACTION), ("area", *_POSITIVE)],
+    Load: [("active_power", *_NON_NEGATIVE), ("reactive_power", *_NON_NEGATIVE)],
+    EnergyStorage: [("capacity", *_POSITIVE), ("initial_soc", *_UNIT), ("max_charge_power", *_NON_NEGATIVE),
+                    ("max_discharge_power", *_NON_NEGATIVE), ("efficiency", *_FRACTION)],
+    EVCharger: [("ev_capacity", *_POSITIVE), ("initial_soc", *_UNIT), ("max_charge_power", *_NON_NEGATIVE),
+                ("max_discharge_power", *_NON_NEGATIVE), ("efficiency", *_FRACTION)],
+    HeatPump: [("rated_power", *_NON_NEGATIVE), ("cop", *_POSITIVE)],
+}
+
+# allowed values of categorical parameters (any class that has the parameter)
+_CHOICES = {
+    "technology": {"ac", "dc"},
+    "input_technology": {"ac", "dc"},
+    "output_technology": {"ac", "dc"},
+    "phase_type": {"single", "three"},
+    "status": {"on", "off"},
+    "phase": {"a", "b", "c", None},
+    "control": {"balance", "power"},
+    "mode": {"heating", "cooling"},
+    "flexibility_type": {"shiftable", "nonshiftable"},
+}
+
+# parameters that reference buses
+_BUS_FIELDS = ("bus", "bus_from", "bus_to", "bus_input", "bus_output")
+
+
+class NetworkSpecError(ValueError):
+    """Raised with every problem found in a network specification; the list is in .errors."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__(f"{len(self.errors)} error(s) in network specification:\n  " + "\n  ".join(self.errors))
+
+
+@lru_cache(maxsize=None)
+def _parameters(cls):
+    """Constructor parameters of a class and their defaults."""
+    signature = inspect.signature(cls.__init__)
+    return {name: parameter.default for name, parameter in list(signature.parameters.items())[1:]}
+
+
+class NetworkBuilder:
+    """
+    Builds a Network from a declarative description, e.g. loaded from JSON or YAML:
+
+        buses:      [{id: DC_Bus1, technology: dc, nominal_voltage: 48}, ...]
+        lines:      [{id: L1, bus_from: AC_Bus1, bus_to: AC_Bus2, resistance: 0.02}, ...]
+        grids:      [{id: Grid1, bus: AC_Bus1, max_power: 10000}, ...]
+        inverters:  [{id: Inv1, bus_input: DC_Bus2, bus_output: AC_Bus1, efficiency: 0.95}, ...]
+        components: [{type: pv, id: PV1, bus: DC_Bus1, max_power: 5000}, ...]
+
+    Entries take the keyword arguments of the corresponding class, buses are referenced by
+    id, and component types are the keys of COMPONENT_TYPES. Tuple voltages may be written
+    as lists.
+
+    All entries are checked together before anything is created: unknown keys, duplicate ids,
+    unknown buses, technology and phase mismatches, and the parameter ranges of each class
+    (one array operation per rule). Every problem is reported in a single NetworkSpecError.
+    The network is then created quietly, with the components allocated directly in its
+    registry and their per-object validation skipped.
+    """
+
+    def __init__(self, spec):
+        unknown = set(spec) - set(SECTIONS)
+        if unknown:
+            raise NetworkSpecError([f"unknown section {name!r}" for name in sorted(unknown)])
+        self.spec = {section: list(spec.get(section) or []) for section in SECTIONS}
+
+    @classmethod
+    def from_file(cls, path):
+        """Read a specification from a .json, .yaml or .yml file."""
+        with open(path) as file:
+            if os.path.splitext(path)[1].lower() in {".yaml", ".yml"}:
+                import yaml  # PyYAML is only needed for YAML specifications
+                spec = yaml.safe_load(file)
+            else:
+                spec = json.load(file)
+        return cls(spec or {})
+
+    def _entries(self):
+        """(section, position, class, parameters) of every entry."""
+        for section in SECTIONS:
+            for position, entry in enumerate(self.spec[section]):
+                entry = dict(entry)
+                if section == "components":
+                    cls = COMPONENT_TYPES.get(str(entry.pop("type", "")).lower())
+                else:
+                    cls = SECTIONS[section]
+                yield section, position, cls, entry
+
+    def validate(self):
+        """Return the list of problems in the specification (empty if it can be built)."""
+        errors = []
+        entries = list(self._entries())
+
+        def label(section, position, entry):
+            return f"{section}[{position}] ({entry.get('id', '?')})"
+
+        buses = {}
+        for section, position, cls, entry in entries:
+            if cls is None:
+                known = ", ".join(sorted(COMPONENT_TYPES))
+                errors.append(f"{label(section, position, entry)}: type must be one of {known}")
+                continue
+            parameters = _parameters(cls)
+            for key in sorted(set(entry) - set(parameters)):
+                errors.append(f"{label(section, position, entry)}: unknown parameter {key!r}")
+            for key, default in parameters.items():
+                if default is inspect.Parameter.empty and key not in entry:
+                    errors.append(f"{label(section, position, entry)}: missing required parameter {key!r}")
+            if cls is Bus and "id" in entry:
+                buses[entry["id"]] = {**parameters, **entry}
+
+        # duplicate ids: buses among buses, everything else among all devices and lines
+        for group in (["buses"], ["lines", "grids", "inverters", "components"]):
+            ids = [(section, position, entry.get("id")) for section, position, cls, entry in entries if section in group]
+            seen = {}
+            for section, position, identifier in ids:
+                if identifier in seen:
+                    errors.append(f"{section}[{position}] ({identifier}): duplicate id, first used by {seen[identifier]}")
+                else:
+                    seen[identifier] = f"{section}[{position}]"
+
+        # columnar checks per class
+        by_class = {}
+        for section, position, cls, entry in entries:
+            if cls is not None:
+                by_class.setdefault(cls, []).append((section, position, {**_parameters(cls), **entry}))
+        for cls, rows in by_class.items():
+            errors += self._check_columns(cls, rows)
+            errors += self._check_connections(cls, rows, buses, label)
+        return errors
+
+    @staticmethod
+    def _check_columns(cls, rows):
+        errors = []
+        names = [f"{section}[{position}] ({row.get('id', '?')})" for section, position, row in rows]
+        for parameter, test, message in _RANGE_RULES.get(cls, []):
+            raw = [row.get(parameter) for _, _, row in rows]
+            values = np.full(len(raw), np.nan)  # None stays NaN, which only the Grid max_power rule accepts
+            numeric = np.ones(len(raw), dtype=bool)
+            for k, value in enumerate(raw):
+                if value is None:
+                    continue
+                try:
+                    values[k] = float(value)
+                except (TypeError, ValueError):
+                    numeric[k] = False
+                    errors.append(f"{names[k]}: {parameter} must be a number, got {value!r}")
+            with np.errstate(invalid="ignore"):
+                bad = ~test(values) & numeric
+            for k in np.flatnonzero(bad):
+                errors.append(f"{names[k]}: {parameter} {message}, got {raw[k]}")
+        for parameter, allowed in _CHOICES.items():
+            if parameter not in _parameters(cls):
+                continue
+            for name, (_, _, row) in zip(names, rows):
+                value = row.get(parameter)
+                value = value.lower() if isinstance(value, str) else value
+                if value not in allowed:
+                    choices = sorted(str(choice) for choice in allowed)
+                    errors.append(f"{name}: {parameter} must be one of {choices}, got {row.get(parameter)!r}")
+        return errors
+
+    @staticmethod
+    def _check_connections(cls, rows, buses, label):
+        """Bus references, technology/phase agreement with the buses and DC restrictions."""
+        errors = []
+        for section, position, row in rows:
+            name = label(section, position, row)
+            technology = str(row.get("technology", "ac")).lower()
+            phase_type = str(row.get("phase_type", "single")).lower()
+            if cls is not Bus:
+                for field in _BUS_FIELDS:
+                    if field in row and row[field] not in buses:
+                        errors.append(f"{name}: {field} {row[field]!r} is not a bus in the specification")
+            if technology == "dc" and phase_type == "three":
+                errors.append(f"{name}: DC devices cannot be three-phase")
+
+            # shape checks shared with the constructors
+            if cls is Bus:
+                error = Bus._voltage_error(row.get("nominal_voltage"), technology, phase_type)
+            elif cls is Grid:
+                error = Grid._voltage_error(row.get("voltage"), technology, phase_type)
+            elif cls is Line:
+                error = Line._impedance_matrix_error(row.get("impedance_matrix"), phase_type)
+            else:
+                error = None
+            if error:
+                errors.append(f"{name}: {error}")
+
+            if cls is Line:
+                for field in ("bus_from", "bus_to"):
+                    bus = buses.get(row.get(field))
+                    if bus is not None and (str(bus["technology"]).lower() != technology
+                                            or str(bus["phase_type"]).lower() != phase_type):
+                        errors.append(f"{name}: technology and phase_type must match {field} {bus['id']!r}")
+                if technology == "dc" and row.get("reactance"):
+                    errors.append(f"{name}: DC lines cannot have reactance")
+            elif cls is Inverter:
+                for field, side in (("bus_input", "input_technology"), ("bus_output", "output_technology")):
+                    bus = buses.get(row.get(field))
+                    if bus is not None and str(bus["technology"]).lower() != str(row.get(side)).lower():
+                        errors.append(f"{name}: {side} does not match the technology of {field} {bus['id']!r}")
+            elif cls is not Bus:
+                bus = buses.get(row.get("bus"))
+                if bus is not None and str(bus["technology"]).lower() != technology:
+                    errors.append(f"{name}: technology {technology!r} does not match bus {bus['id']!r}")
+                if technology == "dc" and row.get("reactive_power"):
+                    errors.append(f"{name}: DC devices cannot have reactive power")
+                if row.get("phase") is not None and phase_type == "three":
+                    errors.append(f"{name}: three-phase devices cannot be assigned to a single phase")
+                if cls is Load and str(row.get("flexibility_type")).lower() == "shiftable" and not row.get("max_shiftable_time"):
+                    errors.append(f"{name}: max_shiftable_time must be non-zero for shiftable loads")
+        return errors
+
+    def build(self, verbose=False):
+        """Validate the specification and create the Network; raises NetworkSpecError."""
+        errors = self.validate()
+        if errors:
+            raise NetworkSpecError(errors)
+
+        def create(cls, entry, buses):
+            entry = {key: buses[value] if key in _BUS_FIELDS else value for key, value in entry.items()}
+            # validate() accepts the categorical values in any case, so pass them on lowercased
+            for key in _CHOICES.keys() & entry.keys():
+                if isinstance(entry[key], str):
+                    entry[key] = entry[key].lower()
+            for key in ("nominal_voltage", "voltage"):
+                if isinstance(entry.get(key), list):
+                    entry[key] = tuple(entry[key])
+            return cls(**entry)
+
+        with nullcontext() if verbose else quiet():
+            network = Network()
+            buses = {}
+            with network.registry.activate(), deferred_validation():
+                for section, _, cls, entry in self._entries():
+                    if section == "buses":
+                        buses[entry["id"]] = create(cls, entry, buses)
+                        network.add_bus(buses[entry["id"]])
+                    else:
+                        network.add_component(create(cls, entry, buses))
+        return network
+
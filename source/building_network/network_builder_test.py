@@ -0,0 +1,91 @@
+import numpy as np
+
+from .network_builder import NetworkBuilder, NetworkSpecError
+
+
+def _spec():
+    return {
+        "buses": [
+            {"id": "AC_Bus", "technology": "AC", "phase_type": "Three", "nominal_voltage": [230.0, 400.0]},
+            {"id": "DC_Bus", "technology": "dc", "nominal_voltage": 48.0},
+        ],
+        "grids": [{"id": "Grid", "bus": "AC_Bus", "max_power": None, "phase_type": "three", "voltage": [230.0, 400.0]}],
+        "inverters": [{"id": "Inv", "bus_input": "DC_Bus", "bus_output": "AC_Bus", "efficiency": 0.95}],
+        "components": [
+            {"type": "Load", "id": "Load_A", "bus": "AC_Bus", "active_power": 1000.0, "phase": "A"},
+            {"type": "pv", "id": "PV", "bus": "DC_Bus", "max_power": 3000.0, "area": 15.0, "technology": "DC"},
+        ],
+    }
+
+
+def test_categorical_values_are_case_insensitive():
+    network = NetworkBuilder(_spec()).build()
+    load = next(component for component in network.components if component.id == "Load_A")
+    assert load.phase == "a"
+    assert network.buses["AC_Bus"].phase_type == "three"
+    result = network.solve_unbalanced_power_flow(tolerance=1e-9)
+    assert result["converged"]
+    magnitude = np.abs(result["bus_voltage"]["AC_Bus"])
+    assert np.allclose(magnitude, 230.0)  # the grid bus is the slack
+
+    load.phase = "B"
+    assert load.phase == "b"
+
+
+def test_every_problem_is_reported_together():
+    spec = _spec()
+    spec["buses"].append({"id": "AC_Bus", "technology": "ac"})
+    spec["lines"] = [{"id": "L1", "bus_from": "AC_Bus", "bus_to": "Nowhere", "resistance": -1.0}]
+    spec["components"] += [
+        {"type": "load", "id": "Load_D", "bus": "AC_Bus", "phase": "d"},
+        {"type": "battery", "id": "B1", "bus": "DC_Bus"},
+    ]
+    try:
+        NetworkBuilder(spec).build()
+    except NetworkSpecError as error:
+        errors = error.errors
+        assert isinstance(error, ValueError)
+    else:
+        raise AssertionError("build() accepted an invalid specification")
+    expected = ["duplicate id", "'Nowhere' is not a bus", "resistance must be non-negative",
+                "phase must be one of", "type must be one of"]
+    for fragment in expected:
+        assert any(fragment in message for message in errors), fragment
+    assert not any("Load_A" in message for message in errors)
+
+
+def test_shape_checks_match_the_constructors():
+    spec = _spec()
+    spec["buses"].append({"id": "AC_1", "technology": "ac", "nominal_voltage": 230.0})
+    spec["grids"].append({"id": "Grid_1", "bus": "AC_1", "voltage": [230.0, 400.0]})
+    spec["lines"] = [
+        {"id": "L1", "bus_from": "AC_1", "bus_to": "AC_1", "impedance_matrix": [[0.1, 0.0], [0.0, 0.1]]},
+        {"id": "L3", "bus_from": "AC_Bus", "bus_to": "AC_Bus", "phase_type": "three",
+         "impedance_matrix": [[0.1, 0.0], [0.0, 0.1]]},
+    ]
+    errors = NetworkBuilder(spec).validate()
+    expected = ["(Grid_1): Tuple voltage is only valid for three-phase grids",
+                "(L1): impedance_matrix is only valid for three-phase lines",
+                "(L3): impedance_matrix must be 3x3"]
+    for fragment in expected:
+        assert any(fragment in message for message in errors), fragment
+    assert len(errors) == len(expected)
+    try:
+        NetworkBuilder(spec).build()
+    except NetworkSpecError as error:
+        assert error.errors == errors
+    else:
+        raise AssertionError("build() accepted an invalid specification")
+
+    spec["grids"].pop()
+    spec["lines"][1]["impedance_matrix"] = (np.eye(3) * complex(0.1, 0.05)).tolist()
+    spec["lines"].pop(0)
+    network = NetworkBuilder(spec).build()
+    assert network.lines[0].get_impedance_matrix().shape == (3, 3)
+
+
+if __name__ == "__main__":
+    test_categorical_values_are_case_insensitive()
+    test_every_problem_is_reported_together()
+    test_shape_checks_match_the_constructors()
+    print("network_builder: all tests passed")
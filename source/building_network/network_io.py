@@ -0,0 +1,208 @@
+# source/building_network/network_io.py
+import json
+import os
+from contextlib import nullcontext
+
+import numpy as np
+
+from .bus import Bus
+from .line import Line
+from .grid import Grid
+from .inverter import Inverter
+from .pv import PV
+from .load import Load
+from .energy_storage import EnergyStorage
+from .ev_charger import EVCharger
+from .heat_pump import HeatPump
+from .electrical_component import deferred_validation
+from .network_builder import _parameters
+from .print_theme import quiet
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# group name -> class; components are stored per class and re-added in their original order
+GROUPS = {"buses": Bus, "lines": Line, "grids": Grid, "inverters": Inverter, "pv": PV, "load": Load,
+          "storage": EnergyStorage, "ev_charger": EVCharger, "heat_pump": HeatPump}
+_COMPONENT_GROUPS = {cls: name for name, cls in GROUPS.items() if name not in {"buses", "lines", "grids", "inverters"}}
+
+# constructor parameters read from an attribute of another name
+_ATTRIBUTE = {"initial_soc": "soc"}
+# parameters held in the registry, saved as state instead
+_REGISTRY_PARAMETERS = {"active_power", "reactive_power", "status", "phase"}
+# float or (L-N, L-L) tuple voltages
+_VOLTAGES = {"nominal_voltage", "voltage", "voltage_rating"}
+# per-object state outside the registry; an EV charger's session object is not saved, so a plugged-in
+# charger is restored with session None and has to be re-attached by its EVSessionManager
+_EXTRA_STATE = {"pv": ["current_irradiance"], "storage": ["soc"],
+                "ev_charger": ["soc", "state", "plugged_in", "ev_capacity"]}
+
+
+def _objects(network):
+    return {
+        "buses": list(network.buses.values()),
+        "lines": network.lines,
+        "grids": network.grids,
+        "inverters": network.inverters,
+        **{name: [c for c in network.components if type(c) is cls] for cls, name in _COMPONENT_GROUPS.items()},
+    }
+
+
+def _column(name, values):
+    """Values of one parameter as an array, and the kind needed to turn it back into arguments."""
+    if name in _VOLTAGES:
+        column = np.full((len(values), 2), np.nan)
+        for k, value in enumerate(values):
+            if isinstance(value, tuple):
+                column[k] = value
+            elif value is not None:
+                column[k, 0] = value
+        return column, "voltage"
+    if name == "impedance_matrix":
+        column = np.full((len(values), 3, 3), np.nan, dtype=complex)
+        for k, value in enumerate(values):
+            if value is not None:
+                column[k] = value
+        return column, "matrix"
+    if values and all(isinstance(value, Bus) for value in values):
+        return np.array([value.index for value in values], dtype=np.int32), "bus"
+    if values and all(isinstance(value, str) for value in values):
+        return np.array(values, dtype=str), "str"
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64), "float"
+
+
+def _arguments(kind, column, buses):
+    """Inverse of _column: one constructor argument per row."""
+    if kind == "voltage":
+        return [None if np.isnan(ln) else float(ln) if np.isnan(ll) else (float(ln), float(ll)) for ln, ll in column.tolist()]
+    if kind == "matrix":
+        return [None if np.isnan(matrix).all() else np.array(matrix) for matrix in column]
+    if kind == "bus":
+        return [buses[index] for index in column.tolist()]
+    if kind == "str":
+        return column.tolist()
+    return [None if np.isnan(value) else value for value in column.tolist()]
+
+
+def _write(path, name, array):
+    np.save(os.path.join(path, name + ".npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _read(path, name, mmap):
+    return np.load(os.path.join(path, name + ".npy"), mmap_mode="r" if mmap else None, allow_pickle=False)
+
+
+def save_state(network, path):
+    """Write the dynamic state (registry power, status and phase, SOC, ...) as .npy columns."""
+    os.makedirs(path, exist_ok=True)
+    registry = network.registry
+    for group, objects in _objects(network).items():
+        if group in {"buses", "lines"} or not objects:
+            continue
+        slots = np.array([obj.slot for obj in objects], dtype=np.intp)
+        for field in ("active_power", "reactive_power", "status", "phase"):
+            _write(path, f"state.{group}.{field}", getattr(registry, field)[slots])
+        if group == "inverters":
+            output_slots = np.array([obj._output_slot for obj in objects], dtype=np.intp)
+            _write(path, "state.inverters.output_active_power", registry.active_power[output_slots])
+            _write(path, "state.inverters.output_reactive_power", registry.reactive_power[output_slots])
+        for field in _EXTRA_STATE.get(group, []):
+            _write(path, f"state.{group}.{field}", np.array([getattr(obj, field) for obj in objects]))
+    lines = network.lines
+    _write(path, "state.lines.status", np.array([line.status == "on" for line in lines], dtype=bool))
+
+
+def save_network(network, path):
+    """
+    Write a network as a directory of .npy columns plus manifest.json.
+
+    Every class is stored column-wise: one array per constructor parameter (buses as bus
+    indices, tuple voltages as two columns, strings as fixed-width arrays) and one per state
+    field. Nothing is pickled, and each file can be memory-mapped when loading.
+    """
+    unsupported = {type(c).__name__ for c in network.components if type(c) not in _COMPONENT_GROUPS}
+    if unsupported:
+        raise ValueError(f"Cannot save components of type {sorted(unsupported)}")
+    os.makedirs(path, exist_ok=True)
+    manifest = {"format_version": FORMAT_VERSION, "groups": {}}
+    for group, objects in _objects(network).items():
+        columns = {}
+        for name in _parameters(GROUPS[group]):
+            if name in _REGISTRY_PARAMETERS and group not in {"buses", "lines"}:
+                continue
+            values = [getattr(obj, _ATTRIBUTE.get(name, name)) for obj in objects]
+            column, kind = _column(name, values)
+            _write(path, f"{group}.{name}", column)
+            columns[name] = kind
+        manifest["groups"][group] = {"count": len(objects), "columns": columns}
+
+    position = {group: {id(obj): k for k, obj in enumerate(objects)} for group, objects in _objects(network).items()}
+    order = [(_COMPONENT_GROUPS[type(c)], position[_COMPONENT_GROUPS[type(c)]][id(c)]) for c in network.components]
+    _write(path, "component_group", np.array([list(GROUPS).index(group) for group, _ in order], dtype=np.int8))
+    _write(path, "component_position", np.array([k for _, k in order], dtype=np.int32))
+    save_state(network, path)
+    with open(os.path.join(path, MANIFEST), "w") as file:
+        json.dump(manifest, file, indent=1)
+
+
+def load_state(network, path, mmap=True):
+    """Apply state written by save_state (or save_network) to a network of the same layout."""
+    registry = network.registry
+    objects = _objects(network)
+    for group, members in objects.items():
+        if group in {"buses", "lines"} or not members:
+            continue
+        slots = np.array([obj.slot for obj in members], dtype=np.intp)
+        for field in ("active_power", "reactive_power", "status", "phase"):
+            values = _read(path, f"state.{group}.{field}", mmap)
+            if len(values) != len(members):
+                raise ValueError(f"State in {path} has {len(values)} {group}, the network has {len(members)}")
+            getattr(registry, field)[slots] = values
+        if group == "inverters":
+            output_slots = np.array([obj._output_slot for obj in members], dtype=np.intp)
+            registry.active_power[output_slots] = _read(path, "state.inverters.output_active_power", mmap)
+            registry.reactive_power[output_slots] = _read(path, "state.inverters.output_reactive_power", mmap)
+            registry.status[output_slots] = registry.status[slots]
+        for field in _EXTRA_STATE.get(group, []):
+            for obj, value in zip(members, _read(path, f"state.{group}.{field}", mmap).tolist()):
+                setattr(obj, field, value)
+    line_status = _read(path, "state.lines.status", mmap).tolist()
+    for line, on in zip(network.lines, line_status):
+        if line.status != ("on" if on else "off"):
+            line.status = "on" if on else "off"
+    registry.mark_all_dirty()
+    return network
+
+
+def load_network(path, mmap=True, verbose=False):
+    """Rebuild a network written by save_network; columns are memory-mapped unless mmap=False."""
+    from .network import Network
+
+    with open(os.path.join(path, MANIFEST)) as file:
+        manifest = json.load(file)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported network format version {manifest.get('format_version')}")
+
+    def arguments(group, buses):
+        spec = manifest["groups"][group]
+        columns = {name: _arguments(kind, _read(path, f"{group}.{name}", mmap), buses)
+                   for name, kind in spec["columns"].items()}
+        return [{name: values[k] for name, values in columns.items()} for k in range(spec["count"])]
+
+    with nullcontext() if verbose else quiet():
+        network = Network()
+        with network.registry.activate(), deferred_validation():
+            buses = []
+            for kwargs in arguments("buses", buses):
+                buses.append(Bus(**kwargs))
+                network.add_bus(buses[-1])
+            created = {}
+            for group, cls in GROUPS.items():
+                if group != "buses":
+                    created[group] = [cls(**kwargs) for kwargs in arguments(group, buses)]
+            for group in ("lines", "grids", "inverters"):
+                network.add_components(created[group])
+            groups = list(GROUPS)
+            network.add_components(created[groups[group]][k] for group, k in
+                                   zip(_read(path, "component_group", mmap).tolist(), _read(path, "component_position", mmap).tolist()))
+    return load_state(network, path, mmap)
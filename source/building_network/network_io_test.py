@@ -0,0 +1,146 @@
+import tempfile
+import time
+
+import numpy as np
+
+from .bus import Bus
+from .energy_storage import EnergyStorage
+from .ev_charger import EVCharger
+from .grid import Grid
+from .heat_pump import HeatPump
+from .inverter import Inverter
+from .line import Line
+from .load import Load
+from .network import Network
+from .print_theme import quiet
+from .pv import PV
+
+
+def _network(houses=3):
+    """A DC bus with PV and storage behind an inverter feeding a chain of houses, plus a three-phase pair."""
+    with quiet():
+        network = Network()
+        dc_bus = Bus(id="DC", technology="dc", nominal_voltage=48.0)
+        head = Bus(id="Head", technology="ac", nominal_voltage=230.0)
+        sub = Bus(id="Sub", technology="ac", phase_type="three", nominal_voltage=(230.0, 400.0))
+        far = Bus(id="Far", technology="ac", phase_type="three", nominal_voltage=(230.0, 400.0))
+        for bus in (dc_bus, head, sub, far):
+            network.add_bus(bus)
+        coupling = np.full((3, 3), 0.01 + 0.005j) + np.eye(3) * (0.04 + 0.02j)
+        network.add_components([
+            Grid(id="Grid", bus=head, max_power=20000.0),
+            Grid(id="Grid3", bus=sub, max_power=None, phase_type="three", voltage=(230.0, 400.0)),
+            Line(id="L3", bus_from=sub, bus_to=far, phase_type="three", impedance_matrix=coupling),
+            Load(id="Load3", bus=far, active_power=2000.0, reactive_power=200.0, phase="b"),
+            PV(id="PV", bus=dc_bus, max_power=4000.0, area=25.0),
+            EnergyStorage(id="Battery", bus=dc_bus, capacity=8000.0, initial_soc=0.4, max_charge_power=2000.0,
+                          max_discharge_power=2000.0),
+            Inverter(id="Inverter", bus_input=dc_bus, bus_output=head, max_power=5000.0),
+        ])
+        previous = head
+        for k in range(houses):
+            house = Bus(id=f"House{k}", technology="ac", nominal_voltage=230.0)
+            network.add_bus(house)
+            network.add_components([
+                Line(id=f"L{k}", bus_from=previous, bus_to=house, resistance=0.02, reactance=0.01),
+                Load(id=f"Load{k}", bus=house, active_power=300.0 + k % 7 * 50.0, reactive_power=30.0),
+                HeatPump(id=f"HP{k}", bus=house, rated_power=2500.0),
+                EVCharger(id=f"EV{k}", bus=house, max_charge_power=7000.0, ev_capacity=40000.0, initial_soc=0.2),
+            ])
+            previous = house
+    return network
+
+
+def _operate(network):
+    """Move the state away from the constructor values."""
+    components = {component.id: component for component in network.components}
+    components["PV"].generate_power(700.0)
+    components["Battery"].charge(1500.0, 0.5)
+    components["EV1"].charge(6000.0, 1.0)
+    components["EV2"].plug_in(60000.0, 0.7, session=object())
+    components["HP0"].set_operating_condition(0.6)
+    components["HP2"].status = "off"
+    components["Load1"].active_power = 1234.0
+    network.inverters[0].set_input_power(800.0)
+    network.lines[-1].status = "off"
+
+
+def _snapshot(network):
+    """Topology and state of a network as plain values."""
+    registry = network.registry
+    slots = [component.slot for component in network.grids + network.components + network.inverters]
+    return {
+        "buses": [(bus.id, bus.technology, bus.phase_type, bus.nominal_voltage, bus.index) for bus in network.buses.values()],
+        "lines": [(line.id, line.bus_from.id, line.bus_to.id, line.status, line.get_impedance()) for line in network.lines],
+        "components": [(type(c).__name__, c.id, c.bus.id, c.phase) for c in network.components],
+        "inverters": [(i.id, i.bus_input.id, i.bus_output.id, i.efficiency, i.max_power) for i in network.inverters],
+        "power": registry.active_power[slots] + 1j * registry.reactive_power[slots],
+        "status": registry.status[slots].copy(),
+        "soc": [getattr(c, "soc", None) for c in network.components],
+        "vehicles": [(c.id, c.ev_capacity) for c in network.components if getattr(c, "plugged_in", False)],
+        "balances": network.get_bus_balances().copy(),
+    }
+
+
+def _assert_same(first, second):
+    for key in first:
+        if key in {"power", "status", "balances"}:
+            assert np.array_equal(first[key], second[key]), key
+        else:
+            assert first[key] == second[key], key
+
+
+def test_save_and_load_round_trip():
+    network = _network()
+    _operate(network)
+    reference = _snapshot(network)
+    with tempfile.TemporaryDirectory() as path:
+        network.save(path)
+        for mmap in (True, False):
+            loaded = Network.load(path, mmap=mmap)
+            _assert_same(reference, _snapshot(loaded))
+            assert np.isclose(loaded.lines[0].get_impedance_matrix(), network.lines[0].get_impedance_matrix()).all()
+            assert loaded.topology.islanded_buses() == network.topology.islanded_buses()
+
+            # the loaded network solves to the same operating point
+            expected = network.solve_power_flow(tolerance=1e-9)
+            result = loaded.solve_power_flow(tolerance=1e-9)
+            assert np.allclose([bus.voltage for bus in loaded.buses.values()],
+                               [bus.voltage for bus in network.buses.values()], equal_nan=True)
+            assert result["unsupplied_buses"] == expected["unsupplied_buses"]
+
+
+def test_state_snapshot_restores_the_dynamic_state():
+    network = _network()
+    _operate(network)
+    reference = _snapshot(network)
+    with tempfile.TemporaryDirectory() as path:
+        network.save_state(path)
+        components = {component.id: component for component in network.components}
+        components["Battery"].discharge(2000.0, 1.0)
+        components["HP2"].status = "on"
+        components["Load0"].active_power = 50.0
+        network.lines[-1].status = "on"
+        network.inverters[0].set_input_power(-300.0)
+        components["EV2"].unplug()
+        components["EV0"].plug_in(50000.0, 0.3)
+        assert _snapshot(network)["soc"] != reference["soc"]
+
+        network.load_state(path)
+        _assert_same(reference, _snapshot(network))
+        assert reference["vehicles"] == [("EV2", 60000.0)]
+        assert components["EV2"].session is None  # sessions are not part of the snapshot
+        assert network.lines[-1].status == "off"
+
+
+if __name__ == "__main__":
+    test_save_and_load_round_trip()
+    test_state_snapshot_restores_the_dynamic_state()
+    large = _network(houses=3300)  # about 10,000 devices
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        large.save(directory)
+        saved = time.perf_counter()
+        Network.load(directory)
+        print(f"{len(large.components)} components: save {saved - start:.2f} s, load {time.perf_counter() - saved:.2f} s")
+    print("network_io: all tests passed")
@@ -0,0 +1,282 @@
+# source/building_network/power_flow.py
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve, splu
+
+
+def _nominal(voltage):
+    """Line-to-neutral magnitude of a bus or grid voltage (tuples are (L-N, L-L))."""
+    return float(voltage[0] if isinstance(voltage, tuple) else abs(voltage))
+
+
+class PowerFlowSolver:
+    """
+    Newton-Raphson load flow of the AC (or, with technology="dc", the DC) buses of a Network.
+
+    The bus admittance matrix is built from Network.lines as a scipy.sparse matrix and the
+    Newton steps use a sparse Jacobian, so the cost grows roughly linearly with the number of
+    buses. Buses with an active grid are slack buses held at the grid voltage; every other bus
+    is a constant-power (PQ) bus whose injection is the registry balance of its components.
+    Units are SI: volts, ohms, watts and VAR. A DC network is solved as a resistive network
+    with zero reactive power, whose voltages stay real.
+
+    After solving, Bus.voltage holds the bus voltage (complex for AC), each line holds its
+    current, power at both ends and loss, and each slack grid supplies the power that closes
+    the balance including the losses. Buses not connected to a slack bus get a NaN voltage.
+
+    The admittance matrix and the LU factors of its PQ block are kept between solves and
+    rebuilt only when Network.topology_version or the set of slack buses changes, so repeated
+    solves over a time series cost a few triangular solves each (see solve).
+    """
+
+    def __init__(self, network, tolerance=1e-3, max_iterations=20, technology="ac"):
+        self.network = network
+        self.tolerance = tolerance  # maximum power mismatch (VA)
+        self.max_iterations = max_iterations
+        self.technology = technology
+        self._cache = None  # admittance matrix and factorisation for the current topology
+        self.factorisations = 0
+
+    def _buses(self):
+        return [bus for bus in self.network.buses.values() if bus.technology == self.technology]
+
+    def _lines(self):
+        return [line for line in self.network.lines if line.technology == self.technology and line.status == "on"]
+
+    def build_admittance(self, buses, lines):
+        """Sparse bus admittance matrix over the given buses (position = order in buses)."""
+        position = {bus.id: k for k, bus in enumerate(buses)}
+        impedance = np.array([line.get_impedance() for line in lines], dtype=complex)
+        if (impedance == 0).any():
+            zero = [line.id for line, z in zip(lines, impedance) if z == 0]
+            raise ValueError(f"Lines with zero impedance cannot be used in a load flow: {zero}")
+        admittance = 1 / impedance
+        source = np.array([position[line.bus_from.id] for line in lines], dtype=np.intp)
+        target = np.array([position[line.bus_to.id] for line in lines], dtype=np.intp)
+        rows = np.concatenate((source, target, source, target))
+        cols = np.concatenate((source, target, target, source))
+        values = np.concatenate((admittance, admittance, -admittance, -admittance))
+        return sp.csr_matrix((values, (rows, cols)), shape=(len(buses), len(buses)))
+
+    def _injections(self, buses, exclude=()):
+        """
+        Complex power injected into each bus by its components, without the grids and
+        without the excluded (component, side) connections.
+        """
+        network = self.network
+        balances = network.get_bus_balances()
+        injection = np.array([balances[bus.index] for bus in buses], dtype=complex)
+        position = {bus.id: k for k, bus in enumerate(buses)}
+        for grid in network.grids:
+            if grid.bus.id in position and grid.status == "on":
+                injection[position[grid.bus.id]] -= complex(grid.active_power, grid.reactive_power)
+        for component, side in exclude:
+            bus = component.bus_output if side == "output" else component.bus_input if side == "input" else component.bus
+            if bus.id in position:
+                injection[position[bus.id]] -= complex(*component.bus_injection(side))
+        if self.technology == "dc":
+            injection = injection.real.astype(complex)
+        return injection
+
+    @staticmethod
+    def newton_raphson(admittance, injection, voltage, slack, tolerance, max_iterations):
+        """
+        Solve V * conj(Y V) = S on the non-slack buses, starting from voltage.
+        Returns (voltage, converged, iterations, max_mismatch).
+        """
+        pq = np.flatnonzero(~slack)
+        magnitude, angle = np.abs(voltage), np.angle(voltage)
+        iterations, mismatch_norm = 0, np.inf
+        while True:
+            current = admittance @ voltage
+            mismatch = voltage * np.conj(current) - injection
+            mismatch_norm = np.max(np.abs(mismatch[pq])) if len(pq) else 0.0
+            if mismatch_norm < tolerance or iterations >= max_iterations:
+                break
+
+            diag_voltage = sp.diags(voltage)
+            diag_current = sp.diags(current)
+            diag_unit = sp.diags(voltage / magnitude)
+            ds_dmagnitude = diag_voltage @ (admittance @ diag_unit).conj() + diag_current.conj() @ diag_unit
+            ds_dangle = 1j * diag_voltage @ (diag_current - admittance @ diag_voltage).conj()
+            ds_dmagnitude = ds_dmagnitude.tocsr()[pq][:, pq]
+            ds_dangle = ds_dangle.tocsr()[pq][:, pq]
+            jacobian = sp.vstack((sp.hstack((ds_dangle.real, ds_dmagnitude.real)),
+                                  sp.hstack((ds_dangle.imag, ds_dmagnitude.imag))), format="csc")
+            step = spsolve(jacobian, -np.concatenate((mismatch[pq].real, mismatch[pq].imag)))
+
+            angle[pq] += step[:len(pq)]
+            magnitude[pq] += step[len(pq):]
+            voltage = magnitude * np.exp(1j * angle)
+            iterations += 1
+        return voltage, mismatch_norm < tolerance, iterations, mismatch_norm
+
+    def _value(self, value):
+        return float(value.real) if self.technology == "dc" else complex(value)
+
+    def _slack_voltages(self, buses, slack_voltages):
+        """Slack bus positions -> voltage, from the extra slack buses and the active grids."""
+        position = {bus.id: k for k, bus in enumerate(buses)}
+        slack = {position[bus_id]: _nominal(value) for bus_id, value in (slack_voltages or {}).items()}
+        slack_grids = {}
+        for grid in self.network.grids:
+            if grid.bus.id in position and grid.status == "on":
+                k = position[grid.bus.id]
+                slack[k] = _nominal(grid.voltage)
+                slack_grids.setdefault(k, grid)
+        return slack, slack_grids
+
+    def _prepare(self, buses, slack_positions):
+        """
+        Admittance matrix, supplied buses and the LU factorisation of the PQ block, cached
+        until the network topology (Network.topology_version) or the set of slack buses changes.
+        """
+        key = (getattr(self.network, "topology_version", None), tuple(sorted(slack_positions)))
+        if self._cache is not None and self._cache["key"] == key and key[0] is not None:
+            return self._cache
+
+        lines = self._lines()
+        admittance = self.build_admittance(buses, lines)
+        position = {bus.id: k for k, bus in enumerate(buses)}
+        self._cache = self._factorise(admittance, list(slack_positions), key, self._bus_islands(buses))
+        self._cache.update({
+            "lines": lines,
+            "line_from": np.array([position[line.bus_from.id] for line in lines], dtype=np.intp),
+            "line_to": np.array([position[line.bus_to.id] for line in lines], dtype=np.intp),
+            "line_impedance": np.array([line.get_impedance() for line in lines], dtype=complex),
+        })
+        return self._cache
+
+    def _bus_islands(self, buses):
+        """Load-flow island of each bus, from the network's line topology index."""
+        labels = self.network.line_topology.labels()
+        return labels[np.array([bus.index for bus in buses], dtype=np.intp)]
+
+    def _factorise(self, admittance, slack_positions, key, labels):
+        """
+        Supplied nodes, PQ/slack partition and LU factors of the PQ block of an admittance
+        matrix; labels gives the island of each node.
+        """
+        slack = np.zeros(admittance.shape[0], dtype=bool)
+        slack[slack_positions] = True
+
+        # only nodes connected to a slack node can be solved
+        supplied = np.isin(labels, labels[slack])
+        index = np.flatnonzero(supplied)
+        sub_admittance = admittance[index][:, index].tocsc()
+        pq = np.flatnonzero(~slack[index])
+        pv = np.flatnonzero(slack[index])
+        self.factorisations += 1
+        return {
+            "key": key,
+            "admittance": admittance,
+            "slack": slack,
+            "supplied": supplied,
+            "index": index,
+            "sub_admittance": sub_admittance,
+            "pq": pq,
+            "coupling": sub_admittance[pq][:, pv],
+            "lu": splu(sub_admittance[pq][:, pq].tocsc()) if len(pq) else None,
+            "voltage": None,  # last solution, for warm starts
+        }
+
+    def _zbus(self, topology, injection, voltage):
+        """
+        Implicit Z-bus (fixed-point) iteration with the cached LU factors:
+        Y_qq V_q = conj(S_q / V_q) - Y_qs V_s. Returns (voltage, converged, iterations, max_mismatch).
+        """
+        pq, lu, admittance = topology["pq"], topology["lu"], topology["sub_admittance"]
+        slack_part = topology["coupling"] @ voltage[~np.isin(np.arange(len(voltage)), pq)]
+        iterations = 0
+        while True:
+            mismatch = voltage * np.conj(admittance @ voltage) - injection
+            mismatch_norm = np.max(np.abs(mismatch[pq])) if len(pq) else 0.0
+            if mismatch_norm < self.tolerance or iterations >= self.max_iterations or lu is None:
+                break
+            voltage[pq] = lu.solve(np.conj(injection[pq] / voltage[pq]) - slack_part)
+            iterations += 1
+        return voltage, mismatch_norm < self.tolerance, iterations, mismatch_norm
+
+    def _solve_nodes(self, topology, injection, slack_voltage, flat_start):
+        """
+        Node voltages for the given injections: Z-bus iteration on the cached factors from the
+        previous solution (or flat_start), then Newton-Raphson if that does not converge.
+        Unsupplied nodes get NaN. Returns (voltage, converged, iterations, max_mismatch).
+        """
+        slack, index = topology["slack"], topology["index"]
+        voltage = topology["voltage"].copy() if topology["voltage"] is not None else flat_start
+        for k, value in slack_voltage.items():
+            voltage[k] = value
+
+        solved, converged, iterations, mismatch = self._zbus(topology, injection[index], voltage[index].copy())
+        if not converged:
+            solved, converged, newton_iterations, mismatch = self.newton_raphson(
+                topology["sub_admittance"], injection[index], voltage[index], slack[index],
+                self.tolerance, self.max_iterations)
+            iterations += newton_iterations
+        voltage[:] = np.nan
+        voltage[index] = solved
+        if converged:
+            topology["voltage"] = voltage.copy()
+        return voltage, converged, iterations, mismatch
+
+    def solve(self, slack_voltages=None, exclude=()):
+        """
+        Solve the network, write the results back and return a summary dict.
+
+        The admittance matrix and its factorisation are reused while the topology is
+        unchanged, and each solve starts from the previous voltages. The fast Z-bus iteration
+        on the cached factors is tried first; Newton-Raphson takes over if it does not converge.
+
+        Parameters:
+        - slack_voltages (dict): extra slack buses, bus id -> voltage, e.g. buses held by a converter.
+        - exclude (iterable): (component, side) connections left out of the bus injections;
+          the power they must supply at a slack bus is reported in "slack_power".
+        """
+        buses = self._buses()
+        if not buses:
+            return {"converged": True, "iterations": 0, "max_mismatch": 0.0, "bus_voltage": {},
+                    "unsupplied_buses": [], "grid_power": {}, "slack_power": {}, "losses": self._value(0)}
+        slack_voltage, slack_grids = self._slack_voltages(buses, slack_voltages)
+        topology = self._prepare(buses, slack_voltage)
+        injection = self._injections(buses, exclude)
+        slack = topology["slack"]
+
+        flat_start = np.array([_nominal(bus.nominal_voltage) for bus in buses], dtype=complex)
+        voltage, converged, iterations, mismatch = self._solve_nodes(topology, injection, slack_voltage, flat_start)
+
+        for bus, value in zip(buses, voltage):
+            bus.voltage = self._value(value)
+
+        # slack buses take whatever closes the balance; grids are set to supply it
+        bus_power = voltage * np.conj(topology["admittance"] @ np.nan_to_num(voltage))
+        slack_power = {buses[k].id: self._value(bus_power[k] - injection[k]) for k in np.flatnonzero(slack)}
+        for k, grid in slack_grids.items():
+            supplied_power = bus_power[k] - injection[k]
+            grid.active_power = supplied_power.real
+            grid.reactive_power = supplied_power.imag if self.technology == "ac" else 0.0
+
+        v_from, v_to = voltage[topology["line_from"]], voltage[topology["line_to"]]
+        currents = (v_from - v_to) / topology["line_impedance"]
+        power_from = v_from * np.conj(currents)
+        power_to = -v_to * np.conj(currents)
+        for line, current, p_from, p_to in zip(topology["lines"], currents, power_from, power_to):
+            line.current = self._value(current)
+            line.power_from = self._value(p_from)
+            line.power_to = self._value(p_to)
+            line.power_loss = line.power_from + line.power_to
+        for line in self.network.lines:
+            if line.technology == self.technology and line.status == "off":
+                line.current = line.power_from = line.power_to = line.power_loss = self._value(0)
+        losses = power_from + power_to
+
+        return {
+            "converged": converged,
+            "iterations": iterations,
+            "max_mismatch": float(mismatch),
+            "bus_voltage": {bus.id: bus.voltage for bus in buses},
+            "unsupplied_buses": [bus.id for bus, ok in zip(buses, topology["supplied"]) if not ok],
+            "grid_power": {grid.id: self._value(complex(grid.active_power, grid.reactive_power)) for grid in slack_grids.values()},
+            "slack_power": slack_power,
+            "losses": self._value(np.sum(losses[~np.isnan(losses)])),
+        }
@@ -0,0 +1,119 @@
+import time
+
+import numpy as np
+
+from .bus import Bus
+from .grid import Grid
+from .line import Line
+from .load import Load
+from .network import Network
+from .power_flow import PowerFlowSolver
+from .print_theme import quiet
+
+
+def _feeder(buses, load=200.0, resistance=0.002, reactance=0.001):
+    """Radial feeder: a grid at the head and a load on every other bus."""
+    with quiet():
+        network = Network()
+        nodes = [Bus(id=f"B{k}", technology="ac", nominal_voltage=230.0) for k in range(buses)]
+        for bus in nodes:
+            network.add_bus(bus)
+        network.add_component(Grid(id="Grid", bus=nodes[0], max_power=None))
+        for k in range(1, buses):
+            network.add_component(Line(id=f"L{k}", bus_from=nodes[k - 1], bus_to=nodes[k], resistance=resistance,
+                                       reactance=reactance))
+            network.add_component(Load(id=f"Load{k}", bus=nodes[k], active_power=load, reactive_power=0.2 * load))
+    return network
+
+
+def _meshed():
+    """Four buses in a ring plus an isolated bus, with unequal loads."""
+    with quiet():
+        network = Network()
+        nodes = [Bus(id=f"B{k}", technology="ac", nominal_voltage=230.0) for k in range(5)]
+        for bus in nodes:
+            network.add_bus(bus)
+        network.add_component(Grid(id="Grid", bus=nodes[0], max_power=None))
+        for k, (a, b) in enumerate([(0, 1), (1, 2), (2, 3), (3, 0), (1, 3)]):
+            network.add_component(Line(id=f"L{k}", bus_from=nodes[a], bus_to=nodes[b], resistance=0.05 + 0.01 * k,
+                                       reactance=0.02))
+        for k, power in [(1, 3000.0), (2, 1500.0), (3, 4500.0), (4, 800.0)]:
+            network.add_component(Load(id=f"Load{k}", bus=nodes[k], active_power=power, reactive_power=0.3 * power))
+    return network
+
+
+def test_solution_satisfies_the_power_balance():
+    network = _meshed()
+    result = network.solve_power_flow(tolerance=1e-6)
+    assert result["converged"]
+    assert result["unsupplied_buses"] == ["B4"]
+    assert np.isnan(network.buses["B4"].voltage)
+
+    buses = [network.buses[f"B{k}"] for k in range(4)]
+    voltage = np.array([bus.voltage for bus in buses])
+    admittance = np.zeros((4, 4), dtype=complex)
+    for line in network.lines:
+        a, b = int(line.bus_from.id[1:]), int(line.bus_to.id[1:])
+        y = 1 / line.get_impedance()
+        admittance[[a, b], [a, b]] += y
+        admittance[a, b] -= y
+        admittance[b, a] -= y
+    bus_power = voltage * np.conj(admittance @ voltage)
+    loads = np.array([0.0, 3000.0, 1500.0, 4500.0]) * (1 + 0.3j)
+    assert np.allclose(bus_power[1:], -loads[1:], atol=1e-5)
+
+    # the grid covers the loads and the line losses, which are I^2 R
+    grid_power = complex(network.grids[0].active_power, network.grids[0].reactive_power)
+    assert np.isclose(grid_power, bus_power[0])
+    losses = sum(abs(line.current) ** 2 * line.get_impedance() for line in network.lines)
+    assert np.isclose(grid_power - loads.sum(), losses)
+    assert np.isclose(result["losses"], losses)
+
+
+def test_feeder_voltage_drops_along_the_line():
+    network = _feeder(500, load=20.0, resistance=0.0002, reactance=0.0001)
+    result = network.solve_power_flow(tolerance=1e-6)
+    assert result["converged"] and not result["unsupplied_buses"]
+    magnitude = np.abs([network.buses[f"B{k}"].voltage for k in range(500)])
+    assert magnitude[0] == 230.0
+    assert (np.diff(magnitude) < 0).all()
+    assert np.isclose(network.grids[0].active_power, 499 * 20.0 + np.real(result["losses"]))
+
+
+def _fresh_voltages(network):
+    """Voltages from a new solver, i.e. without any cached factorisation or warm start."""
+    PowerFlowSolver(network, tolerance=1e-8, max_iterations=50).solve()
+    return np.array([bus.voltage for bus in network.buses.values()])
+
+
+def test_cached_factorisation_matches_fresh_solves():
+    network = _meshed()
+    loads = [component for component in network.components if isinstance(component, Load)]
+    rng = np.random.default_rng(5)
+    for step in range(10):
+        for load in loads:
+            load.active_power = rng.uniform(500.0, 5000.0)
+        result = network.solve_power_flow(tolerance=1e-8, max_iterations=50)
+        assert result["converged"]
+        cached = np.array([bus.voltage for bus in network.buses.values()])
+        assert np.allclose(cached, _fresh_voltages(network), equal_nan=True, atol=1e-6)
+    assert network._power_flow_solvers["ac"].factorisations == 1
+
+    # switching a line changes the topology, so the factors are rebuilt once
+    network.lines[4].status = "off"
+    for step in range(3):
+        network.solve_power_flow(tolerance=1e-8, max_iterations=50)
+        cached = np.array([bus.voltage for bus in network.buses.values()])
+        assert np.allclose(cached, _fresh_voltages(network), equal_nan=True, atol=1e-6)
+    assert network._power_flow_solvers["ac"].factorisations == 2
+
+
+if __name__ == "__main__":
+    test_solution_satisfies_the_power_balance()
+    test_feeder_voltage_drops_along_the_line()
+    test_cached_factorisation_matches_fresh_solves()
+    feeder = _feeder(10000, load=1.0, resistance=0.0001, reactance=0.00005)
+    start = time.perf_counter()
+    summary = feeder.solve_power_flow()
+    print(f"10,000-bus feeder: converged={summary['converged']} in {time.perf_counter() - start:.2f} s")
+    print("power_flow: all tests passed")
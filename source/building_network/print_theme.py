@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+
 from rich.console import Console
 from rich.theme import Theme
 from rich.table import Table
@@ -16,8 +18,21 @@ custom_theme = Theme({
 })
 
 console = Console(theme=custom_theme)
+_messages_enabled = True
+
+@contextmanager
+def quiet():
+    """Suppress the network construction messages inside the block."""
+    global _messages_enabled
+    previous, _messages_enabled = _messages_enabled, False
+    try:
+        yield
+    finally:
+        _messages_enabled = previous
 
 def print_message_network(message):
+    if not _messages_enabled:
+        return
     # Print initial additions and connections
     def print_addition(message):
         console.print(f"[success]✓ {message}[/]")
@@ -77,7 +92,8 @@ def print_network_status(network):
         
         for comp in comps:
             
-            specific_attributes.update(vars(comp).keys())
+            # components are slotted views onto the network registry, so list their reported status
+            specific_attributes.update(comp.get_status().keys())
             discard_attributes = {"id","bus", "type"}
             specific_attributes-=discard_attributes
 
@@ -89,8 +105,9 @@ def print_network_status(network):
             row_data = [
             str(comp.id),
             ]
+            status = comp.get_status()
             for attr in sorted(specific_attributes):
-                row_data.append(str(getattr(comp, attr, "")))
+                row_data.append(str(status.get(attr, "")))
             table.add_row(*row_data)  
              
         console.print(table)
@@ -2,8 +2,10 @@
 from .electrical_component import ElectricalComponent
 
 class PV(ElectricalComponent):
+    __slots__ = ("max_power", "efficiency", "area", "current_irradiance")
+
     def __init__(self, id, bus, max_power=5000.0, efficiency=0.18, area=10.0, 
-                 phase_type="single", technology="dc", voltage_rating=None, status="on"):
+                 phase_type="single", technology="dc", voltage_rating=None, status="on", phase=None):
         """
         Initialize a photovoltaic (PV) system.
         
@@ -17,15 +19,14 @@ class PV(ElectricalComponent):
         - technology (str): "dc" (typical) or "ac" (if inverter-integrated).
         - voltage_rating (float or tuple): Rated voltage (e.g., 48V for DC).
         - active (bool): Whether the PV is operational.
+        - phase (str): "a", "b" or "c" for a single-phase device on a three-phase bus.
         """
         self.max_power = float(max_power)
         self.efficiency = float(efficiency)
         self.area = float(area)
         self.current_irradiance = 0.0  # W/m², set via generate_power        
         super().__init__(id, bus, phase_type=phase_type, type="generator", technology=technology, 
-                         voltage_rating=voltage_rating, status=status)
-
-        self._validate_inputs()
+                         voltage_rating=voltage_rating, status=status, phase=phase)
 
     def _validate_inputs(self):
         """Validate PV parameters."""
@@ -0,0 +1,115 @@
+import numpy as np
+
+from .bus import Bus
+from .energy_storage import EnergyStorage
+from .ev_charger import EVCharger
+from .grid import Grid
+from .heat_pump import HeatPump
+from .inverter import Inverter
+from .load import Load
+from .network import Network
+from .print_theme import quiet
+from .pv import PV
+
+STEPS = 96
+TIME_STEP = 0.25  # h
+
+
+def _network():
+    with quiet():
+        network = Network()
+        ac_bus = Bus(id="AC_Bus", technology="ac", nominal_voltage=230.0)
+        dc_bus = Bus(id="DC_Bus", technology="dc", nominal_voltage=48.0)
+        network.add_bus(ac_bus)
+        network.add_bus(dc_bus)
+        network.add_components([
+            Grid(id="Grid_AC", bus=ac_bus, max_power=6000.0),
+            Grid(id="Grid_DC", bus=dc_bus, max_power=800.0, technology="dc"),
+            PV(id="PV", bus=dc_bus, max_power=3000.0, area=20.0),
+            Load(id="Load", bus=ac_bus, active_power=500.0, reactive_power=50.0),
+            HeatPump(id="HeatPump", bus=ac_bus, rated_power=3000.0),
+            EnergyStorage(id="Battery", bus=dc_bus, capacity=5000.0, initial_soc=0.5, max_charge_power=1500.0,
+                          max_discharge_power=1500.0),
+            EVCharger(id="EV", bus=ac_bus, max_charge_power=7000.0, max_discharge_power=3000.0, ev_capacity=20000.0,
+                      initial_soc=0.3),
+            Inverter(id="Inverter", bus_input=dc_bus, bus_output=ac_bus, max_power=4000.0),
+        ])
+    return network
+
+
+def _profiles(rng):
+    return {
+        "PV": np.maximum(1000.0 * np.sin(np.linspace(0, np.pi, STEPS)) + rng.normal(0, 50, STEPS), 0.0),
+        "Load": {"active_power": rng.uniform(200.0, 2500.0, STEPS), "reactive_power": rng.uniform(0.0, 300.0, STEPS)},
+        "HeatPump": rng.uniform(0.0, 1.0, STEPS),
+        "Battery": rng.uniform(-2000.0, 2000.0, STEPS),  # beyond the limits, so they clip
+        "EV": rng.uniform(-4000.0, 8000.0, STEPS),
+        "Inverter": rng.uniform(-3000.0, 3000.0, STEPS),
+    }
+
+
+def _step_by_step(network, profiles):
+    """Reference: the same profiles applied one step at a time through the component methods."""
+    components = {component.id: component for component in network.components + network.inverters}
+    columns = {name: [] for name in ("AC_Bus.active_balance", "AC_Bus.reactive_balance", "DC_Bus.active_balance",
+                                     "Grid_AC.active_power", "Grid_AC.reactive_power", "Grid_DC.active_power",
+                                     "Battery.soc", "EV.soc", "HeatPump.reactive_power")}
+    for k in range(STEPS):
+        components["PV"].generate_power(profiles["PV"][k])
+        components["Load"].active_power = profiles["Load"]["active_power"][k]
+        components["Load"].reactive_power = profiles["Load"]["reactive_power"][k]
+        # run_timeseries derives the heat pump's reactive power at every step (see its docstring)
+        components["HeatPump"].reactive_power = 0.0
+        components["HeatPump"].set_operating_condition(profiles["HeatPump"][k])
+        for battery_id in ("Battery", "EV"):
+            setpoint = profiles[battery_id][k]
+            if setpoint >= 0:
+                components[battery_id].charge(setpoint, TIME_STEP)
+            else:
+                components[battery_id].discharge(-setpoint, TIME_STEP)
+        components["Inverter"].set_input_power(profiles["Inverter"][k])
+
+        for grid in network.grids:
+            grid.supply_power(0.0 if grid.technology == "dc" else 0j)
+            grid.supply_power(-grid.bus.get_power_balance())
+        ac_balance = network.buses["AC_Bus"].get_power_balance()
+        columns["AC_Bus.active_balance"].append(ac_balance.real)
+        columns["AC_Bus.reactive_balance"].append(ac_balance.imag)
+        columns["DC_Bus.active_balance"].append(network.buses["DC_Bus"].get_power_balance())
+        columns["Grid_AC.active_power"].append(network.grids[0].active_power)
+        columns["Grid_AC.reactive_power"].append(network.grids[0].reactive_power)
+        columns["Grid_DC.active_power"].append(network.grids[1].active_power)
+        columns["Battery.soc"].append(components["Battery"].soc)
+        columns["EV.soc"].append(components["EV"].soc)
+        columns["HeatPump.reactive_power"].append(components["HeatPump"].reactive_power)
+    return {name: np.asarray(values) for name, values in columns.items()}
+
+
+def test_run_timeseries_matches_step_by_step_loop():
+    profiles = _profiles(np.random.default_rng(3))
+    results = _network().run_timeseries(profiles, time_step=TIME_STEP)
+    reference = _step_by_step(_network(), profiles)
+    for name, values in reference.items():
+        assert np.allclose(results[name], values, rtol=1e-9, atol=1e-6), name
+    # the grid limits are hit, so the buses are not always balanced
+    assert np.abs(results["AC_Bus.active_balance"]).max() > 1.0 or np.abs(results["DC_Bus.active_balance"]).max() > 1.0
+
+
+def test_heat_pump_reactive_power_follows_every_step():
+    # step by step, set_operating_condition keeps the reactive power of its first call;
+    # run_timeseries uses 0.2 x active power at every step
+    network = _network()
+    fraction = np.linspace(0.1, 1.0, STEPS)
+    results = network.run_timeseries({"HeatPump": fraction}, time_step=TIME_STEP)
+    assert np.allclose(results["HeatPump.reactive_power"], 0.2 * 3000.0 * fraction)
+
+    pump = next(component for component in _network().components if component.id == "HeatPump")
+    pump.set_operating_condition(fraction[0])
+    pump.set_operating_condition(fraction[-1])
+    assert np.isclose(pump.reactive_power, 0.2 * 3000.0 * fraction[0])
+
+
+if __name__ == "__main__":
+    test_run_timeseries_matches_step_by_step_loop()
+    test_heat_pump_reactive_power_follows_every_step()
+    print("run_timeseries: all tests passed")
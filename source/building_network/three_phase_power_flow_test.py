@@ -0,0 +1,62 @@
+import numpy as np
+
+from .bus import Bus
+from .grid import Grid
+from .line import Line
+from .load import Load
+from .network import Network
+from .print_theme import quiet
+
+
+def _feeder(phase_type, loads):
+    """Grid, a line and a load bus; loads is a list of (active power, phase) on the far bus."""
+    voltage = (230.0, 400.0) if phase_type == "three" else 230.0
+    with quiet():
+        network = Network()
+        head = Bus(id="Head", technology="ac", phase_type=phase_type, nominal_voltage=voltage)
+        end = Bus(id="End", technology="ac", phase_type=phase_type, nominal_voltage=voltage)
+        network.add_bus(head)
+        network.add_bus(end)
+        network.add_component(Grid(id="Grid", bus=head, max_power=None, voltage=voltage, phase_type=phase_type))
+        network.add_component(Line(id="Line", bus_from=head, bus_to=end, resistance=0.2, reactance=0.08,
+                                   phase_type=phase_type))
+        for k, (power, phase) in enumerate(loads):
+            network.add_component(Load(id=f"Load{k}", bus=end, active_power=power, reactive_power=0.25 * power,
+                                       phase=phase))
+    return network
+
+
+def test_balanced_loads_match_the_single_phase_solve():
+    three = _feeder("three", [(3000.0, "a"), (3000.0, "b"), (3000.0, "c")])
+    result = three.solve_unbalanced_power_flow(tolerance=1e-9)
+    assert result["converged"]
+    single = _feeder("single", [(3000.0, None)])
+    assert single.solve_power_flow(tolerance=1e-9)["converged"]
+
+    # each phase carries one third of the power over its own conductor: the single-phase case
+    phases = np.array(result["bus_voltage"]["End"])
+    reference = single.buses["End"].voltage
+    assert np.allclose(np.abs(phases), abs(reference), atol=1e-6)
+    assert np.allclose(phases * np.array([1, np.exp(2j * np.pi / 3), np.exp(-2j * np.pi / 3)]), reference, atol=1e-6)
+    assert result["unbalance_factor"]["End"] < 1e-9
+    assert np.isclose(result["grid_power"]["Grid"], 3 * complex(single.grids[0].active_power,
+                                                                single.grids[0].reactive_power))
+
+
+def test_single_phase_load_unbalances_the_bus():
+    network = _feeder("three", [(3000.0, "a")])
+    result = network.solve_unbalanced_power_flow(tolerance=1e-9)
+    assert result["converged"]
+    magnitude = np.abs(result["bus_voltage"]["End"])
+    assert result["unbalance_factor"]["End"] > 1e-3
+    assert magnitude[0] < magnitude[1] and magnitude[0] < magnitude[2]
+    # without mutual coupling the unloaded phases keep the slack voltage
+    assert np.allclose(magnitude[1:], 230.0)
+    # the head is a balanced slack, so it is not unbalanced
+    assert result["unbalance_factor"]["Head"] < 1e-12
+
+
+if __name__ == "__main__":
+    test_balanced_loads_match_the_single_phase_solve()
+    test_single_phase_load_unbalances_the_bus()
+    print("three_phase_power_flow: all tests passed")
@@ -0,0 +1,169 @@
+# source/building_network/topology_index.py
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from .component_registry import STATUS_CODES
+
+
+class TopologyIndex:
+    """
+    Connectivity of the buses of a Network, kept up to date as the network changes.
+
+    A union-find (disjoint-set) structure over bus indices: adding a bus, or a line or
+    inverter that is on, merges sets in near-constant time, and island queries cost O(α(n)).
+    Removing a connection cannot be undone in a union-find, so switching a line or inverter
+    off marks the index stale and the next query rebuilds it in one vectorised pass.
+    Inverter status lives in the registry and is compared against a snapshot at query time,
+    which catches status changes made by array writes as well.
+
+    With through_inverters=False only lines connect buses, which gives the islands of the
+    AC and DC load flows; with True (the default) inverters connect them as well, which
+    gives the buses that can be supplied from a grid.
+    """
+
+    def __init__(self, network, through_inverters=True):
+        self.network = network
+        self.through_inverters = through_inverters
+        self._parent = []
+        self._rank = []
+        self._stale = False
+        self._inverter_status = np.zeros(0, dtype=np.int8)
+
+    def __len__(self):
+        return len(self._parent)
+
+    def find(self, index):
+        """Representative bus index of the island of a bus index."""
+        if self._needs_rebuild():
+            self._rebuild()
+        return self._find(index)
+
+    def _find(self, index):
+        # path halving
+        parent = self._parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def _union(self, a, b):
+        if self._stale:
+            return  # the pending rebuild includes the connection
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._rank[a] < self._rank[b]:
+            a, b = b, a
+        self._parent[b] = a
+        if self._rank[a] == self._rank[b]:
+            self._rank[a] += 1
+
+    def _edges(self):
+        """Bus index pairs of the lines and (optionally) inverters that are on."""
+        pairs = [(line.bus_from.index, line.bus_to.index) for line in self.network.lines if line.status == "on"]
+        if self.through_inverters:
+            pairs += [(inverter.bus_input.index, inverter.bus_output.index)
+                      for inverter in self.network.inverters if inverter.status == "on"]
+        return np.array(pairs, dtype=np.intp).reshape(-1, 2)
+
+    def _inverter_snapshot(self):
+        if not self.through_inverters or not self.network.inverters:
+            return np.zeros(0, dtype=np.int8)
+        slots = np.fromiter((inverter.slot for inverter in self.network.inverters), dtype=np.intp,
+                            count=len(self.network.inverters))
+        return self.network.registry.status[slots]
+
+    def _needs_rebuild(self):
+        if self._stale:
+            return True
+        if self.through_inverters and self.network.inverters:
+            # cheap vectorised check for inverters switched through the registry
+            return not np.array_equal(self._inverter_snapshot(), self._inverter_status)
+        return False
+
+    def _rebuild(self):
+        size = len(self._parent)
+        self._stale = False
+        self._inverter_status = self._inverter_snapshot()
+        if not size:
+            return
+        edges = self._edges()
+        graph = sp.csr_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(size, size))
+        _, labels = connected_components(graph, directed=False)
+        # first bus of each island becomes its representative
+        representative = np.full(labels.max() + 1, size, dtype=np.intp)
+        np.minimum.at(representative, labels, np.arange(size))
+        self._parent = representative[labels].tolist()
+        self._rank = [0] * size
+        for root in set(self._parent):
+            self._rank[root] = 1
+
+    def add_bus(self, bus):
+        """Register a bus (no-op for an index already known)."""
+        while len(self._parent) <= bus.index:
+            self._parent.append(len(self._parent))
+            self._rank.append(0)
+
+    def add_connection(self, element):
+        """Register a Line or Inverter just added to the network."""
+        from .inverter import Inverter
+
+        if isinstance(element, Inverter):
+            if not self.through_inverters:
+                return
+            self._inverter_status = np.append(self._inverter_status, STATUS_CODES[element.status])
+            if element.status == "on":
+                self._union(element.bus_input.index, element.bus_output.index)
+        elif element.status == "on":
+            self._union(element.bus_from.index, element.bus_to.index)
+
+    def connection_switched(self, element):
+        """A line changed status: merge islands when it closed, rebuild lazily when it opened."""
+        if element.status == "on":
+            self._union(element.bus_from.index, element.bus_to.index)
+        else:
+            self._stale = True
+
+    def invalidate(self):
+        """Force a rebuild on the next query, e.g. after connections were edited in place."""
+        self._stale = True
+
+    def labels(self):
+        """Representative bus index of every bus, as an array indexed by Bus.index."""
+        if self._needs_rebuild():
+            self._rebuild()
+        parent = np.array(self._parent, dtype=np.intp)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        self._parent = parent.tolist()  # keep the compressed paths
+        return parent
+
+    def island(self, bus):
+        """Representative bus index of the island containing a bus."""
+        return self.find(bus.index)
+
+    def connected(self, bus_a, bus_b):
+        return self.find(bus_a.index) == self.find(bus_b.index)
+
+    def islands(self):
+        """Island representative -> list of bus ids."""
+        labels = self.labels()
+        islands = {}
+        for bus in self.network.buses.values():
+            islands.setdefault(int(labels[bus.index]), []).append(bus.id)
+        return islands
+
+    def supplied_mask(self):
+        """Boolean array over Bus.index: True for buses in an island with an active grid."""
+        labels = self.labels()
+        grid_buses = [grid.bus.index for grid in self.network.grids if grid.status == "on"]
+        return np.isin(labels, labels[grid_buses]) if grid_buses else np.zeros(len(labels), dtype=bool)
+
+    def islanded_buses(self):
+        """Ids of buses that cannot be reached from any active grid."""
+        supplied = self.supplied_mask()
+        return [bus.id for bus in self.network.buses.values() if not supplied[bus.index]]
@@ -0,0 +1,88 @@
+import networkx as nx
+import numpy as np
+
+from .bus import Bus
+from .grid import Grid
+from .inverter import Inverter
+from .line import Line
+from .network import Network
+from .print_theme import quiet
+
+
+def _random_network(rng, ac_buses=60, dc_buses=20, lines=70, inverters=6):
+    """Random AC and DC line graphs joined by a few inverters, with grids on some AC buses."""
+    with quiet():
+        network = Network()
+        ac = [Bus(id=f"AC{k}", technology="ac") for k in range(ac_buses)]
+        dc = [Bus(id=f"DC{k}", technology="dc", nominal_voltage=48.0) for k in range(dc_buses)]
+        for bus in ac + dc:
+            network.add_bus(bus)
+        for k in range(lines):
+            group, technology = (ac, "ac") if k % 4 else (dc, "dc")
+            a, b = rng.choice(len(group), size=2, replace=False)
+            network.add_component(Line(id=f"L{k}", bus_from=group[a], bus_to=group[b], technology=technology))
+        for k in range(inverters):
+            network.add_component(Inverter(id=f"Inv{k}", bus_input=dc[rng.integers(dc_buses)],
+                                           bus_output=ac[rng.integers(ac_buses)]))
+        for k in rng.choice(ac_buses, size=3, replace=False):
+            network.add_component(Grid(id=f"Grid{k}", bus=ac[k], max_power=None))
+    return network
+
+
+def _reference(network, through_inverters):
+    """Islands as frozensets of bus ids, from networkx over the connections that are on."""
+    graph = nx.Graph()
+    graph.add_nodes_from(network.buses)
+    graph.add_edges_from((line.bus_from.id, line.bus_to.id) for line in network.lines if line.status == "on")
+    if through_inverters:
+        graph.add_edges_from((inverter.bus_input.id, inverter.bus_output.id)
+                             for inverter in network.inverters if inverter.status == "on")
+    return {frozenset(component) for component in nx.connected_components(graph)}
+
+
+def _partition(index):
+    return {frozenset(ids) for ids in index.islands().values()}
+
+
+def _check(network):
+    assert _partition(network.line_topology) == _reference(network, through_inverters=False)
+    islands = _reference(network, through_inverters=True)
+    assert _partition(network.topology) == islands
+    grid_buses = {grid.bus.id for grid in network.grids if grid.status == "on"}
+    expected = sorted(bus for island in islands if island & grid_buses for bus in island)
+    supplied = network.topology.supplied_mask()
+    assert sorted(bus.id for bus in network.buses.values() if supplied[bus.index]) == expected
+    assert set(network.topology.islanded_buses()) == set(network.buses) - set(expected)
+
+
+def test_islands_match_networkx_while_switching():
+    rng = np.random.default_rng(11)
+    for trial in range(5):
+        network = _random_network(rng)
+        _check(network)
+        for step in range(40):
+            # mostly line switching, with inverters toggled now and then
+            if step % 5 == 4:
+                inverter = network.inverters[rng.integers(len(network.inverters))]
+                inverter.status = "off" if inverter.status == "on" else "on"
+            else:
+                line = network.lines[rng.integers(len(network.lines))]
+                line.status = "off" if line.status == "on" else "on"
+            _check(network)
+
+
+def test_labels_are_the_island_representatives():
+    network = _random_network(np.random.default_rng(2))
+    for index in (network.topology, network.line_topology):
+        labels = index.labels()
+        for bus_a in network.buses.values():
+            for bus_b in network.buses.values():
+                assert (labels[bus_a.index] == labels[bus_b.index]) == index.connected(bus_a, bus_b)
+        # labels are fully compressed: every label is its own representative
+        assert np.array_equal(labels[labels], labels)
+
+
+if __name__ == "__main__":
+    test_islands_match_networkx_while_switching()
+    test_labels_are_the_island_representatives()
+    print("topology_index: all tests passed")
@@ -1 +1,11 @@
-from .energy_storage import EnergyStorageModel
\ No newline at end of file
+from .energy_storage import EnergyStorageModel
+from .executor import EnergyStorageExecutor
+from .service import BatteryService, BatteryServiceClient
+from .degradation_surface import DegradationSurface, build_degradation_surface
+from .constraint_monitor import ConstraintMonitor, Violation
+from .model_registry import ModelRegistry, SharedModel, model_registry
+from .mesh_tuning import load_var_pts, tune_var_pts
+from .realtime import RealTimeStepper
+from .empirical_model import EmpiricalEnergyStorageModel
+from .ageing import interval_ageing, soh_daily_change
+from .trace_export import SolutionTrace, SolutionTraceWriter
\ No newline at end of file
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+# empirical ageing constants of the optimisation study
+K_S1 = -4.092e-4
+K_S2 = -2.167
+K_S3 = 1.408e-5
+K_S4 = 6.13
+E_A = 78.06  # kJ/mol
+R = 8.314  # J/(K.mol)
+T_REF = 298.15  # K
+CALENDAR_SLOPE = 6.6148e-6  # calendar ageing [%/h] per unit average SOC
+CALENDAR_OFFSET = 4.6404e-6  # calendar ageing [%/h]
+
+
+def soc_interval_stats(charge_start, charge_end, capacity):
+    """
+    Average SOC and SOC deviation (fractions) over intervals where the stored charge moves
+    linearly from charge_start to charge_end.
+
+    The SOC is linear in the charge, so the integrals have closed forms:
+    avg = (Q0 + Q1) / (2 Qmax) and dev = sqrt(3 / dQ * integral (Q/Qmax - avg)^2 dQ) = |dQ| / (2 Qmax).
+    """
+    soc_avg = (charge_start + charge_end) / (2 * capacity)
+    soc_dev = np.abs(charge_end - charge_start) / (2 * capacity)
+    return soc_avg, soc_dev
+
+
+def stress_factor(soc_dev, soc_avg, k_s1=K_S1, k_s2=K_S2, k_s3=K_S3, k_s4=K_S4):
+    """Cycle-ageing stress factor of an interval."""
+    return k_s1 * soc_dev * np.exp(k_s2 * soc_avg) + k_s3 * np.exp(k_s4 * soc_dev)
+
+
+def arrhenius_factor(temperature, activation_energy=E_A, gas_constant=R, reference_temperature=T_REF):
+    """Temperature acceleration at temperature [K], activation energy in kJ/mol."""
+    return np.exp(-activation_energy * 1000 / gas_constant * (1 / temperature - 1 / reference_temperature))
+
+
+def calendar_ageing(soc_avg, hours, slope=CALENDAR_SLOPE, offset=CALENDAR_OFFSET):
+    """Calendar ageing [%] over the given number of hours at an average SOC (fraction)."""
+    return (slope * soc_avg + offset) * hours
+
+
+def interval_ageing(charge, capacity, time_step, temperature=T_REF) -> dict:
+    """
+    Per-interval stress and ageing of a batch of charge trajectories.
+
+    Args:
+        charge (array): stored charge samples (Ah), shape (..., n); interval k runs from
+            sample k-1 to sample k, so n samples give n-1 intervals.
+        capacity (float or array): capacity (Ah), broadcast against the batch dimensions.
+        time_step (float): interval length (h).
+        temperature (float or array): cell temperature (K), scalar or per interval.
+    Returns:
+        dict of arrays of shape (..., n-1): soc_avg, soc_dev, stress, cycle [Ah-weighted] and
+        calendar [%] ageing, and the SOH loss [%] of each interval.
+    """
+    charge = np.asarray(charge, dtype=float)
+    capacity = np.asarray(capacity, dtype=float)[..., np.newaxis]
+    charge_start, charge_end = charge[..., :-1], charge[..., 1:]
+
+    soc_avg, soc_dev = soc_interval_stats(charge_start, charge_end, capacity)
+    stress = stress_factor(soc_dev, soc_avg)
+    cycle = stress * np.abs(charge_end - charge_start) * arrhenius_factor(temperature)
+    calendar = calendar_ageing(soc_avg, time_step)
+    return {
+        "soc_avg": soc_avg,
+        "soc_dev": soc_dev,
+        "stress": stress,
+        "cycle": cycle,
+        "calendar": calendar,
+        "soh_loss": calendar + 100 * cycle / capacity,
+    }
+
+
+def soh_daily_change(charge, capacity, steps_per_hour: int = 12, temperature=303.15, initial_charge=None):
+    """
+    Daily SOH loss [%] of one or many charge trajectories, as whole-array operations.
+
+    Vectorised replacement of the optimisation notebook's soh_daily_change. The trajectory is
+    cut into days of 24 * steps_per_hour intervals (a trailing partial day is dropped); each
+    day's loss is its calendar ageing plus 100 * cycle ageing / capacity, floored at zero.
+    Unlike the notebook loop, every interval is counted once with its own charge throughput,
+    and the stress factor receives (deviation, average) in its declared order.
+
+    Args:
+        charge (array): stored charge (Ah) at the end of each interval, shape (..., n) for a
+            batch of trajectories.
+        capacity (float or array): capacity (Ah) per trajectory.
+        steps_per_hour (int): samples per hour (12 for 5-minute data).
+        temperature (float or array): cell temperature (K).
+        initial_charge (float or array): charge before the first interval; defaults to the
+            first sample, i.e. no throughput in the first interval.
+    Returns:
+        array of shape (..., days).
+    """
+    charge = np.asarray(charge, dtype=float)
+    if initial_charge is None:
+        initial_charge = charge[..., 0]
+    initial_charge = np.broadcast_to(np.asarray(initial_charge, dtype=float), charge.shape[:-1])[..., np.newaxis]
+    ageing = interval_ageing(np.concatenate((initial_charge, charge), axis=-1), capacity, 1 / steps_per_hour, temperature)
+    loss = ageing["soh_loss"]
+    steps_per_day = 24 * steps_per_hour
+    days = loss.shape[-1] // steps_per_day
+    daily = loss[..., :days * steps_per_day].reshape(loss.shape[:-1] + (days, steps_per_day)).sum(axis=-1)
+    return np.maximum(daily, 0.0)
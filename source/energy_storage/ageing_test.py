@@ -0,0 +1,56 @@
+import numpy as np
+from scipy.integrate import quad
+
+from .ageing import CALENDAR_OFFSET, CALENDAR_SLOPE, E_A, R, T_REF, interval_ageing, soc_interval_stats, stress_factor
+
+
+# integral definitions of the optimisation notebook, used as the reference
+def _soc_avg_quad(charge_start, charge_end, capacity):
+    integral, _ = quad(lambda charge: charge / capacity, charge_start, charge_end)
+    return integral / (charge_end - charge_start)
+
+
+def _soc_dev_quad(charge_start, charge_end, capacity):
+    soc_avg = _soc_avg_quad(charge_start, charge_end, capacity)
+    integral, _ = quad(lambda charge: (charge / capacity - soc_avg) ** 2, charge_start, charge_end)
+    return np.sqrt(abs(3 / (charge_end - charge_start) * integral))
+
+
+def _random_trajectories(rng, count=20, samples=50, capacity=25.0):
+    steps = rng.normal(0.0, 0.05 * capacity, size=(count, samples))
+    return np.clip(0.5 * capacity + np.cumsum(steps, axis=1), 0.0, capacity)
+
+
+def test_soc_interval_stats_match_quadrature():
+    rng = np.random.default_rng(7)
+    capacity = 25.0
+    charge = _random_trajectories(rng, capacity=capacity)
+    soc_avg, soc_dev = soc_interval_stats(charge[:, :-1], charge[:, 1:], capacity)
+    for trajectory, averages, deviations in zip(charge, soc_avg, soc_dev):
+        for k in range(len(trajectory) - 1):
+            start, end = trajectory[k], trajectory[k + 1]
+            if start == end:  # the notebook divides by the charge moved
+                continue
+            assert np.isclose(averages[k], _soc_avg_quad(start, end, capacity), rtol=1e-9, atol=1e-12)
+            assert np.isclose(deviations[k], _soc_dev_quad(start, end, capacity), rtol=1e-6, atol=1e-12)
+
+
+def test_interval_ageing_matches_per_interval_sums():
+    rng = np.random.default_rng(11)
+    capacity, time_step, temperature = 25.0, 1 / 12, 303.15
+    charge = _random_trajectories(rng, count=3, capacity=capacity)
+    ageing = interval_ageing(charge, capacity, time_step, temperature)
+    arrhenius = np.exp(-E_A * 1000 / R * (1 / temperature - 1 / T_REF))
+    for trajectory, losses in zip(charge, ageing["soh_loss"]):
+        for k in range(len(trajectory) - 1):
+            start, end = trajectory[k], trajectory[k + 1]
+            soc_avg, soc_dev = (start + end) / (2 * capacity), abs(end - start) / (2 * capacity)
+            cycle = stress_factor(soc_dev, soc_avg) * abs(end - start) * arrhenius
+            calendar = (CALENDAR_SLOPE * soc_avg + CALENDAR_OFFSET) * time_step
+            assert np.isclose(losses[k], calendar + 100 * cycle / capacity, rtol=1e-12)
+
+
+if __name__ == "__main__":
+    test_soc_interval_stats_match_quadrature()
+    test_interval_ageing_matches_per_interval_sums()
+    print("ageing: all tests passed")
@@ -0,0 +1,258 @@
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            "benchmarks", "energy_storage_history.jsonl")
+
+# same pack as main.py
+PARAMETERS = {
+    "cell_model": "DFN",
+    "cell_chemistry": "Chen2020",
+    "time_resolution [s]": 1,
+    "nominal_voltage [v]": 345.0,
+    "nominal_capacity [Ah]": 25.0,
+    "ambient_temperature [°C]": 25.0,
+    "current [A]": 0.0,
+    "power_max [w]": 5000.0,
+    "state_of_health_init [%]": 100.0,
+    "state_of_charge_init [%]": 50.0,
+    "nominal_cell_voltage [V]": 3.63,
+    "discharge_current_max [A]": 20.0,
+    "charge_current_max [A]": 10.0,
+    "state_of_charge_min [%]": 15.0,
+    "state_of_charge_max [%]": 90.0,
+    "end_of_life_point [%]": 80.0,
+    "charge_efficiency [%]": 96.0,
+    "discharge_efficiency [%]": 96.0,
+    "temperature_max [°C]": 60.0,
+    "c_rate_charge_max": 1.0,
+    "c_rate_discharge_max": 1.0,
+}
+
+AMBIENT_TEMPERATURE = 25.0  # °C
+PROFILE_AMPLITUDE = 10.0  # A
+PROFILE_STEP_SIZES = (60, 300, 900)  # s
+REFERENCE_STEP_SIZE = 60  # s
+COMPARE_EVERY = 900  # s, common sampling of profile runs and reference
+
+
+def profile_current(time_s: np.ndarray) -> np.ndarray:
+    """Synthetic daily current profile: charge around noon, discharge in the evening (A, > 0 charges)."""
+    return PROFILE_AMPLITUDE * np.sin(2 * np.pi * time_s / 86400 - np.pi / 2)
+
+
+def _new_model(var_pts: dict = None):
+    from .energy_storage import EnergyStorageModel
+
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters=PARAMETERS, var_pts=var_pts)
+    return model
+
+
+def _step(model, current: float, time_duration: int) -> bool:
+    error, model.state = model.run_model(current=current, ambient_temp=AMBIENT_TEMPERATURE,
+                                         time_duration=time_duration, previous_state=model.state)
+    return error
+
+
+def _run_profile(model, hours: float, step_size: int) -> dict:
+    """Run the synthetic profile and sample SOC, voltage and temperature every COMPARE_EVERY seconds."""
+    starts = np.arange(0, hours * 3600, step_size)
+    trace = {"state_of_charge": [], "cell_voltage": [], "temperature": []}
+    errors = 0
+    for start, current in zip(starts, profile_current(starts + step_size / 2)):
+        errors += _step(model, float(current), step_size)
+        if (start + step_size) % COMPARE_EVERY == 0:
+            trace["state_of_charge"].append(model.state_of_charge)
+            trace["cell_voltage"].append(model.cell_voltage)
+            trace["temperature"].append(model.temperature)
+    result = {name: np.asarray(values) for name, values in trace.items()}
+    result["solver_errors"] = errors
+    return result
+
+
+def case_cold_initialize() -> dict:
+    """First model of a fresh process: includes building and discretising the shared model."""
+    _new_model()
+    return {}
+
+
+def case_step_latency(steps: int = 50, time_duration: int = 60) -> dict:
+    model = _new_model()
+    rng = np.random.default_rng(0)
+    latencies = []
+    for current in rng.uniform(-PARAMETERS["discharge_current_max [A]"], PARAMETERS["charge_current_max [A]"], steps):
+        start = time.perf_counter()
+        _step(model, float(current), time_duration)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.asarray(latencies)
+    metrics = {f"latency_p{q} [s]": float(np.percentile(latencies, q)) for q in (50, 90, 99)}
+    metrics["latency_max [s]"] = float(latencies.max())
+    return metrics
+
+
+def case_rest_steps(steps: int = 50, time_duration: int = 60) -> dict:
+    model = _new_model()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _step(model, 0.0, time_duration)
+    return {"mean_rest_step [s]": (time.perf_counter() - start) / steps}
+
+
+def case_soh_update(repeats: int = 20) -> dict:
+    model = _new_model()
+    _step(model, -PARAMETERS["discharge_current_max [A]"] / 2, 600)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model._EnergyStorageModel__update_state_of_health(model.state)
+    return {"mean_soh_update [s]": (time.perf_counter() - start) / repeats}
+
+
+def case_profile(step_size: int, hours: float = 24.0) -> dict:
+    from .mesh_tuning import REFERENCE_VAR_PTS
+
+    start = time.perf_counter()
+    run = _run_profile(_new_model(), hours, step_size)
+    wall_time = time.perf_counter() - start
+    reference = _run_profile(_new_model(REFERENCE_VAR_PTS), hours, REFERENCE_STEP_SIZE)
+
+    metrics = {"profile_wall_time [s]": wall_time, "solver_errors": run["solver_errors"]}
+    for name in ("state_of_charge", "cell_voltage", "temperature"):
+        metrics[f"{name}_max_error"] = float(np.max(np.abs(run[name] - reference[name])))
+    return metrics
+
+
+def _measure(case_name: str, kwargs: dict, trace_memory: bool = False) -> dict:
+    """
+    Run one case in this (fresh) process. Timed runs add wall time and the process peak memory;
+    with trace_memory, the Python peak memory is measured instead, since tracemalloc slows down
+    every allocation and would distort the timings.
+    """
+    if trace_memory:
+        tracemalloc.start()
+        CASES[case_name](**kwargs)
+        _, python_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"python_peak_memory [MB]": python_peak / 2**20}
+
+    start = time.perf_counter()
+    metrics = CASES[case_name](**kwargs)
+    wall_time = time.perf_counter() - start
+    metrics.update({
+        "wall_time [s]": wall_time,
+        "process_peak_memory [MB]": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10,
+    })
+    return metrics
+
+
+CASES = {
+    "cold_initialize": case_cold_initialize,
+    "step_latency": case_step_latency,
+    "rest_steps": case_rest_steps,
+    "soh_update": case_soh_update,
+    "profile": case_profile,
+}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(cases: list = None, hours: float = 24.0, history_path: str = HISTORY_PATH) -> list:
+    """
+    Run the benchmark cases, each in a fresh process so that cold starts and peak memory are
+    not shared, and append one JSON record per case to the history file. Every case runs twice:
+    once timed, once under tracemalloc for the Python peak memory.
+    """
+    import pybamm
+
+    jobs = []
+    for name in cases or CASES:
+        if name == "profile":
+            jobs += [(f"profile_{step_size}s", "profile", {"step_size": step_size, "hours": hours})
+                     for step_size in PROFILE_STEP_SIZES]
+        else:
+            jobs.append((name, name, {}))
+
+    common = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "pybamm": pybamm.__version__,
+        "machine": platform.machine(),
+    }
+    records = []
+    for label, case_name, kwargs in jobs:
+        logging.info(f"Running benchmark {label}")
+        metrics = {}
+        for trace_memory in (False, True):  # timing and memory tracing each in their own fresh process
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                metrics.update(pool.submit(_measure, case_name, kwargs, trace_memory).result())
+        records.append({**common, "case": label, **kwargs, "metrics": metrics})
+
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    with open(history_path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return records
+
+
+def compare_with_history(records: list, history_path: str = HISTORY_PATH, tolerance: float = 0.2) -> list:
+    """
+    Compare records against the latest earlier commit in the history.
+
+    Returns (case, metric, previous, current) for every time or memory metric that grew by more
+    than the tolerance, and every error metric that grew at all. A metric that was 0 regresses
+    as soon as it is positive.
+    """
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path) as f:
+        history = [json.loads(line) for line in f if line.strip()]
+
+    regressions = []
+    for record in records:
+        previous = [entry for entry in history if entry["case"] == record["case"] and entry["commit"] != record["commit"]]
+        if not previous:
+            continue
+        baseline = previous[-1]["metrics"]
+        for metric, value in record["metrics"].items():
+            if metric not in baseline:
+                continue
+            limit = baseline[metric] if "error" in metric else baseline[metric] * (1 + tolerance)
+            if value > limit:
+                regressions.append((record["case"], metric, baseline[metric], value))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the energy_storage package")
+    parser.add_argument("cases", nargs="*", choices=list(CASES), help="cases to run (default: all)")
+    parser.add_argument("--hours", type=float, default=24.0, help="length of the profile cases")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    records = run_benchmarks(args.cases or None, hours=args.hours)
+    for record in records:
+        print(record["case"], json.dumps(record["metrics"], indent=4))
+    for case, metric, previous, current in compare_with_history(records, tolerance=args.tolerance):
+        print(f"REGRESSION {case}: {metric} {previous:.4g} -> {current:.4g}")
@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+
+from .benchmark import compare_with_history
+
+
+def _record(commit, **metrics):
+    return {"case": "profile_60s", "commit": commit, "metrics": metrics}
+
+
+def test_regressions_against_the_previous_commit():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.jsonl")
+        with open(path, "w") as f:
+            for record in (_record("a", **{"wall_time [s]": 1.0, "solver_errors": 5}),
+                           _record("b", **{"wall_time [s]": 10.0, "solver_errors": 0, "state_of_charge_max_error": 0.0})):
+                f.write(json.dumps(record) + "\n")
+        current = _record("c", **{"wall_time [s]": 11.5, "solver_errors": 1, "state_of_charge_max_error": 0.0,
+                                  "new_metric": 3.0})
+        assert compare_with_history([current], history_path=path, tolerance=0.2) == [
+            ("profile_60s", "solver_errors", 0, 1),  # errors regress from a zero baseline too
+        ]
+        slower = _record("c", **{"wall_time [s]": 12.5})
+        assert compare_with_history([slower], history_path=path, tolerance=0.2) == [
+            ("profile_60s", "wall_time [s]", 10.0, 12.5),
+        ]
+        assert compare_with_history([current], history_path=os.path.join(directory, "missing.jsonl")) == []
+
+
+if __name__ == "__main__":
+    test_regressions_against_the_previous_commit()
+    print("benchmark: all tests passed")
@@ -0,0 +1,134 @@
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+
+# start and end are inclusive step indices; end is None while a violation is still ongoing
+Violation = namedtuple("Violation", ["constraint", "variable", "start", "end", "worst_value", "limit"])
+
+
+def _as_columns(history) -> dict:
+    """Accept a dict of arrays or a list of report_state() dicts and return a dict of arrays."""
+    if isinstance(history, dict):
+        return {name: np.asarray(values, dtype=float) for name, values in history.items()}
+    columns = {}
+    if len(history) == 0:
+        return columns  # a run without steps has nothing to check
+    for name in history[0]:
+        value = history[0][name]
+        if isinstance(value, tuple):
+            columns[name] = np.array([state[name][0] for state in history], dtype=float)
+        elif isinstance(value, (int, float)):
+            columns[name] = np.array([state[name] for state in history], dtype=float)
+    return columns
+
+
+class ConstraintMonitor:
+    """
+    Checks battery operation against its operational window and reports violation intervals.
+
+    The same limits can be checked over a whole recorded history in one vectorised pass
+    (check_history) or step by step on a live stream (update), which costs O(1) per step.
+    Violations never raise; they are collected as intervals instead.
+
+    Args:
+        limits (dict): constraint name -> (variable, lower bound, upper bound).
+    """
+
+    def __init__(self, limits: dict):
+        self.limits = dict(limits)
+        self.violations = []
+        self.step_index = 0
+        self._open = {}  # constraint -> (start, worst value)
+
+    @classmethod
+    def from_model(cls, model) -> "ConstraintMonitor":
+        """
+        Build the limits from an initialized EnergyStorageModel. The monitored current and power
+        follow PyBaMM's sign convention (positive on discharge), so the current must lie in
+        [-charge_current_max, discharge_current_max].
+        """
+        attributes = model._attributes
+        return cls({
+            "state_of_charge": ("state_of_charge", attributes["state_of_charge_min [%]"], attributes["state_of_charge_max [%]"]),
+            "voltage": ("voltage", attributes["voltage_min [v]"], attributes["voltage_max [v]"]),
+            "temperature": ("temperature", -np.inf, attributes["temperature_max [°C]"]),
+            "current": ("current", -attributes["charge_current_max [A]"], attributes["discharge_current_max [A]"]),
+            "power": ("power", -attributes["power_max [w]"], attributes["power_max [w]"]),
+            "end_of_life": ("state_of_health", attributes["end_of_life_point [%]"], np.inf),
+        })
+
+    @staticmethod
+    def _worst(value: float, lower: float, upper: float) -> tuple[float, float]:
+        """Return (excess beyond the violated bound, that bound)."""
+        return (lower - value, lower) if value < lower else (value - upper, upper)
+
+    def check_history(self, history) -> list:
+        """
+        Check a recorded history in one pass.
+
+        Args:
+            history: dict of variable -> array, or the list of report_state() dicts of a run.
+        Returns:
+            list of Violation sorted by start index.
+        """
+        columns = _as_columns(history)
+        violations = []
+        for constraint, (variable, lower, upper) in self.limits.items():
+            if variable not in columns:
+                continue
+            values = columns[variable]
+            violated = (values < lower) | (values > upper)
+            if not violated.any():
+                continue
+            edges = np.diff(np.concatenate(([0], violated.astype(np.int8), [0])))
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1) - 1
+            excess = np.maximum(lower - values, values - upper)
+            worst = starts + np.array([np.argmax(excess[s:e + 1]) for s, e in zip(starts, ends)], dtype=int)
+            for start, end, index in zip(starts, ends, worst):
+                value = values[index]
+                violations.append(Violation(constraint, variable, int(start), int(end), float(value),
+                                            self._worst(value, lower, upper)[1]))
+        return sorted(violations, key=lambda violation: (violation.start, violation.constraint))
+
+    def update(self, state: dict) -> list:
+        """
+        Check one live step. state maps variable names to scalar values.
+
+        Returns the names of the constraints violated at this step.
+        """
+        active = []
+        for constraint, (variable, lower, upper) in self.limits.items():
+            if variable not in state:
+                continue
+            value = state[variable]
+            if lower <= value <= upper:
+                if constraint in self._open:
+                    start, worst_value = self._open.pop(constraint)
+                    self.violations.append(Violation(constraint, variable, start, self.step_index - 1, worst_value,
+                                                     self._worst(worst_value, lower, upper)[1]))
+                continue
+
+            active.append(constraint)
+            if constraint not in self._open:
+                logging.warning(f"Battery constraint '{constraint}' violated: {variable}={value} outside [{lower}, {upper}]")
+                self._open[constraint] = (self.step_index, value)
+            elif self._worst(value, lower, upper)[0] > self._worst(self._open[constraint][1], lower, upper)[0]:
+                self._open[constraint] = (self._open[constraint][0], value)
+        self.step_index += 1
+        return active
+
+    def get_violations(self) -> list:
+        """Closed violation intervals followed by the ones still ongoing (end=None)."""
+        ongoing = []
+        for constraint, (start, worst_value) in self._open.items():
+            variable, lower, upper = self.limits[constraint]
+            ongoing.append(Violation(constraint, variable, start, None, worst_value, self._worst(worst_value, lower, upper)[1]))
+        return self.violations + sorted(ongoing, key=lambda violation: violation.start)
+
+    def reset(self) -> None:
+        self.violations = []
+        self.step_index = 0
+        self._open = {}
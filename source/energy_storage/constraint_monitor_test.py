@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from .constraint_monitor import ConstraintMonitor, Violation
+
+
+def _model(charge_current_max=10.0, discharge_current_max=20.0):
+    return SimpleNamespace(_attributes={
+        "state_of_charge_min [%]": 10.0,
+        "state_of_charge_max [%]": 90.0,
+        "voltage_min [v]": 300.0,
+        "voltage_max [v]": 420.0,
+        "temperature_max [°C]": 45.0,
+        "charge_current_max [A]": charge_current_max,
+        "discharge_current_max [A]": discharge_current_max,
+        "power_max [w]": 8000.0,
+        "end_of_life_point [%]": 80.0,
+    })
+
+
+def test_current_bounds_follow_pybamm_sign_convention():
+    # limits of 10 A charging and 20 A discharging; PyBaMM reports discharge as positive current
+    monitor = ConstraintMonitor.from_model(_model(charge_current_max=10.0, discharge_current_max=20.0))
+    assert monitor.limits["current"] == ("current", -10.0, 20.0)
+
+    assert monitor.update({"current": 15.0}) == []  # 15 A discharge is allowed
+    assert monitor.update({"current": -15.0}) == ["current"]  # 15 A charge is not
+    assert monitor.update({"current": 26.0}) == ["current"]  # neither is 26 A discharge
+    assert monitor.update({"current": -5.0}) == []
+    assert monitor.get_violations() == [Violation("current", "current", 1, 2, 26.0, 20.0)]
+
+
+def test_history_and_live_checks_agree():
+    monitor = ConstraintMonitor.from_model(_model())
+    history = {"current": np.array([0.0, 15.0, -12.0, -11.0, 5.0, 21.0]),
+               "power": np.array([0.0, 9000.0, -4000.0, -9000.0, 0.0, 0.0])}
+    expected = [
+        Violation("power", "power", 1, 1, 9000.0, 8000.0),
+        Violation("current", "current", 2, 3, -12.0, -10.0),
+        Violation("power", "power", 3, 3, -9000.0, -8000.0),
+        Violation("current", "current", 5, 5, 21.0, 20.0),
+    ]
+    assert monitor.check_history(history) == expected
+
+    for step in range(len(history["current"])):
+        monitor.update({name: values[step] for name, values in history.items()})
+    live = sorted(monitor.get_violations(), key=lambda violation: (violation.start, violation.constraint))
+    assert [violation._replace(end=violation.end if violation.end is not None else 5) for violation in live] == expected
+
+
+def test_empty_history_has_no_violations():
+    monitor = ConstraintMonitor.from_model(_model())
+    assert monitor.check_history([]) == []
+    assert monitor.check_history({"current": np.array([])}) == []
+
+
+if __name__ == "__main__":
+    test_current_bounds_follow_pybamm_sign_convention()
+    test_history_and_live_checks_agree()
+    test_empty_history_has_no_violations()
+    print("constraint_monitor: all tests passed")
@@ -0,0 +1,175 @@
+import bisect
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+AXES = ("dod", "soc_mean", "c_rate", "temperature")  # [%], [%], [h-1], [°C]
+
+
+def _cycle_soh_loss(parameters: dict, dod: float, soc_mean: float, c_rate: float, temperature: float) -> float:
+    """
+    SOH loss [%] of one full cycle (discharge by dod, charge back) around soc_mean,
+    at the given C-rate and ambient temperature. NaN if the cycle does not fit in 0-100 % SOC.
+    """
+    if soc_mean - dod / 2 < 0 or soc_mean + dod / 2 > 100:
+        return np.nan
+    from .energy_storage import EnergyStorageModel
+
+    parameters = dict(parameters)
+    parameters["state_of_charge_init [%]"] = soc_mean + dod / 2
+    parameters["ambient_temperature [°C]"] = temperature
+    parameters["current [A]"] = 0.0
+
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters=parameters)
+    soh_init = model.state_of_health
+    current = c_rate * getattr(model, "nominal_capacity [Ah]")
+    duration = dod / 100 / c_rate * 3600  # seconds to move dod at c_rate
+
+    for step_current in (-current, current):
+        error, model.state = model.run_model(current=step_current, ambient_temp=temperature,
+                                             time_duration=duration, previous_state=model.state)
+        if error:
+            logging.warning(f"Cycle failed at dod={dod}, soc_mean={soc_mean}, c_rate={c_rate}, temperature={temperature}")
+            return np.nan
+    return soh_init - model.state_of_health
+
+
+def build_degradation_surface(parameters: dict, dod, soc_mean, c_rate, temperature,
+                              path: str = None, processes: int = None) -> "DegradationSurface":
+    """
+    Sweep EnergyStorageModel over a (DoD, mean SOC, C-rate, temperature) grid in parallel and
+    return the SOH loss per cycle as a DegradationSurface (saved to path if given).
+
+    Each cycle starts at soc_mean + dod/2. Grid points whose cycle does not fit in 0-100 % SOC
+    are not simulated and hold NaN.
+
+    Args:
+        parameters (dict): initialization parameters, as for initialize_pybamm_model.
+        dod, soc_mean, c_rate, temperature: increasing grid values of each axis.
+    """
+    axes = [np.asarray(sorted(values), dtype=float) for values in (dod, soc_mean, c_rate, temperature)]
+    for name, axis in zip(AXES, axes):
+        if axis.size == 0 or len(np.unique(axis)) != axis.size:
+            raise ValueError(f"{name} axis must be non-empty with distinct values")
+    if axes[0][0] <= 0 or axes[0][-1] > 100:
+        raise ValueError(f"dod values must be in (0, 100] %, got {axes[0].tolist()}")
+    if axes[1][0] < 0 or axes[1][-1] > 100:
+        raise ValueError(f"soc_mean values must be in [0, 100] %, got {axes[1].tolist()}")
+    if axes[2][0] <= 0:
+        raise ValueError(f"c_rate values must be positive, got {axes[2].tolist()}")
+
+    from .energy_storage import DFN_OPTIONS
+
+    points = list(itertools.product(*axes))
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        losses = list(pool.map(_cycle_soh_loss, itertools.repeat(parameters), *zip(*points)))
+
+    values = np.asarray(losses, dtype=float).reshape([len(axis) for axis in axes])
+    metadata = {
+        "cell_chemistry": parameters.get("cell_chemistry"),
+        "options": {key: str(value) for key, value in DFN_OPTIONS.items()},
+    }
+    surface = DegradationSurface(axes, values, metadata=metadata)
+    if path is not None:
+        surface.save(path)
+    return surface
+
+
+class DegradationSurface:
+    """
+    Multilinear interpolant of the SOH loss per cycle [%] over (DoD, mean SOC, C-rate, temperature).
+
+    Evaluation touches the 16 surrounding grid points only, so its cost does not depend on the
+    length of the sweep; inputs outside the grid are clamped to its edges. Scalars and NumPy
+    arrays (broadcast against each other) are accepted.
+
+    NaN grid points (infeasible or failed cycles) are left out, and the weights of the other
+    surrounding points renormalised; the result is NaN only where every surrounding point
+    with a non-zero weight is NaN.
+    """
+
+    def __init__(self, axes, values, metadata: dict = None):
+        self.axes = [np.asarray(axis, dtype=float) for axis in axes]
+        self.values = np.asarray(values, dtype=float)
+        self.metadata = metadata or {}
+        if self.values.shape != tuple(len(axis) for axis in self.axes):
+            raise ValueError(f"values shape {self.values.shape} does not match the grid axes")
+        if np.isnan(self.values).any():
+            logging.warning("Degradation surface contains failed or infeasible grid points (NaN)")
+        # plain-Python copies for the scalar path used inside optimisation objectives
+        self._axis_lists = [axis.tolist() for axis in self.axes]
+        self._value_list = self.values.tolist()
+        self._corners = list(itertools.product((0, 1), repeat=len(self.axes)))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, values=self.values, metadata=json.dumps(self.metadata),
+                            **dict(zip(AXES, self.axes)))
+
+    @classmethod
+    def load(cls, path: str) -> "DegradationSurface":
+        with np.load(path) as data:
+            return cls([data[name] for name in AXES], data["values"], metadata=json.loads(str(data["metadata"])))
+
+    def __call__(self, dod, soc_mean, c_rate, temperature):
+        """SOH loss [%] of one cycle."""
+        if all(np.ndim(x) == 0 for x in (dod, soc_mean, c_rate, temperature)):
+            return self._evaluate_scalar((float(dod), float(soc_mean), float(c_rate), float(temperature)))
+        coordinates = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (dod, soc_mean, c_rate, temperature)))
+        lower, weights = [], []
+        for axis, x in zip(self.axes, coordinates):
+            if len(axis) == 1:
+                lower.append(np.zeros(x.shape, dtype=int))
+                weights.append(np.zeros(x.shape))
+                continue
+            index = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            lower.append(index)
+            weights.append(np.clip((x - axis[index]) / (axis[index + 1] - axis[index]), 0.0, 1.0))
+
+        total = np.zeros(coordinates[0].shape)
+        total_weight = np.zeros(total.shape)
+        for corner in self._corners:
+            weight = np.ones(total.shape)
+            index = []
+            for offset, low, w, axis in zip(corner, lower, weights, self.axes):
+                weight = weight * (w if offset else 1.0 - w)
+                index.append(np.minimum(low + offset, len(axis) - 1))
+            value = self.values[tuple(index)]
+            used = (weight > 0) & ~np.isnan(value)
+            total += weight * np.where(used, value, 0.0)
+            total_weight += np.where(used, weight, 0.0)
+        result = np.divide(total, total_weight, out=np.full(total.shape, np.nan), where=total_weight > 0)
+        return result if result.ndim else float(result)
+
+    def _evaluate_scalar(self, coordinates) -> float:
+        lower, weights = [], []
+        for axis, x in zip(self._axis_lists, coordinates):
+            if len(axis) == 1:
+                lower.append(0)
+                weights.append(0.0)
+                continue
+            index = min(max(bisect.bisect_right(axis, x) - 1, 0), len(axis) - 2)
+            lower.append(index)
+            weights.append(min(max((x - axis[index]) / (axis[index + 1] - axis[index]), 0.0), 1.0))
+
+        total, total_weight = 0.0, 0.0
+        for corner in self._corners:
+            weight, value = 1.0, self._value_list
+            for offset, low, w, axis in zip(corner, lower, weights, self._axis_lists):
+                weight *= w if offset else 1.0 - w
+                value = value[min(low + offset, len(axis) - 1)]
+            if weight > 0 and value == value:  # skip NaN points
+                total += weight * value
+                total_weight += weight
+        return total / total_weight if total_weight > 0 else float("nan")
+
+    def cycles_to_end_of_life(self, dod, soc_mean, c_rate, temperature, state_of_health=100.0, end_of_life_point=80.0):
+        """Number of identical cycles until the end-of-life SOH is reached."""
+        return (np.asarray(state_of_health) - end_of_life_point) / self(dod, soc_mean, c_rate, temperature)
@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+import numpy as np
+
+from .degradation_surface import DegradationSurface
+
+
+AXES = ([10.0, 50.0, 100.0], [30.0, 50.0, 70.0], [0.5, 1.0], [15.0, 25.0, 35.0])
+
+
+def _linear(dod, soc_mean, c_rate, temperature):
+    return 0.001 * dod + 0.0002 * soc_mean + 0.003 * c_rate + 0.0001 * temperature
+
+
+def _surface(values=None):
+    grid = np.meshgrid(*AXES, indexing="ij")
+    return DegradationSurface(AXES, _linear(*grid) if values is None else values)
+
+
+def test_multilinear_values_are_reproduced():
+    surface = _surface()
+    rng = np.random.default_rng(3)
+    points = [rng.uniform(axis[0], axis[-1], size=20) for axis in AXES]
+    assert np.allclose(surface(*points), _linear(*points), rtol=1e-12)
+    for point in zip(*points):
+        assert np.isclose(surface(*point), _linear(*point), rtol=1e-12)
+    # outside the grid, inputs are clamped to its edges
+    assert np.isclose(surface(200.0, 0.0, 2.0, 25.0), _linear(100.0, 30.0, 1.0, 25.0))
+
+
+def test_nan_points_are_left_out():
+    values = _surface().values.copy()
+    values[2, 2, :, :] = np.nan  # dod 100 % around a mean SOC of 70 % does not fit
+    surface = _surface(values)
+
+    # on a grid point, NaN neighbours have zero weight
+    assert np.isclose(surface(50.0, 70.0, 1.0, 25.0), _linear(50.0, 70.0, 1.0, 25.0))
+    # inside a cell with NaN corners, the remaining corners are renormalised
+    point = (75.0, 60.0, 0.75, 20.0)
+    scalar = surface(*point)
+    assert np.isfinite(scalar)
+    assert np.isclose(surface(*(np.array([x, x]) for x in point)), scalar).all()
+    assert np.nanmin(values[1:, 1:, :, :2]) <= scalar <= np.nanmax(values[1:, 1:, :, :2])
+    # NaN only where every point with a weight is NaN
+    assert np.isnan(surface(100.0, 70.0, 0.75, 20.0))
+    assert np.isnan(surface(np.array([100.0]), 70.0, 0.75, 20.0)).all()
+
+
+def test_save_and_load():
+    surface = _surface()
+    surface.metadata = {"cell_chemistry": "Chen2020"}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "surface.npz")
+        surface.save(path)
+        loaded = DegradationSurface.load(path)
+    assert loaded.metadata == surface.metadata
+    assert all(np.array_equal(a, b) for a, b in zip(loaded.axes, surface.axes))
+    assert np.array_equal(loaded.values, surface.values)
+
+
+if __name__ == "__main__":
+    test_multilinear_values_are_reproduced()
+    test_nan_points_are_left_out()
+    test_save_and_load()
+    print("degradation_surface: all tests passed")
@@ -0,0 +1,199 @@
+import numpy as np
+
+from . import ageing
+
+
+class EmpiricalEnergyStorageModel:
+    """
+    Empirical battery model with stress-factor cycle ageing and SOC-dependent calendar ageing,
+    as used by the dispatch optimisation. Same run_model / report_state interface as
+    EnergyStorageModel; simulate() evaluates whole current profiles in closed form.
+
+    As in EnergyStorageModel, the current passed to run_model and simulate is positive for
+    charging, while the reported current and power (the current attribute, report_state and
+    the simulate results) follow PyBaMM's convention, positive on discharge.
+    """
+
+    # defaults of the optimisation study (optimization_main.ipynb)
+    defaults = {
+        "nominal_voltage [v]": 340.0,
+        "nominal_capacity [Ah]": 15000 / 340.0,
+        "nominal_cell_voltage [V]": 3.3,
+        "cell_series_number [uint]": 100,
+        "cell_parallel_number [uint]": 16,
+        "cell_internal_resistance [mΩ]": 12.6,
+        "charge_efficiency [%]": 96.0,
+        "discharge_efficiency [%]": 96.0,
+        "state_of_charge_init [%]": 50.0,
+        "state_of_health_init [%]": 100.0,
+        "state_of_charge_min [%]": 15.0,
+        "state_of_charge_max [%]": 90.0,
+        "end_of_life_point [%]": 70.0,
+        "ambient_temperature [°C]": 30.0,
+    }
+
+    # ageing constants
+    k_s1 = ageing.K_S1
+    k_s2 = ageing.K_S2
+    k_s3 = ageing.K_S3
+    k_s4 = ageing.K_S4
+    E_a = ageing.E_A  # kJ/mol
+    R = ageing.R  # J/(K.mol)
+    T_ref = ageing.T_REF  # K
+    calendar_slope = ageing.CALENDAR_SLOPE  # calendar ageing per hour [%/h] per unit average SOC
+    calendar_offset = ageing.CALENDAR_OFFSET  # calendar ageing per hour [%/h]
+
+    def __init__(self, parameters: dict = None):
+        self.parameters = dict(self.defaults)
+        self.state = None
+        self._charge = 0.0  # stored charge (Ah)
+        self._state_of_health = 100.0
+        self._temperature = 25.0
+        self.current = 0.0  # reported current (A), positive on discharge
+        self.time = 0.0  # simulated time (s)
+        if parameters is not None:
+            self.initialize_model(parameters)
+
+    def initialize_model(self, parameters: dict) -> None:
+        self.parameters.update({key: value for key, value in parameters.items() if key in self.defaults})
+        self._state_of_health = self.parameters["state_of_health_init [%]"]
+        self._charge = self.remained_capacity * self.parameters["state_of_charge_init [%]"] / 100
+        self._temperature = self.parameters["ambient_temperature [°C]"]
+        self.current = parameters.get("current [A]", 0.0)
+        self.time = 0.0
+        self.state = self._export_state()
+
+    @property
+    def remained_capacity(self) -> float:
+        """Capacity left after fading (Ah)."""
+        return self.parameters["nominal_capacity [Ah]"] * self._state_of_health / 100
+
+    @property
+    def state_of_charge(self) -> float:
+        return self._charge / self.remained_capacity * 100
+
+    @property
+    def state_of_health(self) -> float:
+        return self._state_of_health
+
+    @property
+    def temperature(self) -> float:
+        return self._temperature
+
+    @property
+    def cell_voltage(self) -> float:
+        return float(self._cell_voltage(self.state_of_charge, -self.current))
+
+    @property
+    def voltage(self) -> float:
+        return self.cell_voltage * self.parameters["cell_series_number [uint]"]
+
+    def _cell_voltage(self, state_of_charge, current):
+        """Linear open-circuit voltage of the study plus the ohmic drop of one cell (current > 0 charges)."""
+        cell_current = current / self.parameters["cell_parallel_number [uint]"]
+        return (state_of_charge + 735) / 250 + cell_current * self.parameters["cell_internal_resistance [mΩ]"] / 1000
+
+    def _export_state(self) -> dict:
+        return {"charge": self._charge, "state_of_health": self._state_of_health,
+                "temperature": self._temperature, "current": self.current, "time": self.time}
+
+    def simulate(self, current, ambient_temp, time_step) -> dict:
+        """
+        Simulate a whole current profile in one vectorised pass.
+
+        Ageing is evaluated per interval in closed form; the capacity used for SOC is the one at
+        the start of the profile, so split very long profiles (e.g. by day) to feed fade back in.
+
+        Args:
+            current (array): pack current per interval (A), positive for charging.
+            ambient_temp (float or array): ambient temperature per interval (°C).
+            time_step (float or array): interval length (s).
+        Returns:
+            dict of arrays with the state at the end of each interval, current and power
+            positive on discharge.
+        """
+        current = np.asarray(current, dtype=float)
+        ambient_temp = np.broadcast_to(np.asarray(ambient_temp, dtype=float), current.shape)
+        time_step = np.broadcast_to(np.asarray(time_step, dtype=float), current.shape)
+        capacity = self.remained_capacity
+
+        efficiency = np.where(current > 0, self.parameters["charge_efficiency [%]"] / 100,
+                              100 / self.parameters["discharge_efficiency [%]"])
+        delta_charge = current * time_step / 3600 * efficiency
+        charge = self._charge + np.cumsum(delta_charge)
+        charge_start = charge - delta_charge
+
+        soc_avg, soc_dev = ageing.soc_interval_stats(charge_start, charge, capacity)
+        stress = ageing.stress_factor(soc_dev, soc_avg, self.k_s1, self.k_s2, self.k_s3, self.k_s4)
+        arrhenius = ageing.arrhenius_factor(ambient_temp + 273.15, self.E_a, self.R, self.T_ref)
+        cycle_ageing = stress * np.abs(delta_charge) * arrhenius
+        calendar_ageing = ageing.calendar_ageing(soc_avg, time_step / 3600, self.calendar_slope, self.calendar_offset)
+        soh_loss = np.maximum(calendar_ageing + 100 * cycle_ageing / capacity, 0.0)
+        state_of_health = self._state_of_health - np.cumsum(soh_loss)
+
+        state_of_charge = charge / capacity * 100
+        voltage = self._cell_voltage(state_of_charge, current) * self.parameters["cell_series_number [uint]"]
+        time = self.time + np.cumsum(time_step)
+
+        if current.size:
+            self._charge = float(charge[-1])
+            self._state_of_health = float(state_of_health[-1])
+            self._temperature = float(ambient_temp[-1])
+            self.current = -float(current[-1])
+            self.time = float(time[-1])
+            self.state = self._export_state()
+
+        return {
+            "time": time,
+            "current": -current,
+            "voltage": voltage,
+            "power": -voltage * current,
+            "state_of_charge": state_of_charge,
+            "state_of_health": state_of_health,
+            "stored_energy": charge * voltage,
+            "temperature": np.array(ambient_temp),
+        }
+
+    def run_model(self, current: float, ambient_temp: float, time_duration: int, previous_state=None) -> tuple[bool, dict]:
+        if previous_state is not None:
+            self._charge = previous_state["charge"]
+            self._state_of_health = previous_state["state_of_health"]
+            self._temperature = previous_state["temperature"]
+            self.current = previous_state["current"]
+            self.time = previous_state["time"]
+        self.simulate([current], ambient_temp, time_duration)
+        return False, self.state
+
+    def report_state(self) -> dict:
+        parallel = self.parameters["cell_parallel_number [uint]"]
+        state_of_charge = self.state_of_charge
+        soc_min = self.parameters["state_of_charge_min [%]"]
+        soc_max = self.parameters["state_of_charge_max [%]"]
+        state_dict = {
+            "cell_voltage": (round(self.cell_voltage, 2), "V"),
+            "cell_current": (round(self.current / parallel, 2), "A"),
+            "voltage": (round(self.voltage, 2), "V"),
+            "current": (round(self.current, 2), "A"),
+            "state_of_charge": (round(state_of_charge, 2), "%"),
+            "relative_state_of_charge": (round((state_of_charge - soc_min) / (soc_max - soc_min) * 100, 2), "%"),
+            "state_of_health": (round(self._state_of_health, 2), "%"),
+            "power": (round(self.voltage * self.current, 2), "W"),
+            "stored_energy": (round(self._charge * self.voltage, 2), "Wh"),
+            "temperature": (round(self._temperature, 2), "°C"),
+            "remained_capacity": (round(self.remained_capacity, 2), "Ah"),
+            "cell remaining capacity": (round(self.remained_capacity / parallel, 2), "Ah"),
+        }
+        return state_dict
+
+    def __repr__(self):
+        return f"""Empirical Energy Storage Model:
+        - state_of_charge: {self.state_of_charge} %
+        - state_of_health: {self._state_of_health} %
+        - remained capacity: {self.remained_capacity} Ah
+        - voltage: {self.voltage} V
+        - Ks1: {self.k_s1}
+        - Ks2: {self.k_s2}
+        - Ks3: {self.k_s3}
+        - Ks4: {self.k_s4}
+        - Ea: {self.E_a} kJ/mol
+        - T ref: {self.T_ref} K"""
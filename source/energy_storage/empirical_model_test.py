@@ -0,0 +1,57 @@
+import numpy as np
+
+from .constraint_monitor import ConstraintMonitor
+from .empirical_model import EmpiricalEnergyStorageModel
+from .energy_storage import EnergyStorageModel
+from .energy_storage_test import PARAMETERS
+
+STEP = 60  # s
+CURRENTS = (12.0, -12.0, 5.0)  # run_model convention: positive charges
+
+
+def _reports(model):
+    reports = []
+    for current in CURRENTS:
+        error, model.state = model.run_model(current=current, ambient_temp=25.0, time_duration=STEP,
+                                             previous_state=model.state)
+        assert not error
+        reports.append(model.report_state())
+    return reports
+
+
+def test_models_report_the_same_sign_convention():
+    full = EnergyStorageModel()
+    full.initialize_pybamm_model(parameters=PARAMETERS)
+    empirical = EmpiricalEnergyStorageModel(PARAMETERS)
+    full_reports, empirical_reports = _reports(full), _reports(empirical)
+
+    for current, full_report, empirical_report in zip(CURRENTS, full_reports, empirical_reports):
+        # reported current and power are positive on discharge for both models
+        for name in ("current", "cell_current", "power"):
+            assert np.sign(empirical_report[name][0]) == np.sign(full_report[name][0]) == -np.sign(current)
+        assert np.isclose(empirical_report["current"][0], full_report["current"][0], rtol=1e-3)
+    for reports in (full_reports, empirical_reports):
+        socs = [report["state_of_charge"][0] for report in reports]
+        assert socs[0] > PARAMETERS["state_of_charge_init [%]"] and socs[1] < socs[0] and socs[2] > socs[1]
+    # the exported state carries the reported current
+    assert empirical.state["current"] == empirical.current == -CURRENTS[-1]
+
+
+def test_constraint_monitor_accepts_either_model():
+    full = EnergyStorageModel()
+    full.initialize_pybamm_model(parameters=PARAMETERS)
+    monitor = ConstraintMonitor.from_model(full)
+    empirical_violations = monitor.check_history(_reports(EmpiricalEnergyStorageModel(PARAMETERS)))
+    full_violations = monitor.check_history(_reports(full))
+
+    # charging at 12 A exceeds the 10 A charge limit, discharging at 12 A stays within 20 A
+    for violations in (full_violations, empirical_violations):
+        assert [(violation.constraint, violation.start, violation.end, violation.limit) for violation in violations] \
+            == [("current", 0, 0, -PARAMETERS["charge_current_max [A]"])]
+        assert violations[0].worst_value < 0
+
+
+if __name__ == "__main__":
+    test_models_report_the_same_sign_convention()
+    test_constraint_monitor_accepts_either_model()
+    print("empirical_model: all tests passed")
@@ -7,6 +7,47 @@ import logging
 import random
 import os
 
+from .constraint_monitor import ConstraintMonitor
+from .model_registry import model_registry
+
+
+# dynamic variables that make up the per-instance state of a model
+DYNAMIC_STATE_FIELDS = (
+    "_cell_state_of_charge", "_cell_relative_state_of_charge", "_cell_state_of_health",
+    "_cell_voltage", "_cell_current", "_cell_power", "_cell_state_of_power",
+    "_cell_stored_energy", "_cell_temperature", "_cell_remained_capacity",
+    "_state_of_charge", "_relative_state_of_charge", "_state_of_health",
+    "_voltage", "current", "power", "_state_of_power", "_stored_energy",
+    "_temperature", "_remained_capacity",
+)
+
+# degradation and thermal submodels of the cell model
+DFN_OPTIONS = {
+    "SEI": "solvent-diffusion limited",
+    "SEI porosity change": "true",
+    "lithium plating": "partially reversible",
+    "lithium plating porosity change": "true",  # alias for "SEI porosity change"
+    "particle mechanics": ("swelling and cracking", "swelling only"),
+    "SEI on cracks": "true",
+    "loss of active material": "stress-driven",
+    "calculate discharge energy": "true",  # for compatibility with older PyBaMM versions
+    "cell geometry": "pouch",
+    "thermal": "lumped",
+    "contact resistance": "true",
+}
+
+PARAMETER_SET = "OKane2022"
+
+_UNSYNCED = object()  # the worker's state is unknown after an interrupted run_model_async step
+
+DEFAULT_VAR_PTS = {
+    "x_n": 5,  # negative electrode
+    "x_s": 5,  # separator
+    "x_p": 5,  # positive electrode
+    "r_n": 30,  # negative particle
+    "r_p": 30,  # positive particle
+}
+
 
 class EnergyStorageModel:
     
@@ -51,6 +92,15 @@ class EnergyStorageModel:
         self.parameter_values =  None
         self.state = None
         self.soh_param = None
+        self.shared_model = None  # build products shared through the model registry
+        self.solver = None
+        self.parameters = None  # parameters used for the last initialization
+        self._executor = None  # worker process for run_model_async
+        self._executor_state = None  # self.state the worker continues from, _UNSYNCED if unknown
+        self.monitor = None  # operational constraint monitor, set on initialization
+        self.trace_writer = None  # optional SolutionTraceWriter fed with every step solution
+        self.simulation = None  # built model stepped by this instance, shared through the model registry
+        self._initial_inputs = None  # initial concentration inputs that start the model at the initial SOC
     
         # single cell dynamic variables
         self._cell_state_of_charge = 0.0  # State of Charge, as a percentage
@@ -224,34 +274,20 @@ class EnergyStorageModel:
 
         logging.info("All parameters for initialization are valid")
 
-    def initialize_pybamm_model(self, parameters: dict):   
-
-        options = {
-            "SEI": "solvent-diffusion limited",
-            "SEI porosity change": "true",
-            "lithium plating": "partially reversible",
-            "lithium plating porosity change": "true",  # alias for "SEI porosity change"
-            "particle mechanics": ("swelling and cracking", "swelling only"),
-            "SEI on cracks": "true",
-            "loss of active material": "stress-driven",
-            "calculate discharge energy": "true",  # for compatibility with older PyBaMM versions
-            "cell geometry": "pouch",
-            "thermal": "lumped",
-            "contact resistance": "true",
-        }
-        self.model = pybamm.lithium_ion.DFN(options)
-        parameter_values = pybamm.ParameterValues("OKane2022")
+    def initialize_pybamm_model(self, parameters: dict, var_pts: dict = None):   
+
+        # explicit mesh (e.g. a tuned one from mesh_tuning.load_var_pts), else the default
+        self.var_pts = dict(var_pts or DEFAULT_VAR_PTS)
+        # model, solvers and base parameters are shared by all instances with the same setup
+        self.shared_model = model_registry.get(DFN_OPTIONS, PARAMETER_SET, self.var_pts)
+        self.model = self.shared_model.model
+        parameter_values = self.shared_model.new_parameter_values()
         # parameter_values = pybamm.ParameterValues(parameters['cell_chemistry'])
-        self.soh_param = pybamm.LithiumIonParameters()
+        self.soh_param = self.shared_model.soh_param
+        self.solver = self.shared_model.solver.copy()  # per-instance: the solver keeps per-model setup state
         self.parameter_values = parameter_values
-        self.var_pts = {
-            "x_n": 5,  # negative electrode
-            "x_s": 5,  # separator
-            "x_p": 5,  # positive electrode
-            "r_n": 30,  # negative particle
-            "r_p": 30,  # positive particle
-        }       
         self.__validate_input_parameters(parameters)
+        self.parameters = dict(parameters)
         
         A = self.parameter_values["Electrode width [m]"] * self.parameter_values["Electrode height [m]"]
         self.parameter_values["Cell cooling surface area [m2]"] = 2 * A
@@ -334,6 +370,11 @@ class EnergyStorageModel:
         self._attributes["c_rate_discharge_max"] = parameters["c_rate_discharge_max"]
         
         self.parameter_values = parameter_values
+        # built once per setup; the initial SOC only enters through the initial concentration inputs
+        self.simulation = self.shared_model.built_simulation(parameter_values)
+        self._initial_inputs = self.shared_model.initial_concentrations(
+            parameter_values, self._attributes["state_of_charge_init [%]"] / 100)
+        self.monitor = ConstraintMonitor.from_model(self)
         
         # for key in self._validation_rules:
         #     value = self._attributes[key]
@@ -343,31 +384,105 @@ class EnergyStorageModel:
     
     def run_model(self, current:float, ambient_temp:float, time_duration: int, previous_state=None) -> tuple[bool, list]:
 
+        # a failed step leaves the dynamic variables as they were, to match the returned previous_state
+        dynamic_state = self.get_dynamic_state()
         try:
             current_state  = self.__run_simulation(current, ambient_temp, time_duration, state=previous_state)
             self.__update_params(current_state)
-            current_state = current_state.cycles[-1]
-            # current_state = current_state
-            # self.__validate_operation()
-            return False, current_state
         except Exception as e:
+            self.set_dynamic_state(dynamic_state)
             print(f"Battery storage simulation failed")
             return True, previous_state
+        if self.trace_writer is not None:
+            self.trace_writer.append(current_state)
+        self.__validate_operation()
+        return False, current_state
 
-    def __run_simulation(self, current:float, ambient_temp:float, time_duration: int, state = None) -> list:
-        self.parameter_values["Current function [A]"] = current/self._attributes["cell_parallel_number [uint]"]
-        self.parameter_values["Ambient temperature [K]"] = ambient_temp + 273.15
-        
-        if current < 0:
-            self.experiment =pybamm.Experiment([f"Discharge at {(np.abs(current)/self._attributes["cell_parallel_number [uint]"])} A for {time_duration} seconds"])
-        elif current > 0:
-            self.experiment =pybamm.Experiment([f"Charge at {(current/self._attributes["cell_parallel_number [uint]"])} A for {time_duration} seconds"])
-        else:
-            self.experiment =pybamm.Experiment([f"Rest for {time_duration} seconds"])
-            
+    async def run_model_async(self, current:float, ambient_temp:float, time_duration: int, timeout: float = None) -> tuple[bool, dict]:
+        """
+        Non-blocking variant of run_model, solved in a dedicated worker process.
+
+        The worker builds its own copy of the model from the initialization parameters
+        and keeps the solution history, so consecutive steps chain there. Each step hands the
+        worker this model's dynamic state, and its solver state (get_solver_state) if self.state
+        changed since the worker last reported it, so steps continue from here even after
+        run_model or set_dynamic_state calls in between; the worker's solver state after the
+        step is applied back to self.state. Steps are queued in submission order; cancelling the
+        awaiting task drops a step that has not been handed to the worker yet, and a cancelled
+        or timed-out step makes the next one hand the full state over again.
+        Returns the error flag and the state report after the step.
+        """
+        if self.parameters is None:
+            raise RuntimeError("initialize_pybamm_model must be called before run_model_async")
+        if self._executor is None:
+            from .executor import EnergyStorageExecutor
+            self._executor = EnergyStorageExecutor(self.parameters, dynamic_state=self.get_dynamic_state())
+            self._executor_state = None
+
+        solver_state = self.get_solver_state() if self.state is not self._executor_state else None
+        # until the step completes, the worker may or may not have advanced
+        self._executor_state = _UNSYNCED
+        error, dynamic_state, solver_state = await self._executor.run_step(
+            current, ambient_temp, time_duration, timeout=timeout,
+            dynamic_state=self.get_dynamic_state(), solver_state=solver_state)
+        if not error:
+            self.set_dynamic_state(dynamic_state)
+            self.set_solver_state(solver_state)
+        self._executor_state = self.state
+        return error, self.report_state()
+
+    def shutdown_executor(self, cancel_pending: bool = True) -> None:
+        """Stop the worker process used by run_model_async."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_pending=cancel_pending)
+            self._executor = None
+
+    def get_dynamic_state(self) -> dict:
+        """Return the dynamic (per-step) variables of the battery as a plain dict."""
+        return {name: getattr(self, name) for name in DYNAMIC_STATE_FIELDS}
+
+    def set_dynamic_state(self, dynamic_state: dict) -> None:
+        """Overwrite the dynamic variables, e.g. with a state computed in another process."""
+        for name in DYNAMIC_STATE_FIELDS:
+            if name in dynamic_state:
+                setattr(self, name, dynamic_state[name])
+
+    def get_solver_state(self) -> tuple:
+        """
+        Return the end of the last solution (self.state) as a plain (t, y, inputs) tuple, small
+        enough to hand to another process, or None before the first step.
+        """
+        if self.state is None:
+            return None
+        last_state = self.state.last_state
+        return float(last_state.t[-1]), np.array(last_state.all_ys[-1][:, -1]).ravel(), dict(last_state.all_inputs[-1])
 
-        sim = pybamm.Simulation(self.model, experiment= self.experiment, parameter_values=self.parameter_values, var_pts=self.var_pts)
-        solution = sim.solve(starting_solution=state)
+    def set_solver_state(self, solver_state: tuple) -> None:
+        """
+        Continue the next step from a get_solver_state() result, e.g. one taken in another
+        process. None starts the next step from the initial SOC again.
+        """
+        if solver_state is None:
+            self.state = None
+            return
+        t, y, inputs = solver_state
+        self.state = pybamm.Solution(np.array([t]), np.asarray(y, dtype=float)[:, None],
+                                     self.simulation.built_model, dict(inputs))
+
+    def __run_simulation(self, current:float, ambient_temp:float, time_duration: int, state = None) -> list:
+        # every step runs the built model of this setup: the first one starts it from the initial
+        # concentrations, later ones continue from the previous solution
+        inputs = {
+            # current > 0 charges here, while PyBaMM's current is positive on discharge
+            "Current function [A]": -current / self._attributes["cell_parallel_number [uint]"],
+            "Ambient temperature [K]": ambient_temp + 273.15,
+            **self._initial_inputs,
+        }
+        with self.shared_model.step_lock:
+            solution = self.solver.step(state, self.simulation.built_model, time_duration, inputs=inputs, save=False)
+        if solution is state:
+            # the solver hands back a solution that stopped at an event instead of stepping it
+            raise pybamm.SolverError("The previous step stopped at a model event and cannot be continued")
         return solution
         
     def __update_params(self, solution) -> None:
@@ -390,7 +505,8 @@ class EnergyStorageModel:
  
     def __update_state_of_charge(self, solution) -> float:
         soc_init = self._attributes["state_of_charge_init [%]"]
-        delta_discharge_capacity = solution["Discharge capacity [A.h]"].data[0] - solution["Discharge capacity [A.h]"].data[-1]  
+        # the discharge capacity is integrated from 0 at the first step and carried over by every later one
+        delta_discharge_capacity = -solution["Discharge capacity [A.h]"].data[-1]
         soc_variation = delta_discharge_capacity / (self._cell_remained_capacity) * 100 # considering the state of health and capacity fading effect
         soc = soc_init + soc_variation
         self._relative_state_of_charge = self.__calculate_relative_soc(soc)
@@ -405,14 +521,8 @@ class EnergyStorageModel:
         return soc_relative
 
     def _calculate_cell_nominal_capacity(self):
-        Q_n = self.parameter_values.evaluate(self.soh_param.n.Q_init)
-        Q_p = self.parameter_values.evaluate(self.soh_param.p.Q_init)
-        Q_Li = self.parameter_values.evaluate(self.soh_param.Q_Li_particles_init)
-        esoh_solver = pybamm.lithium_ion.ElectrodeSOHSolver(self.parameter_values, self.soh_param)
-        inputs = {"Q_n": Q_n, "Q_p": Q_p, "Q_Li": Q_Li}    # check if voltage is needed or not
-        # inputs = {"V_min": Vmin, "V_max": Vmax, "Q_n": Q_n, "Q_p": Q_p, "Q_Li": Q_Li}
-        esoh_sol = esoh_solver.solve(inputs)
-        return esoh_sol["Q"]
+        # solved once per shared model from the initial electrode capacities
+        return self.shared_model.cell_nominal_capacity
         
     def __update_state_of_health(self, solution) -> float:
         """
@@ -458,7 +568,7 @@ class EnergyStorageModel:
         Q_n = solution["Negative electrode capacity [A.h]"].data[-1]
         Q_p = solution["Positive electrode capacity [A.h]"].data[-1]
         Q_Li = solution["Total lithium capacity in particles [A.h]"].data[-1]     
-        esoh_solver = pybamm.lithium_ion.ElectrodeSOHSolver(self.parameter_values, self.soh_param)
+        esoh_solver = self.shared_model.esoh_solver
 
         inputs = {"Q_n": Q_n, "Q_p": Q_p, "Q_Li": Q_Li}    # check if voltage is needed or not
         # inputs = {"V_min": Vmin, "V_max": Vmax, "Q_n": Q_n, "Q_p": Q_p, "Q_Li": Q_Li}
@@ -491,34 +601,21 @@ class EnergyStorageModel:
     def __update_cycles_count(self):
         self.number_of_cycles += 1
 
-    def __validate_operation(self):
+    def __validate_operation(self) -> list:
         """
-        Validates the dynamic parmateters range during operation against the specified constraints.
-        
-        Raises:
-            ValueError: If any of the constraints are violated.
+        Checks the dynamic parameters against the operational constraints.
+
+        Violations are logged and recorded as intervals in self.monitor instead of raising.
+        Returns the names of the constraints violated at this step.
         """
-        
-        if not (self.state_of_charge_min <= self._state_of_charge <= self.state_of_charge_max):
-            raise ValueError("State of Charge out of bounds")
-        if not (self._voltage_min <= self._voltage <= self._voltage_max):
-            raise ValueError("Voltage out of bounds")
-        if not ( 0<= self._temperature <= 60): 
-            raise ValueError("Overheating detected")
-        if not (self.power <= self.power_max):
-            raise ValueError("Power out of bounds")
-        if not (abs(self.current) <= self.current_max):
-            raise ValueError("Current out of bounds")
-        if not ( 0 <= self._state_of_power <= 1):
-            raise ValueError("State of Power out of bounds")
-        if not (0 <= self._stored_energy <= self.nominal_capacity * self._voltage_max):
-            raise(ValueError("Stored Energy out of bounds"))
-        if not (0 <= self._remained_capacity <= self.nominal_capacity):
-            raise(ValueError("Remained Capacity out of bounds"))
-        if not (0 <= self._state_of_health <= 100):
-            raise(ValueError("State of Health out of bounds"))
-        if (self._state_of_health <= self.end_of_life):
-            raise(ValueError("End of Life reached"))
+        return self.monitor.update({
+            "state_of_charge": self._state_of_charge,
+            "voltage": self._voltage,
+            "temperature": self._temperature,
+            "current": self.current,
+            "power": self.power,
+            "state_of_health": self._state_of_health,
+        })
 
     def reset_to_initial_state(self)-> None:
         """
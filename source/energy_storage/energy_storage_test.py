@@ -0,0 +1,74 @@
+from .energy_storage import EnergyStorageModel
+
+
+PARAMETERS = {
+    "cell_model": "DFN",
+    "cell_chemistry": "Chen2020",
+    "time_resolution [s]": 1,
+    "nominal_voltage [v]": 345.0,
+    "nominal_capacity [Ah]": 25.0,
+    "ambient_temperature [°C]": 25.0,
+    "current [A]": 0.0,
+    "power_max [w]": 5000.0,
+    "state_of_health_init [%]": 100,
+    "state_of_charge_init [%]": 50,
+    "nominal_cell_voltage [V]": 3.63,
+    "discharge_current_max [A]": 20,
+    "charge_current_max [A]": 10,
+    "state_of_charge_min [%]": 15,
+    "state_of_charge_max [%]": 90,
+    "end_of_life_point [%]": 80,
+    "charge_efficiency [%]": 96,
+    "discharge_efficiency [%]": 96,
+    "temperature_max [°C]": 60,
+    "c_rate_charge_max": 1.0,
+    "c_rate_discharge_max": 1.0,
+}
+
+
+def _model(**changes):
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters={**PARAMETERS, **changes})
+    return model
+
+
+def test_chained_steps_continue_one_built_model():
+    model = _model()
+    socs = [model.state_of_charge]
+    for current in (10.0, 10.0, -10.0, 0.0):
+        error, model.state = model.run_model(current=current, ambient_temp=25.0, time_duration=60,
+                                             previous_state=model.state)
+        assert not error
+        assert model.state.all_models[-1] is model.simulation.built_model
+        socs.append(model.state_of_charge)
+    assert socs[0] < socs[1] < socs[2]  # charging
+    assert socs[3] < socs[2]  # discharging
+    assert abs(socs[4] - socs[3]) < 1e-3  # resting
+    assert abs(socs[3] - socs[1]) < 1e-3  # the discharge undoes the second charge
+
+
+def test_initial_soc_shares_the_built_model():
+    low, high = _model(**{"state_of_charge_init [%]": 30}), _model(**{"state_of_charge_init [%]": 70})
+    assert low.simulation is high.simulation
+    for model in (low, high):
+        error, model.state = model.run_model(current=0.0, ambient_temp=25.0, time_duration=10)
+        assert not error
+    assert low.voltage < high.voltage
+    assert abs(low.state_of_charge - 30) < 1e-6 and abs(high.state_of_charge - 70) < 1e-6
+
+
+def test_failed_step_keeps_the_state():
+    model = _model()
+    error, model.state = model.run_model(current=10.0, ambient_temp=25.0, time_duration=60)
+    assert not error
+    state, dynamic_state = model.state, model.get_dynamic_state()
+    error, returned = model.run_model(current=10.0, ambient_temp=25.0, time_duration=0, previous_state=state)
+    assert error and returned is state
+    assert model.get_dynamic_state() == dynamic_state
+
+
+if __name__ == "__main__":
+    test_chained_steps_continue_one_built_model()
+    test_initial_soc_shares_the_built_model()
+    test_failed_step_keeps_the_state()
+    print("energy_storage: all tests passed")
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait as wait_futures
+
+
+# models living in the worker process, keyed by pack id
+_MODELS = {}
+
+
+def _open_model(pack_id: str, parameters: dict, dynamic_state: dict = None) -> dict:
+    """Build and initialize a model inside the worker process, optionally at a given dynamic state."""
+    from .energy_storage import EnergyStorageModel
+
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters=parameters)
+    if dynamic_state is not None:
+        model.set_dynamic_state(dynamic_state)
+    _MODELS[pack_id] = model
+    return model.get_dynamic_state()
+
+
+def _close_model(pack_id: str) -> bool:
+    return _MODELS.pop(pack_id, None) is not None
+
+
+def _step_model(pack_id: str, current: float, ambient_temp: float, time_duration: int,
+                dynamic_state: dict = None, solver_state: tuple = None) -> tuple[bool, dict, tuple]:
+    """
+    Advance a worker-side model by one step, chaining on its own solution history unless the
+    caller hands over a newer dynamic state and/or solver state.
+    """
+    model = _MODELS[pack_id]
+    if dynamic_state is not None:
+        model.set_dynamic_state(dynamic_state)
+    if solver_state is not None:
+        model.set_solver_state(solver_state)
+    error, model.state = model.run_model(current=current, ambient_temp=ambient_temp,
+                                         time_duration=time_duration, previous_state=model.state)
+    return error, model.get_dynamic_state(), model.get_solver_state()
+
+
+class EnergyStorageExecutor:
+    """
+    Runs EnergyStorageModel steps in a dedicated worker process.
+
+    The worker keeps the built models (one per pack id) warm between steps. Submitted
+    steps are queued and executed one at a time in submission order, so the steps of a
+    pack always chain on the previous solution, while the calling thread or event loop
+    is free to do other work (e.g. network solves) in the meantime.
+
+    The queue is kept in this process and a task is handed to the worker only when the
+    previous one has finished. A ProcessPoolExecutor would otherwise move queued tasks into
+    its call queue early, where Future.cancel() no longer reaches them; here every task that
+    is still queued can be cancelled, and only the one being solved cannot.
+    """
+
+    def __init__(self, parameters: dict = None, pack_id: str = "default", dynamic_state: dict = None):
+        self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self._queue = deque()  # (future, fn, args) not yet handed to the worker
+        self._running = None  # future of the task in the worker
+        self._lock = threading.RLock()  # done callbacks may run in the submitting thread
+        self._closing = False
+        self.default_pack_id = pack_id
+        if parameters is not None:
+            self.open_pack(pack_id, parameters, dynamic_state=dynamic_state)
+
+    @property
+    def pending_steps(self) -> int:
+        """Number of submitted tasks that have not finished yet, cancelled ones excluded."""
+        with self._lock:
+            return sum(not future.cancelled() for future, _, _ in self._queue) + (self._running is not None)
+
+    def _submit(self, fn, *args) -> Future:
+        future = Future()
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("EnergyStorageExecutor is shut down")
+            self._queue.append((future, fn, args))
+            self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        """Hand the next queued task to the worker if it is idle (called with the lock held)."""
+        while self._running is None and self._queue:
+            future, fn, args = self._queue.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue  # cancelled while queued
+            try:
+                task = self._pool.submit(fn, *args)
+            except Exception as e:  # the pool is broken or shut down
+                future.set_exception(e)
+                continue
+            self._running = future
+            task.add_done_callback(lambda task, future=future: self._finished(future, task))
+
+    def _finished(self, future: Future, task: Future) -> None:
+        # the task stops counting as pending before its caller sees the result
+        with self._lock:
+            self._running = None
+            self._dispatch()
+            idle = self._running is None and not self._queue
+        if task.cancelled():
+            future.set_exception(RuntimeError("Battery step was dropped when the worker shut down"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+        if idle and self._closing:
+            self._pool.shutdown(wait=False)
+
+    def open_pack(self, pack_id: str, parameters: dict, dynamic_state: dict = None) -> Future:
+        """
+        Build a model for pack_id in the worker, starting from dynamic_state if given (e.g.
+        the caller's get_dynamic_state()). Later steps of that pack queue behind it.
+        """
+        return self._submit(_open_model, pack_id, dict(parameters), dynamic_state)
+
+    def close_pack(self, pack_id: str) -> Future:
+        return self._submit(_close_model, pack_id)
+
+    def submit(self, current: float, ambient_temp: float, time_duration: int, pack_id: str = None,
+               dynamic_state: dict = None, solver_state: tuple = None) -> Future:
+        """
+        Queue one step and return a concurrent.futures.Future of (error, dynamic_state, solver_state).
+
+        dynamic_state and solver_state (from EnergyStorageModel.get_dynamic_state and
+        get_solver_state), if given, replace the worker model's state before the step, so that
+        the step continues from the caller's state instead of the worker's. The returned
+        solver_state is the worker's after the step, to pass to set_solver_state.
+        """
+        pack_id = self.default_pack_id if pack_id is None else pack_id
+        return self._submit(_step_model, pack_id, current, ambient_temp, time_duration, dynamic_state, solver_state)
+
+    async def run_step(self, current: float, ambient_temp: float, time_duration: int,
+                       pack_id: str = None, timeout: float = None, dynamic_state: dict = None,
+                       solver_state: tuple = None) -> tuple[bool, dict, tuple]:
+        """
+        Await one step without blocking the event loop.
+
+        Cancelling the awaiting task (or hitting the timeout) removes the step from the queue
+        if it has not been handed to the worker yet. A step that is already being solved cannot
+        be interrupted: it finishes in the worker and its result is part of the pack's history.
+        """
+        future = asyncio.wrap_future(self.submit(current, ambient_temp, time_duration, pack_id=pack_id,
+                                                 dynamic_state=dynamic_state, solver_state=solver_state))
+        if timeout is None:
+            return await future
+        return await asyncio.wait_for(future, timeout)
+
+    def cancel_pending(self) -> int:
+        """
+        Cancel every queued task that has not been handed to the worker. The task being solved
+        finishes. Returns the number cancelled.
+        """
+        with self._lock:
+            cancelled = sum(not future.cancelled() and future.cancel() for future, _, _ in self._queue)
+            self._queue.clear()
+        if cancelled:
+            logging.info(f"Cancelled {cancelled} pending battery steps")
+        return cancelled
+
+    def shutdown(self, cancel_pending: bool = True, wait: bool = False) -> None:
+        """
+        Stop accepting tasks and stop the worker. Queued tasks are cancelled with cancel_pending,
+        otherwise they still run; with wait, this returns once the worker has stopped.
+        """
+        with self._lock:
+            self._closing = True
+            if cancel_pending:
+                self.cancel_pending()
+            outstanding = [future for future, _, _ in self._queue] + ([self._running] if self._running else [])
+        if not outstanding:
+            self._pool.shutdown(wait=wait)
+        elif wait:
+            wait_futures(outstanding)
+            self._pool.shutdown(wait=True)
+        # otherwise _finished shuts the pool down once the queue has drained
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,77 @@
+import asyncio
+
+import numpy as np
+
+from .energy_storage import EnergyStorageModel
+from .energy_storage_test import PARAMETERS
+from .executor import EnergyStorageExecutor
+
+
+def _reference_socs(currents):
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters=PARAMETERS)
+    socs = []
+    for current in currents:
+        error, model.state = model.run_model(current=current, ambient_temp=25.0, time_duration=60,
+                                             previous_state=model.state)
+        assert not error
+        socs.append(model.state_of_charge)
+    return socs
+
+
+def test_steps_chain_in_submission_order():
+    currents = (10.0, -5.0, 10.0)
+    with EnergyStorageExecutor(PARAMETERS) as executor:
+        futures = [executor.submit(current, 25.0, 60) for current in currents]
+        results = [future.result() for future in futures]
+    for (error, dynamic_state, _), soc in zip(results, _reference_socs(currents)):
+        assert not error
+        assert np.isclose(dynamic_state["_state_of_charge"], soc, rtol=1e-9)
+
+
+def test_cancelled_steps_are_dropped():
+    with EnergyStorageExecutor() as executor:
+        opened = executor.open_pack("default", PARAMETERS)  # keeps the worker busy for a while
+        futures = [executor.submit(10.0, 25.0, 60) for _ in range(3)]
+        assert futures[1].cancel() and futures[2].cancel()
+        assert executor.pending_steps == 2
+        opened.result()
+        error, first, _ = futures[0].result()
+        error, second, _ = executor.submit(10.0, 25.0, 60).result()
+        assert executor.pending_steps == 0
+    assert not error
+    socs = _reference_socs((10.0, 10.0))
+    assert np.isclose(first["_state_of_charge"], socs[0], rtol=1e-9)
+    assert np.isclose(second["_state_of_charge"], socs[1], rtol=1e-9)
+
+
+async def _steps_around_a_timeout(model):
+    error, _ = await model.run_model_async(10.0, 25.0, 60)
+    assert not error
+    try:
+        # handed to the idle worker at once, so it finishes there after the timeout
+        await model.run_model_async(10.0, 25.0, 60, timeout=1e-3)
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("the step did not time out")
+    return await model.run_model_async(-10.0, 25.0, 60)
+
+
+def test_step_after_a_timeout_continues_from_the_callers_state():
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters=PARAMETERS)
+    try:
+        error, report = asyncio.run(_steps_around_a_timeout(model))
+    finally:
+        model.shutdown_executor()
+    assert not error
+    assert np.isclose(model.state_of_charge, _reference_socs((10.0, -10.0))[-1], rtol=1e-9)
+    assert model.state is not None
+
+
+if __name__ == "__main__":
+    test_steps_chain_in_submission_order()
+    test_cancelled_steps_are_dropped()
+    test_step_after_a_timeout_continues_from_the_callers_state()
+    print("executor: all tests passed")
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# meshes shipped with the package (read-only); tuned meshes go to the user's config directory
+PACKAGE_MESH_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mesh_config.json")
+
+# increasing resolutions tried by default, and the reference they are compared against
+CANDIDATE_VAR_PTS = [
+    {"x_n": 3, "x_s": 3, "x_p": 3, "r_n": 5, "r_p": 5},
+    {"x_n": 5, "x_s": 5, "x_p": 5, "r_n": 10, "r_p": 10},
+    {"x_n": 5, "x_s": 5, "x_p": 5, "r_n": 20, "r_p": 20},
+    {"x_n": 5, "x_s": 5, "x_p": 5, "r_n": 30, "r_p": 30},
+    {"x_n": 10, "x_s": 10, "x_p": 10, "r_n": 30, "r_p": 30},
+]
+REFERENCE_VAR_PTS = {"x_n": 20, "x_s": 20, "x_p": 20, "r_n": 60, "r_p": 60}
+
+# maximum absolute error against the reference
+DEFAULT_TOLERANCES = {
+    "cell_voltage": 0.005,  # V
+    "state_of_charge": 0.1,  # %
+    "temperature": 0.1,  # °C
+}
+
+
+def mesh_size(var_pts: dict) -> int:
+    """Number of discretisation points, used as the cost of a mesh."""
+    return var_pts["x_n"] * (var_pts["r_n"] + 1) + var_pts["x_s"] + var_pts["x_p"] * (var_pts["r_p"] + 1)
+
+
+def _config_key(cell_model: str, parameter_set: str, options: dict, tolerances: dict, profile: list) -> str:
+    """
+    Key of a tuned mesh: a mesh is only valid for the model options, the accuracy tolerances
+    and the profile it was tuned with, so these are part of the key as a digest.
+    """
+    setup = json.dumps({"options": options, "tolerances": tolerances, "profile": profile}, sort_keys=True, default=str)
+    return f"{cell_model}/{parameter_set}/{hashlib.sha1(setup.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _setup(options: dict, tolerances: dict) -> tuple[dict, dict]:
+    """Default options and tolerances: the model's DFN options and DEFAULT_TOLERANCES."""
+    if options is None:
+        from .energy_storage import DFN_OPTIONS
+
+        options = DFN_OPTIONS
+    return options, {**DEFAULT_TOLERANCES, **(tolerances or {})}
+
+
+def mesh_config_path() -> str:
+    """
+    Writable mesh config: $IEMS_CONFIG_DIR/mesh_config.json, else
+    $XDG_CONFIG_HOME/iems_digital_twin/mesh_config.json (~/.config by default).
+    """
+    directory = os.environ.get("IEMS_CONFIG_DIR")
+    if not directory:
+        config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+        directory = os.path.join(config_home, "iems_digital_twin")
+    return os.path.join(directory, "mesh_config.json")
+
+
+# path -> (modification time and size, parsed config), so repeated loads do not re-read the file
+_CONFIG_CACHE = {}
+
+
+def _read_config(path: str) -> dict:
+    """Parsed config at path, re-read only when the file changed. Callers must not modify it."""
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    signature = (status.st_mtime_ns, status.st_size)
+    cached = _CONFIG_CACHE.get(path)
+    if cached is None or cached[0] != signature:
+        with open(path) as f:
+            cached = _CONFIG_CACHE[path] = (signature, json.load(f))
+    return cached[1]
+
+
+def load_var_pts(cell_model: str, parameter_set: str, profile: list, options: dict = None,
+                 tolerances: dict = None, path: str = None) -> dict:
+    """
+    Return the mesh tuned for this model, parameter set, options, tolerances and profile, or
+    None if that setup was never tuned. Pass the result as var_pts to initialize_pybamm_model;
+    tuned meshes are never applied implicitly.
+    Without a path, the user's config takes precedence over the meshes shipped with the package.
+    """
+    key = _config_key(cell_model, parameter_set, *_setup(options, tolerances), profile)
+    paths = [path] if path is not None else [mesh_config_path(), PACKAGE_MESH_CONFIG_PATH]
+    for config_path in paths:
+        entry = _read_config(config_path).get(key)
+        if entry:
+            return dict(entry["var_pts"])
+    return None
+
+
+def save_var_pts(var_pts: dict, cell_model: str, parameter_set: str, profile: list, options: dict = None,
+                 tolerances: dict = None, metrics: dict = None, path: str = None) -> None:
+    """Store a mesh in the user's config (or path), keeping the entries of other setups."""
+    path = path or mesh_config_path()
+    options, tolerances = _setup(options, tolerances)
+    config = dict(_read_config(path))
+    config[_config_key(cell_model, parameter_set, options, tolerances, profile)] = {
+        "var_pts": var_pts, "tolerances": tolerances, **(metrics or {})}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(config, f, indent=4)
+    os.replace(temporary, path)  # readers never see a half-written file
+    _CONFIG_CACHE.pop(path, None)
+
+
+def _run_profile(parameters: dict, var_pts: dict, profile: list) -> dict:
+    """Run (current, ambient_temp, time_duration) steps on a fresh model with the given mesh."""
+    from .energy_storage import EnergyStorageModel
+
+    start = time.perf_counter()
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters=parameters, var_pts=var_pts)
+    trace = {"cell_voltage": [], "state_of_charge": [], "temperature": []}
+    failed = False
+    for current, ambient_temp, time_duration in profile:
+        error, model.state = model.run_model(current=current, ambient_temp=ambient_temp,
+                                             time_duration=time_duration, previous_state=model.state)
+        failed = failed or error
+        trace["cell_voltage"].append(model.cell_voltage)
+        trace["state_of_charge"].append(model.state_of_charge)
+        trace["temperature"].append(model.temperature)
+    result = {name: np.asarray(values, dtype=float) for name, values in trace.items()}
+    result["wall_time"] = time.perf_counter() - start
+    result["failed"] = failed
+    return result
+
+
+def tune_var_pts(parameters: dict, profile: list, candidates: list = None, reference: dict = None,
+                 tolerances: dict = None, processes: int = None, save: bool = True,
+                 path: str = None) -> dict:
+    """
+    Pick the cheapest mesh whose errors against a high-resolution reference stay within tolerance.
+
+    All candidates and the reference run the same profile in parallel. The cost of a mesh is its
+    number of discretisation points (wall times under parallel load are reported, not ranked on).
+    The choice is saved (to the user's mesh config unless path is given) under the model
+    options, tolerances and profile, for load_var_pts to find it again.
+
+    Args:
+        parameters (dict): initialization parameters, as for initialize_pybamm_model.
+        profile (list): (current [A], ambient_temp [°C], time_duration [s]) steps.
+    Returns:
+        dict with the chosen "var_pts" and the per-candidate errors and wall times.
+    """
+    from .energy_storage import PARAMETER_SET
+
+    candidates = sorted(candidates or CANDIDATE_VAR_PTS, key=mesh_size)
+    reference = reference or REFERENCE_VAR_PTS
+    options, tolerances = _setup(None, tolerances)
+
+    meshes = [reference] + candidates
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        runs = list(pool.map(_run_profile, [parameters] * len(meshes), meshes, [profile] * len(meshes)))
+    reference_run, candidate_runs = runs[0], runs[1:]
+    if reference_run["failed"]:
+        raise RuntimeError(f"Reference simulation with mesh {reference} failed")
+
+    report, chosen = [], None
+    for var_pts, run in zip(candidates, candidate_runs):
+        errors = {name: float(np.max(np.abs(run[name] - reference_run[name]))) for name in tolerances}
+        accepted = not run["failed"] and all(errors[name] <= tolerance for name, tolerance in tolerances.items())
+        report.append({"var_pts": var_pts, "mesh_size": mesh_size(var_pts), "errors": errors,
+                       "wall_time": run["wall_time"], "accepted": accepted})
+        if accepted and chosen is None:
+            chosen = report[-1]
+
+    if chosen is None:
+        logging.warning("No candidate mesh met the tolerances; keeping the reference mesh")
+        chosen = {"var_pts": reference, "mesh_size": mesh_size(reference), "errors": {},
+                  "wall_time": reference_run["wall_time"], "accepted": True}
+
+    if save:
+        save_var_pts(chosen["var_pts"], "DFN", PARAMETER_SET, profile, options=options, tolerances=tolerances,
+                     path=path, metrics={"errors": chosen["errors"], "reference": reference})
+    logging.info(f"Selected mesh {chosen['var_pts']}")
+    return {"var_pts": chosen["var_pts"], "candidates": report}
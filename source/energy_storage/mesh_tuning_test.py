@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+
+from .energy_storage import DEFAULT_VAR_PTS, DFN_OPTIONS, PARAMETER_SET, EnergyStorageModel
+from .energy_storage_test import PARAMETERS
+from .mesh_tuning import DEFAULT_TOLERANCES, load_var_pts, save_var_pts
+
+
+PROFILE = [(10.0, 25.0, 60), (-10.0, 25.0, 60)]
+TUNED_VAR_PTS = {"x_n": 3, "x_s": 3, "x_p": 3, "r_n": 5, "r_p": 5}
+
+
+def test_tuned_meshes_are_keyed_by_setup():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "mesh_config.json")
+        save_var_pts(TUNED_VAR_PTS, "DFN", PARAMETER_SET, PROFILE, path=path)
+        save_var_pts(DEFAULT_VAR_PTS, "DFN", PARAMETER_SET, PROFILE[:1], path=path)
+
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, path=path) == TUNED_VAR_PTS
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, options=DFN_OPTIONS,
+                            tolerances=DEFAULT_TOLERANCES, path=path) == TUNED_VAR_PTS
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE[:1], path=path) == DEFAULT_VAR_PTS
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, tolerances={"cell_voltage": 0.001}, path=path) is None
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, options={**DFN_OPTIONS, "thermal": "isothermal"},
+                            path=path) is None
+        assert load_var_pts("DFN", "Chen2020", PROFILE, path=path) is None
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, path=os.path.join(directory, "missing.json")) is None
+
+
+def test_config_is_reread_only_when_it_changes():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "mesh_config.json")
+        save_var_pts(TUNED_VAR_PTS, "DFN", PARAMETER_SET, PROFILE, path=path)
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, path=path) == TUNED_VAR_PTS
+
+        # same size and modification time: the cached config is used
+        status = os.stat(path)
+        with open(path) as f:
+            config = json.load(f)
+        (entry,) = config.values()
+        entry["var_pts"]["r_n"], entry["var_pts"]["r_p"] = 7, 7
+        with open(path, "w") as f:
+            json.dump(config, f, indent=4)
+        os.utime(path, ns=(status.st_atime_ns, status.st_mtime_ns))
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, path=path) == TUNED_VAR_PTS
+
+        save_var_pts(DEFAULT_VAR_PTS, "DFN", PARAMETER_SET, PROFILE, path=path)
+        assert load_var_pts("DFN", PARAMETER_SET, PROFILE, path=path) == DEFAULT_VAR_PTS
+
+
+def test_initialization_uses_a_tuned_mesh_only_when_given():
+    previous = os.environ.get("IEMS_CONFIG_DIR")
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["IEMS_CONFIG_DIR"] = directory
+        try:
+            save_var_pts(TUNED_VAR_PTS, "DFN", PARAMETER_SET, PROFILE)
+            model = EnergyStorageModel()
+            model.initialize_pybamm_model(parameters=PARAMETERS)
+            assert model.var_pts == DEFAULT_VAR_PTS
+            model.initialize_pybamm_model(parameters=PARAMETERS, var_pts=load_var_pts("DFN", PARAMETER_SET, PROFILE))
+            assert model.var_pts == TUNED_VAR_PTS
+        finally:
+            if previous is None:
+                os.environ.pop("IEMS_CONFIG_DIR")
+            else:
+                os.environ["IEMS_CONFIG_DIR"] = previous
+
+
+if __name__ == "__main__":
+    test_tuned_meshes_are_keyed_by_setup()
+    test_config_is_reread_only_when_it_changes()
+    test_initialization_uses_a_tuned_mesh_only_when_given()
+    print("mesh_tuning: all tests passed")
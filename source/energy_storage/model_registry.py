@@ -0,0 +1,138 @@
+import json
+import logging
+import threading
+
+import pybamm
+
+
+# parameters passed to the built models as inputs at every step
+INPUT_PARAMETERS = ("Current function [A]", "Ambient temperature [K]")
+
+# initial electrode concentrations, also inputs: they set the initial SOC of each instance and
+# are only read when a step starts the model from its initial conditions
+INITIAL_CONCENTRATIONS = (
+    "Initial concentration in negative electrode [mol.m-3]",
+    "Initial concentration in positive electrode [mol.m-3]",
+)
+
+
+class SharedModel:
+    """
+    The build products of an EnergyStorageModel that do not depend on its operating state:
+    the DFN model, the base ParameterValues, the solver and the electrode SOH solver, and the
+    parameterised and discretised models built from them.
+
+    Instances must treat everything here as read-only. Per-instance changes (capacity, initial
+    temperature) go to the copy returned by new_parameter_values; the current, the ambient
+    temperature and the initial concentrations are inputs of the built models, so they change
+    from step to step, or from instance to instance, without a rebuild. The solver holds
+    per-model setup state, so each instance steps with its own copy, and steps of a built model
+    are serialised with step_lock because the solver writes its initial state to the model.
+    """
+
+    def __init__(self, options: dict, parameter_set: str, var_pts: dict):
+        self.options = dict(options)
+        self.parameter_set = parameter_set
+        self.var_pts = dict(var_pts)
+        self.model = pybamm.lithium_ion.DFN(self.options)
+        self.parameter_values = pybamm.ParameterValues(parameter_set)
+        self.soh_param = pybamm.LithiumIonParameters()
+        self.solver = self.model.default_solver
+        self.esoh_solver = pybamm.lithium_ion.ElectrodeSOHSolver(self.parameter_values, self.soh_param)
+        self._cell_nominal_capacity = None
+        self._built = {}  # instance parameters -> built Simulation
+        self._lock = threading.Lock()
+        self.step_lock = threading.Lock()
+
+    def new_parameter_values(self) -> pybamm.ParameterValues:
+        """Private copy of the base parameter values for one instance to write to."""
+        return self.parameter_values.copy()
+
+    @property
+    def cell_nominal_capacity(self) -> float:
+        """Cell capacity [A.h] from the initial electrode stoichiometries, solved once per set."""
+        if self._cell_nominal_capacity is None:
+            inputs = {
+                "Q_n": self.parameter_values.evaluate(self.soh_param.n.Q_init),
+                "Q_p": self.parameter_values.evaluate(self.soh_param.p.Q_init),
+                "Q_Li": self.parameter_values.evaluate(self.soh_param.Q_Li_particles_init),
+            }
+            self._cell_nominal_capacity = self.esoh_solver.solve(inputs)["Q"]
+        return self._cell_nominal_capacity
+
+    def initial_concentrations(self, parameter_values: pybamm.ParameterValues, initial_soc: float) -> dict:
+        """Initial electrode concentration inputs that start the built models at initial_soc [0-1]."""
+        x, y = pybamm.lithium_ion.get_initial_stoichiometries(initial_soc, parameter_values, param=self.soh_param)
+        return {
+            INITIAL_CONCENTRATIONS[0]: x * parameter_values.evaluate(self.soh_param.n.prim.c_max),
+            INITIAL_CONCENTRATIONS[1]: y * parameter_values.evaluate(self.soh_param.p.prim.c_max),
+        }
+
+    def _parameter_key(self, parameter_values: pybamm.ParameterValues) -> tuple:
+        """The values an instance changed with respect to the base set, except the inputs."""
+        changed = []
+        for name, value in parameter_values.items():
+            if name in INPUT_PARAMETERS or name in INITIAL_CONCENTRATIONS:
+                continue
+            try:
+                base = self.parameter_values[name]
+            except KeyError:
+                base = None
+            if value is not base:
+                changed.append((name, value if isinstance(value, (int, float, str)) else id(value)))
+        return tuple(sorted(changed))
+
+    def built_simulation(self, parameter_values: pybamm.ParameterValues) -> pybamm.Simulation:
+        """
+        Simulation with the model parameterised with parameter_values and discretised on the
+        mesh, built once per distinct set of instance parameters. INPUT_PARAMETERS and
+        INITIAL_CONCENTRATIONS are left as inputs to pass at each step.
+        """
+        key = self._parameter_key(parameter_values)
+        with self._lock:
+            if key not in self._built:
+                parameter_values = parameter_values.copy()
+                parameter_values.update({name: "[input]" for name in INPUT_PARAMETERS + INITIAL_CONCENTRATIONS})
+                simulation = pybamm.Simulation(self.model, parameter_values=parameter_values, var_pts=self.var_pts,
+                                               solver=self.solver)
+                simulation.build()
+                self._built[key] = simulation
+            return self._built[key]
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of SharedModel objects keyed by model options, parameter set and mesh,
+    so that identical packs in one process build, parameterise and discretise the model only
+    once.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(options: dict, parameter_set: str, var_pts: dict) -> tuple:
+        return (
+            json.dumps(options, sort_keys=True, default=str),
+            parameter_set,
+            tuple(sorted(var_pts.items())),
+        )
+
+    def get(self, options: dict, parameter_set: str, var_pts: dict) -> SharedModel:
+        key = self.key(options, parameter_set, var_pts)
+        with self._lock:
+            if key not in self._models:
+                logging.info(f"Building shared {parameter_set} model with mesh {dict(var_pts)}")
+                self._models[key] = SharedModel(options, parameter_set, var_pts)
+            return self._models[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self):
+        return len(self._models)
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,163 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from .executor import EnergyStorageExecutor
+
+
+class RealTimeStepper:
+    """
+    Deadline-aware stepping of an EnergyStorageModel for live twin operation.
+
+    Every step is solved with the full model in a background worker. If the result is not
+    available within the deadline, the step returns an estimate from a reduced model instead:
+    Coulomb counting for SOC and stored energy, an online-fitted series resistance for the
+    voltage, temperature and SOH held. The late full solve keeps running and is reconciled on a
+    later step: its state replaces the estimate, and the steps still in flight are re-estimated
+    on top of it. Full solves always chain in order, so the worker never diverges from the
+    current profile that was actually applied.
+
+    step() takes the current in the input convention of run_model (current > 0 charges).
+    Estimated states are written in the convention of the full solves, i.e. PyBaMM's: current
+    and power positive on discharge.
+
+    Args:
+        model (EnergyStorageModel): an initialized model; its dynamic state is kept up to date.
+        deadline (float): wall-clock budget per step in seconds.
+    """
+
+    def __init__(self, model, deadline: float = 0.2, executor: EnergyStorageExecutor = None):
+        if model.parameters is None:
+            raise RuntimeError("initialize_pybamm_model must be called before real-time stepping")
+        self.model = model
+        self.deadline = float(deadline)
+        if executor is None:
+            # the worker starts from the model's current state, not from the initialization parameters
+            executor = EnergyStorageExecutor(model.parameters, dynamic_state=model.get_dynamic_state())
+            self._handover = model.get_solver_state()
+        else:
+            self._handover = None
+        self.executor = executor
+        self._pending = deque()  # (future, current, time_duration) of full solves not yet applied
+        self._resistance = 0.0  # cell series resistance estimate (Ω)
+        self._full_state = model.get_dynamic_state()  # state after the last applied full solve
+        self.metrics = {
+            "steps": 0,
+            "deadline_misses": 0,
+            "fallbacks": 0,
+            "reconciliations": 0,
+            "solver_errors": 0,
+            "max_latency [s]": 0.0,
+            "total_latency [s]": 0.0,
+        }
+
+    def step(self, current: float, ambient_temp: float, time_duration: int) -> tuple[bool, dict]:
+        """
+        Advance by one step within the deadline.
+
+        Returns whether the result is a reduced-model estimate, and the state report.
+        """
+        start = time.perf_counter()
+        self.reconcile()
+        future = self.executor.submit(current, ambient_temp, time_duration, solver_state=self._handover)
+        self._handover = None
+        self._pending.append((future, current, time_duration))
+
+        try:
+            future.result(timeout=max(self.deadline - (time.perf_counter() - start), 0.0))
+        except FutureTimeoutError:
+            self.metrics["deadline_misses"] += 1
+        self.reconcile()
+
+        fallback = bool(self._pending)
+        if fallback:
+            self.metrics["fallbacks"] += 1
+
+        latency = time.perf_counter() - start
+        self.metrics["steps"] += 1
+        self.metrics["total_latency [s]"] += latency
+        self.metrics["max_latency [s]"] = max(self.metrics["max_latency [s]"], latency)
+        return fallback, self.model.report_state()
+
+    def reconcile(self) -> int:
+        """
+        Apply full solves that have finished since the last call, in order, then re-estimate
+        the steps still in flight on top of the latest full state. Returns the number applied.
+        """
+        applied = 0
+        while self._pending and self._pending[0][0].done():
+            future, _, _ = self._pending.popleft()
+            error, dynamic_state, _ = future.result()
+            if error:
+                # the worker kept its previous state, so the full state does not move either
+                self.metrics["solver_errors"] += 1
+            else:
+                self._update_resistance(dynamic_state)
+                self._full_state = dynamic_state
+            applied += 1
+
+        if applied and self._pending:
+            self.metrics["reconciliations"] += 1
+        self.model.set_dynamic_state(self._full_state)
+        for _, current, time_duration in self._pending:
+            self._estimate(current, time_duration)
+        return applied
+
+    def _update_resistance(self, dynamic_state: dict) -> None:
+        # full states carry PyBaMM's discharge-positive current: V = OCV - R * I
+        cell_current, cell_voltage = dynamic_state["_cell_current"], dynamic_state["_cell_voltage"]
+        previous_current, previous_voltage = self._full_state["_cell_current"], self._full_state["_cell_voltage"]
+        if abs(cell_current - previous_current) > 1e-3:
+            resistance = -(cell_voltage - previous_voltage) / (cell_current - previous_current)
+            if resistance > 0:
+                self._resistance = resistance
+
+    def _estimate(self, current: float, time_duration: int) -> None:
+        """
+        Reduced-model update of the model's dynamic state for one step. current > 0 charges,
+        as in run_model; the state is written with PyBaMM's discharge-positive current.
+        """
+        model = self.model
+        parallel = model._attributes["cell_parallel_number [uint]"]
+        series = model._attributes["cell_series_number [uint]"]
+        cell_current = -current / parallel
+
+        soc = model._state_of_charge
+        if model._cell_remained_capacity > 0:
+            soc -= cell_current * time_duration / 3600 / model._cell_remained_capacity * 100
+        cell_voltage = model._cell_voltage - self._resistance * (cell_current - model._cell_current)
+        cell_stored_energy = model._cell_remained_capacity * cell_voltage * soc / 100
+
+        model.set_dynamic_state({
+            "_cell_state_of_charge": soc,
+            "_state_of_charge": soc,
+            "_relative_state_of_charge": ((soc - model._attributes["state_of_charge_min [%]"])
+                                          / (model._attributes["state_of_charge_max [%]"]
+                                             - model._attributes["state_of_charge_min [%]"]) * 100),
+            "_cell_current": cell_current,
+            "current": cell_current * parallel,
+            "_cell_voltage": cell_voltage,
+            "_voltage": cell_voltage * series,
+            "_cell_power": cell_current * cell_voltage,
+            "power": cell_current * cell_voltage * model._attributes["total_number_of_cells [uint]"],
+            "_cell_stored_energy": cell_stored_energy,
+            "_stored_energy": cell_stored_energy * model._attributes["total_number_of_cells [uint]"],
+        })
+
+    def get_metrics(self) -> dict:
+        metrics = dict(self.metrics)
+        metrics["pending_full_solves"] = len(self._pending)
+        metrics["mean_latency [s]"] = metrics["total_latency [s]"] / metrics["steps"] if metrics["steps"] else 0.0
+        metrics["fallback_rate"] = metrics["fallbacks"] / metrics["steps"] if metrics["steps"] else 0.0
+        return metrics
+
+    def close(self, wait: bool = False) -> None:
+        """Stop the background worker. With wait=True, the in-flight solves are applied first."""
+        if wait:
+            for future, _, _ in list(self._pending):
+                future.exception()
+            self.reconcile()
+        else:
+            logging.info(f"Discarding {len(self._pending)} in-flight battery solves")
+        self.executor.shutdown(cancel_pending=not wait)
@@ -0,0 +1,80 @@
+import numpy as np
+
+from .energy_storage import EnergyStorageModel
+from .energy_storage_test import PARAMETERS
+from .realtime import RealTimeStepper
+
+STEP = 60  # s
+AMPLITUDE = 10.0  # A
+
+
+def _new_model():
+    model = EnergyStorageModel()
+    model.initialize_pybamm_model(parameters=PARAMETERS)
+    return model
+
+
+def _reference_states(currents):
+    model = _new_model()
+    states = []
+    for current in currents:
+        error, model.state = model.run_model(current=current, ambient_temp=25.0, time_duration=STEP,
+                                             previous_state=model.state)
+        assert not error
+        states.append(model.get_dynamic_state())
+    return states
+
+
+def _assert_same_state(state, reference):
+    assert state.keys() == reference.keys()
+    assert all(np.isclose(state[name], reference[name], rtol=1e-9) for name in reference if reference[name] is not None)
+
+
+def test_steps_within_the_deadline_are_full_solves():
+    currents = (0.0, -AMPLITUDE, AMPLITUDE)
+    stepper = RealTimeStepper(_new_model(), deadline=120.0)
+    try:
+        for current, reference in zip(currents, _reference_states(currents)):
+            fallback, report = stepper.step(current, 25.0, STEP)
+            assert not fallback
+            assert report["state_of_charge"][0] == round(reference["_state_of_charge"], 2)
+            _assert_same_state(stepper.model.get_dynamic_state(), reference)
+    finally:
+        stepper.close()
+    metrics = stepper.get_metrics()
+    assert metrics["steps"] == 3 and metrics["fallbacks"] == 0 and metrics["solver_errors"] == 0
+
+
+def test_late_solves_fall_back_to_estimates_and_are_reconciled():
+    currents = (0.0, -AMPLITUDE, AMPLITUDE, AMPLITUDE)
+    references = _reference_states(currents)
+    stepper = RealTimeStepper(_new_model(), deadline=120.0)
+    try:
+        for current in currents[:2]:  # rest, then discharge: fits the series resistance
+            assert not stepper.step(current, 25.0, STEP)[0]
+        discharged = stepper.model.get_dynamic_state()
+
+        stepper.deadline = 0.0
+        for current, reference in zip(currents[2:], references[2:]):
+            fallback, _ = stepper.step(current, 25.0, STEP)
+            assert fallback
+            estimate = stepper.model.get_dynamic_state()
+            # estimates use the convention of the full solves: PyBaMM's, positive on discharge
+            assert np.isclose(estimate["current"], reference["current"], rtol=1e-3)
+            assert np.sign(estimate["power"]) == np.sign(reference["power"]) == np.sign(reference["current"])
+            assert estimate["_cell_voltage"] > discharged["_cell_voltage"]
+            soc_change = reference["_state_of_charge"] - discharged["_state_of_charge"]
+            assert np.isclose(estimate["_state_of_charge"] - discharged["_state_of_charge"], soc_change, rtol=0.02)
+    finally:
+        stepper.close(wait=True)
+
+    # the late full solves replace the estimates
+    _assert_same_state(stepper.model.get_dynamic_state(), references[-1])
+    metrics = stepper.get_metrics()
+    assert metrics["fallbacks"] == 2 and metrics["deadline_misses"] == 2 and metrics["pending_full_solves"] == 0
+
+
+if __name__ == "__main__":
+    test_steps_within_the_deadline_are_full_solves()
+    test_late_solves_fall_back_to_estimates_and_are_reconciled()
+    print("realtime: all tests passed")
@@ -0,0 +1,339 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+
+if __name__ == "__main__" and not __package__:
+    # the relative imports below need the package: run as a module from the repository root
+    raise SystemExit("Run the battery service as a module: python -m source.energy_storage.service")
+
+from .executor import EnergyStorageExecutor
+
+
+# Wire format (network byte order)
+#   frame    : opcode/status (B) | payload length (I) | payload
+#   OPEN     : pack id | parameters as UTF-8 JSON
+#   STEP     : count (I) | count x [pack id | current, ambient_temp, time_duration (ddd)]
+#   STATE    : pack id
+#   CLOSE    : pack id
+#   pack id  : length (H) | UTF-8 bytes
+# STEP replies carry count (I) | count x [error (B) | state record]; OPEN and STATE reply
+# with a single state record. A reply with status STATUS_ERROR carries a UTF-8 message.
+OP_OPEN, OP_STEP, OP_STATE, OP_CLOSE = 1, 2, 3, 4
+STATUS_OK, STATUS_ERROR = 0, 1
+
+STATE_FIELDS = (
+    ("voltage", "_voltage"),
+    ("current", "current"),
+    ("state_of_charge", "_state_of_charge"),
+    ("state_of_health", "_state_of_health"),
+    ("power", "power"),
+    ("temperature", "_temperature"),
+    ("stored_energy", "_stored_energy"),
+    ("remained_capacity", "_remained_capacity"),
+)
+
+_HEADER = struct.Struct("!BI")
+_COUNT = struct.Struct("!I")
+_ID_LENGTH = struct.Struct("!H")
+_STEP = struct.Struct("!ddd")
+_ERROR = struct.Struct("!B")
+_STATE = struct.Struct(f"!{len(STATE_FIELDS)}d")
+_MISSING_STATE = {attribute: float("nan") for _, attribute in STATE_FIELDS}  # reported for packs that are not open
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Connection closed while reading a frame")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def _send_frame(sock, code: int, payload: bytes = b"") -> None:
+    sock.sendall(_HEADER.pack(code, len(payload)) + payload)
+
+
+def _recv_frame(sock) -> tuple[int, bytes]:
+    code, length = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return code, _recv_exact(sock, length)
+
+
+def _pack_id(pack_id: str) -> bytes:
+    encoded = pack_id.encode("utf-8")
+    return _ID_LENGTH.pack(len(encoded)) + encoded
+
+
+def _unpack_id(payload: bytes, offset: int) -> tuple[str, int]:
+    (length,) = _ID_LENGTH.unpack_from(payload, offset)
+    offset += _ID_LENGTH.size
+    return payload[offset:offset + length].decode("utf-8"), offset + length
+
+
+def _pack_state(dynamic_state: dict) -> bytes:
+    return _STATE.pack(*(float(dynamic_state[attribute]) for _, attribute in STATE_FIELDS))
+
+
+def _unpack_state(payload: bytes, offset: int) -> tuple[dict, int]:
+    values = _STATE.unpack_from(payload, offset)
+    return {name: value for (name, _), value in zip(STATE_FIELDS, values)}, offset + _STATE.size
+
+
+def _remove_socket(path: str) -> bool:
+    """Remove the Unix socket at path, if any. Returns False if something else is there."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return True
+    if not stat.S_ISSOCK(mode):
+        return False
+    os.unlink(path)
+    return True
+
+
+class BatteryService:
+    """
+    Local battery simulation service hosting warm EnergyStorageModel workers.
+
+    Each pack id is pinned to one worker process of the pool, where its model and solution
+    history live for the lifetime of the pack. Step requests arrive in batches; steps of
+    packs on different workers are solved in parallel, steps of the same pack in order.
+
+    From the command line, run it as a module from the repository root:
+    python -m source.energy_storage.service --socket /tmp/iems_battery.sock
+
+    Parameters:
+    - address (str or tuple): Unix socket path, or (host, port) for a localhost TCP socket.
+    - workers (int): Number of worker processes.
+    """
+
+    def __init__(self, address, workers: int = os.cpu_count() or 1):
+        self.address = address
+        self._server = self._make_server(address)
+        self._serving = False
+        self.workers = [EnergyStorageExecutor() for _ in range(max(1, int(workers)))]
+        self._assignment = {}  # pack id -> worker index
+        self._states = {}  # pack id -> last dynamic state
+        self._lock = threading.Lock()
+
+    def _make_server(self, address):
+        service = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                service._handle_connection(self.request)
+
+        if isinstance(address, str):
+            # a socket left behind by a previous run is replaced, any other file is kept
+            if not _remove_socket(address):
+                raise FileExistsError(f"{address} exists and is not a socket")
+            server_class = socketserver.ThreadingUnixStreamServer
+        else:
+            server_class = socketserver.ThreadingTCPServer
+        server_class.daemon_threads = True
+        return server_class(address, Handler)
+
+    def serve_forever(self) -> None:
+        logging.info(f"Battery service listening on {self.address} with {len(self.workers)} workers")
+        self._serving = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._serving = False
+            self._close()
+
+    def shutdown(self) -> None:
+        """Stop the service. May be called from another thread while serve_forever runs."""
+        if self._serving:
+            self._server.shutdown()  # serve_forever returns and closes the service
+        else:
+            self._close()
+
+    def _close(self) -> None:
+        self._server.server_close()
+        for worker in self.workers:
+            worker.shutdown()
+        if isinstance(self.address, str):
+            _remove_socket(self.address)
+
+    def _worker_for(self, pack_id: str) -> EnergyStorageExecutor:
+        with self._lock:
+            if pack_id not in self._assignment:
+                raise KeyError(f"Pack {pack_id} is not open")
+            return self.workers[self._assignment[pack_id]]
+
+    def open_pack(self, pack_id: str, parameters: dict) -> dict:
+        """Build the model of a new pack on the least loaded worker. Opening an open pack is an error."""
+        with self._lock:
+            if pack_id in self._assignment:
+                raise ValueError(f"Pack {pack_id} is already open")
+            load = [0] * len(self.workers)
+            for index in self._assignment.values():
+                load[index] += 1
+            self._assignment[pack_id] = load.index(min(load))
+            worker = self.workers[self._assignment[pack_id]]
+            future = worker.open_pack(pack_id, parameters)
+        try:
+            dynamic_state = future.result()
+        except Exception:
+            with self._lock:
+                self._assignment.pop(pack_id, None)
+            raise
+        with self._lock:
+            if pack_id in self._assignment:
+                self._states[pack_id] = dynamic_state
+        return dynamic_state
+
+    def close_pack(self, pack_id: str) -> None:
+        """Drop a pack and its model. Closing a pack that is not open does nothing."""
+        with self._lock:
+            index = self._assignment.pop(pack_id, None)
+            self._states.pop(pack_id, None)
+        if index is not None:
+            self.workers[index].close_pack(pack_id).result()
+
+    def state(self, pack_id: str) -> dict:
+        with self._lock:
+            if pack_id not in self._states:
+                raise KeyError(f"Pack {pack_id} is not open")
+            return self._states[pack_id]
+
+    def step(self, requests: list) -> list:
+        """
+        Run a batch of (pack_id, current, ambient_temp, time_duration) steps.
+
+        A request that fails (unknown pack, solver exception) does not fail the batch: it is
+        logged and reported with the error flag set and the pack's last state, or NaN values
+        if the pack is not open.
+        """
+        futures = []
+        for pack_id, current, ambient_temp, time_duration in requests:
+            try:
+                futures.append(self._worker_for(pack_id).submit(current, ambient_temp, time_duration, pack_id=pack_id))
+            except Exception as e:
+                futures.append(e)
+        results = []
+        for (pack_id, *_), future in zip(requests, futures):
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                error, dynamic_state, _ = future.result()
+            except Exception as e:
+                logging.error(f"Step of pack {pack_id} failed: {type(e).__name__}: {e}")
+                error, dynamic_state = True, None
+            with self._lock:
+                if not error and pack_id in self._assignment:
+                    self._states[pack_id] = dynamic_state
+                state = self._states.get(pack_id, _MISSING_STATE)
+            results.append((error, state))
+        return results
+
+    def _handle_connection(self, sock) -> None:
+        while True:
+            try:
+                opcode, payload = _recv_frame(sock)
+            except ConnectionError:
+                return
+            try:
+                reply = self._dispatch(opcode, payload)
+            except Exception as e:
+                _send_frame(sock, STATUS_ERROR, f"{type(e).__name__}: {e}".encode("utf-8"))
+            else:
+                _send_frame(sock, STATUS_OK, reply)
+
+    def _dispatch(self, opcode: int, payload: bytes) -> bytes:
+        if opcode == OP_STEP:
+            (count,) = _COUNT.unpack_from(payload, 0)
+            offset, requests = _COUNT.size, []
+            for _ in range(count):
+                pack_id, offset = _unpack_id(payload, offset)
+                requests.append((pack_id, *_STEP.unpack_from(payload, offset)))
+                offset += _STEP.size
+            reply = [_COUNT.pack(len(requests))]
+            for error, dynamic_state in self.step(requests):
+                reply.append(_ERROR.pack(int(error)) + _pack_state(dynamic_state))
+            return b"".join(reply)
+
+        pack_id, offset = _unpack_id(payload, 0)
+        if opcode == OP_OPEN:
+            return _pack_state(self.open_pack(pack_id, json.loads(payload[offset:].decode("utf-8"))))
+        if opcode == OP_STATE:
+            return _pack_state(self.state(pack_id))
+        if opcode == OP_CLOSE:
+            self.close_pack(pack_id)
+            return b""
+        raise ValueError(f"Unknown opcode {opcode}")
+
+
+class BatteryServiceClient:
+    """
+    Client for BatteryService. States are returned as dicts keyed by the names in STATE_FIELDS.
+
+    Parameters:
+    - address (str or tuple): Unix socket path, or (host, port) of the service.
+    """
+
+    def __init__(self, address):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.connect(address)
+
+    def _request(self, opcode: int, payload: bytes) -> bytes:
+        _send_frame(self._sock, opcode, payload)
+        status, reply = _recv_frame(self._sock)
+        if status == STATUS_ERROR:
+            raise RuntimeError(f"Battery service error: {reply.decode('utf-8')}")
+        return reply
+
+    def open_pack(self, pack_id: str, parameters: dict) -> dict:
+        reply = self._request(OP_OPEN, _pack_id(pack_id) + json.dumps(parameters).encode("utf-8"))
+        return _unpack_state(reply, 0)[0]
+
+    def step(self, requests: list) -> list:
+        """Send a batch of (pack_id, current, ambient_temp, time_duration); returns [(error, state)]."""
+        payload = [_COUNT.pack(len(requests))]
+        for pack_id, current, ambient_temp, time_duration in requests:
+            payload.append(_pack_id(pack_id) + _STEP.pack(current, ambient_temp, time_duration))
+        reply = self._request(OP_STEP, b"".join(payload))
+        (count,) = _COUNT.unpack_from(reply, 0)
+        offset, results = _COUNT.size, []
+        for _ in range(count):
+            (error,) = _ERROR.unpack_from(reply, offset)
+            state, offset = _unpack_state(reply, offset + _ERROR.size)
+            results.append((bool(error), state))
+        return results
+
+    def get_state(self, pack_id: str) -> dict:
+        return _unpack_state(self._request(OP_STATE, _pack_id(pack_id)), 0)[0]
+
+    def close_pack(self, pack_id: str) -> None:
+        self._request(OP_CLOSE, _pack_id(pack_id))
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Battery simulation service",
+                                     prog="python -m source.energy_storage.service")
+    parser.add_argument("--socket", default="/tmp/iems_battery.sock", help="Unix socket path")
+    parser.add_argument("--port", type=int, default=None, help="serve on localhost TCP instead")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    BatteryService(("127.0.0.1", args.port) if args.port else args.socket, workers=args.workers).serve_forever()
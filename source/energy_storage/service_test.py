@@ -0,0 +1,60 @@
+import math
+import os
+import tempfile
+import threading
+
+from .energy_storage import EnergyStorageModel
+from .energy_storage_test import PARAMETERS
+from .service import BatteryService, BatteryServiceClient
+
+
+def test_client_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        address = os.path.join(directory, "battery.sock")
+        service = BatteryService(address, workers=2)
+        server = threading.Thread(target=service.serve_forever, daemon=True)
+        server.start()
+        try:
+            with BatteryServiceClient(address) as client:
+                opened = client.open_pack("a", PARAMETERS)
+                client.open_pack("b", {**PARAMETERS, "state_of_charge_init [%]": 70})
+                results = client.step([("a", 10.0, 25.0, 60), ("b", -10.0, 25.0, 60), ("missing", 1.0, 25.0, 60)])
+                state = client.get_state("a")
+                client.close_pack("a")
+                closed = client.step([("a", 10.0, 25.0, 60)])
+        finally:
+            service.shutdown()
+            server.join(timeout=30)
+        assert not server.is_alive() and not os.path.exists(address)
+
+    reference = EnergyStorageModel()
+    reference.initialize_pybamm_model(parameters=PARAMETERS)
+    error, reference.state = reference.run_model(current=10.0, ambient_temp=25.0, time_duration=60)
+    assert not error
+
+    assert opened["state_of_charge"] == 50
+    (error_a, state_a), (error_b, state_b), (error_missing, state_missing) = results
+    assert not error_a and not error_b and error_missing
+    assert math.isclose(state_a["state_of_charge"], reference.state_of_charge, rel_tol=1e-9)
+    assert math.isclose(state_a["voltage"], reference.voltage, rel_tol=1e-9)
+    assert state_b["state_of_charge"] < 70
+    assert all(math.isnan(value) for value in state_missing.values())
+    assert state == state_a
+    assert closed[0][0] and math.isnan(closed[0][1]["state_of_charge"])
+
+
+def test_other_files_at_the_socket_path_are_kept():
+    with tempfile.NamedTemporaryFile() as existing:
+        try:
+            BatteryService(existing.name, workers=1)
+        except FileExistsError:
+            pass
+        else:
+            raise AssertionError("the service replaced a regular file")
+        assert os.path.isfile(existing.name)
+
+
+if __name__ == "__main__":
+    test_client_round_trip()
+    test_other_files_at_the_socket_path_are_kept()
+    print("service: all tests passed")
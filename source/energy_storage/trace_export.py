@@ -0,0 +1,207 @@
+import re
+
+import numpy as np
+import tables
+
+
+# internal trajectories worth keeping for post-mortem analysis of the DFN model
+DEFAULT_TRACE_VARIABLES = [
+    "Current [A]",
+    "Voltage [V]",
+    "X-averaged cell temperature [K]",
+    "Discharge capacity [A.h]",
+    "Negative particle concentration [mol.m-3]",
+    "Positive particle concentration [mol.m-3]",
+    "Electrolyte concentration [mol.m-3]",
+    "Negative electrode potential [V]",
+    "Positive electrode potential [V]",
+    "Electrolyte potential [V]",
+    "Loss of lithium inventory [%]",
+    "Loss of active material in negative electrode [%]",
+    "Loss of active material in positive electrode [%]",
+    "Loss of capacity to negative SEI [A.h]",
+    "Loss of capacity to negative lithium plating [A.h]",
+]
+
+
+def _node_name(variable: str) -> str:
+    return re.sub(r"\W+", "_", variable).strip("_")
+
+
+class SolutionTraceWriter:
+    """
+    Streams selected PyBaMM variables of every step into a chunked, compressed HDF5 file.
+
+    Each variable is an extendable array whose first axis is time and whose remaining axes
+    are the variable's spatial dimensions; a shared /time array holds the trace times. Only
+    the step being appended is held in memory. The first point of a step repeats the last
+    point of the previous one and is skipped.
+
+    A step whose solver time starts before the end of the previous step (the model was
+    re-initialised, or restarted from an older state) opens a new segment: its times are
+    offset to continue from the end of the trace, and /segment_start records its first row.
+    A step is written completely or not at all.
+
+    Args:
+        path (str): HDF5 file to create (or extend with mode="a").
+        variables (list): PyBaMM variable names, DEFAULT_TRACE_VARIABLES if not given.
+        complevel (int): compression level, 0 to disable.
+        chunk_rows (int): time points per HDF5 chunk.
+        flush_every (int): steps between flushes to disk.
+    """
+
+    def __init__(self, path: str, variables: list = None, complevel: int = 5, complib: str = "blosc",
+                 chunk_rows: int = 512, flush_every: int = 100, mode: str = "w"):
+        self.path = path
+        self.variables = list(variables or DEFAULT_TRACE_VARIABLES)
+        self.chunk_rows = chunk_rows
+        self.flush_every = flush_every
+        self._filters = tables.Filters(complevel=complevel, complib=complib, shuffle=True) if complevel else None
+        self._file = tables.open_file(path, mode=mode)
+        self._arrays = {}
+        self._steps_since_flush = 0
+
+        root = self._file.root
+        if "time" in root:
+            self._time = root.time
+            self._step_start = root.step_start
+            self._segment_start = root.segment_start
+            self._arrays = {node._v_attrs.variable: node for node in root.variables}
+            self._last_time = float(self._time[-1]) if self._time.nrows else -np.inf
+            missing = [variable for variable in self.variables if variable not in self._arrays]
+            if missing and self._time.nrows:
+                raise ValueError(f"Variables not in the existing trace {path}: {missing}")
+        else:
+            self._time = self._create_array(root, "time", (), "Time [s]")
+            self._time._v_attrs.offset = 0.0
+            self._step_start = self._create_array(root, "step_start", (), "first row of each step", atom=tables.Int64Atom())
+            self._segment_start = self._create_array(root, "segment_start", (), "first row of each segment",
+                                                     atom=tables.Int64Atom())
+            self._file.create_group(root, "variables")
+            self._last_time = -np.inf
+        self._offset = float(self._time._v_attrs.offset)  # trace time - solver time in the current segment
+
+    def _create_array(self, where, name: str, spatial_shape: tuple, title: str, atom=None):
+        return self._file.create_earray(where, name, atom=atom or tables.Float64Atom(), shape=(0,) + spatial_shape,
+                                        title=title, filters=self._filters,
+                                        chunkshape=(self.chunk_rows,) + spatial_shape)
+
+    def append(self, solution) -> int:
+        """Append the new time points of a step solution. Returns the number of rows written."""
+        time = np.asarray(solution["Time [s]"].entries, dtype=float)
+        if not time.size:
+            return 0
+        offset = self._offset
+        restart = time[0] < self._last_time - offset  # the solver time went back
+        if restart:
+            offset = self._last_time - time[0]
+        new = np.ones(time.shape, dtype=bool) if restart else time + offset > self._last_time
+        if not new.any():
+            return 0
+
+        # PyBaMM puts time on the last axis; store it on the first so rows extend along time.
+        # Everything is evaluated before the first write, so a failing variable writes nothing.
+        rows = {variable: np.moveaxis(np.asarray(solution[variable].entries, dtype=float), -1, 0)[new]
+                for variable in self.variables}
+        sizes = [(array, array.nrows) for array in (self._time, self._step_start, self._segment_start)]
+        try:
+            for variable, entries in rows.items():
+                array = self._arrays.get(variable)
+                if array is None:
+                    array = self._create_array(self._file.root.variables, _node_name(variable), entries.shape[1:], variable)
+                    array._v_attrs.variable = variable
+                    self._arrays[variable] = array
+                array.append(entries)
+            if restart or not self._time.nrows:
+                self._segment_start.append(np.array([self._time.nrows], dtype=np.int64))
+            self._step_start.append(np.array([self._time.nrows], dtype=np.int64))
+            self._time.append(time[new] + offset)
+        except BaseException:
+            # keep every array at the length of the last complete step
+            rows_before = sizes[0][1]
+            sizes += [(array, rows_before) for array in self._arrays.values()]
+            for array, size in sizes:
+                if array.nrows > size:
+                    array.truncate(size)
+            raise
+        if offset != self._offset:
+            self._offset = self._time._v_attrs.offset = offset
+        self._last_time = float(time[new][-1] + offset)
+
+        self._steps_since_flush += 1
+        if self._steps_since_flush >= self.flush_every:
+            self.flush()
+        return int(new.sum())
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._steps_since_flush = 0
+
+    def close(self) -> None:
+        if self._file.isopen:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SolutionTrace:
+    """
+    Read access to a file written by SolutionTraceWriter.
+
+    Only the time axis is loaded up front; variables are read from disk for the requested
+    time range only.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = tables.open_file(path, mode="r")
+        self._arrays = {node._v_attrs.variable: node for node in self._file.root.variables}
+        self.time = self._file.root.time.read()
+
+    @property
+    def variables(self) -> list:
+        return list(self._arrays)
+
+    @property
+    def number_of_steps(self) -> int:
+        return self._file.root.step_start.nrows
+
+    @property
+    def segment_start_times(self) -> np.ndarray:
+        """Trace times at which the model was (re)started."""
+        return self.time[self._file.root.segment_start.read()]
+
+    def _rows(self, t_start: float = None, t_end: float = None) -> slice:
+        start = 0 if t_start is None else int(np.searchsorted(self.time, t_start, side="left"))
+        stop = len(self.time) if t_end is None else int(np.searchsorted(self.time, t_end, side="right"))
+        return slice(start, stop)
+
+    def read(self, variable: str, t_start: float = None, t_end: float = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return (time, values) of a variable for t_start <= t <= t_end; values have time on axis 0."""
+        if variable not in self._arrays:
+            raise KeyError(f"Variable not in trace: {variable}")
+        rows = self._rows(t_start, t_end)
+        return self.time[rows], self._arrays[variable][rows]
+
+    def read_step(self, variable: str, step: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (time, values) of a variable for one appended step."""
+        starts = self._file.root.step_start
+        if step < 0:
+            step += starts.nrows
+        start = int(starts[step])
+        stop = int(starts[step + 1]) if step + 1 < starts.nrows else len(self.time)
+        return self.time[start:stop], self._arrays[variable][start:stop]
+
+    def close(self) -> None:
+        if self._file.isopen:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
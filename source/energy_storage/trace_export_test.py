@@ -0,0 +1,99 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+
+from .energy_storage import EnergyStorageModel
+from .energy_storage_test import PARAMETERS
+from .trace_export import SolutionTrace, SolutionTraceWriter
+
+VARIABLES = ["Voltage [V]", "Negative particle concentration [mol.m-3]"]
+
+
+class _Solution:
+    """Step solution with PyBaMM's layout: time on the last axis of every variable."""
+
+    def __init__(self, time, broken=None):
+        self.time = np.asarray(time, dtype=float)
+        self.broken = broken
+
+    def __getitem__(self, variable):
+        if variable == self.broken:
+            raise KeyError(variable)
+        if variable == "Time [s]":
+            return SimpleNamespace(entries=self.time)
+        if variable == "Voltage [V]":
+            return SimpleNamespace(entries=3.6 + 1e-4 * self.time)
+        return SimpleNamespace(entries=np.ones((2, 3, 1)) * self.time)
+
+
+def test_restarted_models_open_a_new_segment():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.h5")
+        with SolutionTraceWriter(path, variables=VARIABLES) as writer:
+            assert writer.append(_Solution([0, 30, 60])) == 3
+            assert writer.append(_Solution([60, 90, 120])) == 2  # repeats the last point
+            assert writer.append(_Solution([0, 60])) == 2  # re-initialised: time restarts
+            assert writer.append(_Solution([60, 120])) == 1
+        with SolutionTraceWriter(path, variables=VARIABLES, mode="a") as writer:
+            assert writer.append(_Solution([120, 180])) == 1  # continues after reopening
+            assert writer.append(_Solution([0, 10])) == 2
+
+        with SolutionTrace(path) as trace:
+            assert np.array_equal(trace.time, [0, 30, 60, 90, 120, 120, 180, 240, 300, 300, 310])
+            assert np.array_equal(trace.segment_start_times, [0, 120, 300])
+            assert trace.number_of_steps == 6
+            time, values = trace.read_step("Negative particle concentration [mol.m-3]", 2)
+            assert np.array_equal(time, [120, 180]) and values.shape == (2, 2, 3)
+            assert np.array_equal(values[:, 0, 0], [0, 60])  # solver times of the segment
+            time, voltage = trace.read("Voltage [V]", 150, 250)
+            assert np.array_equal(time, [180, 240]) and np.allclose(voltage, 3.6 + 1e-4 * np.array([60, 120]))
+
+
+def test_failed_append_writes_nothing():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.h5")
+        with SolutionTraceWriter(path, variables=VARIABLES) as writer:
+            writer.append(_Solution([0, 60]))
+            try:
+                writer.append(_Solution([60, 120], broken=VARIABLES[1]))
+            except KeyError:
+                pass
+            else:
+                raise AssertionError("the broken solution was appended")
+            assert writer.append(_Solution([60, 90])) == 1
+        with SolutionTrace(path) as trace:
+            assert np.array_equal(trace.time, [0, 60, 90])
+            assert all(len(trace.read(variable)[1]) == 3 for variable in VARIABLES)
+            assert trace.number_of_steps == 2
+
+
+def test_model_steps_across_a_reinitialization():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.h5")
+        model = EnergyStorageModel()
+        model.trace_writer = SolutionTraceWriter(path, variables=["Voltage [V]", "Current [A]"])
+        try:
+            for _ in range(2):
+                model.initialize_pybamm_model(parameters=PARAMETERS)
+                model.state = None
+                for current in (10.0, -10.0):
+                    error, model.state = model.run_model(current=current, ambient_temp=25.0, time_duration=60,
+                                                         previous_state=model.state)
+                    assert not error
+        finally:
+            model.trace_writer.close()
+        with SolutionTrace(path) as trace:
+            assert trace.number_of_steps == 4
+            assert np.array_equal(trace.segment_start_times, [0, 120])
+            assert np.all(np.diff(trace.time) >= 0) and trace.time[-1] == 240
+            time, current = trace.read("Current [A]")
+            assert len(current) == len(time)
+
+
+if __name__ == "__main__":
+    test_restarted_models_open_a_new_segment()
+    test_failed_append_writes_nothing()
+    test_model_steps_across_a_reinitialization()
+    print("trace_export: all tests passed")